@@ -36,6 +36,7 @@ import uvicorn
 from falcon import App, asgi
 import management
 import setup
+import stream
 from config import Config
 
 #########################
@@ -95,6 +96,9 @@ async def alpaca_httpd(logger):
     falc_app.add_route(f'/management/v{API_VERSION}/configureddevices', management.configureddevices())
     falc_app.add_route('/setup', setup.svrsetup())
     falc_app.add_route(f'/setup/v{API_VERSION}/telescope/{{devnum}}/setup', setup.devsetup())
+    #
+    # Server push of the telescope state
+    falc_app.add_route(f'/stream/v{API_VERSION}/telescope/{{devnum:int(min=0)}}/state', stream.state())
 
     # Create a http server
     alpaca_config = uvicorn.Config(falc_app, host=Config.alpaca_ip_address, port=Config.alpaca_port, log_level="error")
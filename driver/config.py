@@ -77,10 +77,24 @@ class Config:
     focal_length: float = get_toml('server', 'focal_length')
     focal_ratio: float = get_toml('server', 'focal_ratio')
     verbose_driver_exceptions: bool = get_toml('server', 'verbose_driver_exceptions')
+    stream_max_rate: float = get_toml('server', 'stream_max_rate')
+    stream_heartbeat: float = get_toml('server', 'stream_heartbeat')
+    stellarium_update_threshold: float = get_toml('server', 'stellarium_update_threshold')
+    stellarium_update_max_rate: float = get_toml('server', 'stellarium_update_max_rate')
+    stellarium_update_heartbeat: float = get_toml('server', 'stellarium_update_heartbeat')
+    stellarium_poll_max_rate: float = get_toml('server', 'stellarium_poll_max_rate')
+    stellarium_poll_burst: int = get_toml('server', 'stellarium_poll_burst')
     # --------------
     # Device Section
     # --------------
     tracking_settle_time: float = get_toml('device', 'tracking_settle_time')
+    polaris_reply_timeout: float = get_toml('device', 'polaris_reply_timeout')
+    polaris_reply_retries: int = get_toml('device', 'polaris_reply_retries')
+    polaris_goto_timeout: float = get_toml('device', 'polaris_goto_timeout')
+    position_estimation: bool = get_toml('device', 'position_estimation')
+    position_estimation_window: int = get_toml('device', 'position_estimation_window')
+    position_estimation_order: int = get_toml('device', 'position_estimation_order')
+    telemetry_samples: int = get_toml('device', 'telemetry_samples')
     aiming_adjustment_enabled: bool = get_toml('device', 'aiming_adjustment_enabled')
     aiming_adjustment_time: float = get_toml('device', 'aiming_adjustment_time')
     aiming_adjustment_az: float = get_toml('device', 'aiming_adjustment_az')
@@ -98,11 +112,13 @@ class Config:
     log_polaris: bool = get_toml('logging', 'log_polaris')
     log_performance_data: int = get_toml('logging', 'log_performance_data')
     log_performance_data_test: int = get_toml('logging', 'log_performance_data_test')
+    log_performance_data_format: str = get_toml('logging', 'log_performance_data_format')
     log_perf_speed_interval: int = get_toml('logging', 'log_perf_speed_interval')
     log_polaris_protocol: bool = get_toml('logging', 'log_polaris_protocol')
     log_stellarium_protocol: bool = get_toml('logging', 'log_stellarium_protocol')
     supress_polaris_frequent_msgs: bool = get_toml('logging', 'supress_polaris_frequent_msgs')
     supress_alpaca_polling_msgs: bool = get_toml('logging', 'supress_alpaca_polling_msgs')
     supress_stellarium_polling_msgs: bool = get_toml('logging', 'supress_stellarium_polling_msgs')
+    log_polaris_stats: bool = get_toml('logging', 'log_polaris_stats')
     max_size_mb: int = get_toml('logging', 'max_size_mb')
     num_keep_logs: int = get_toml('logging', 'num_keep_logs')
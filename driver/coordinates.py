@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+#
+# -----------------------------------------------------------------------------
+# coordinates.py - Cached coordinate engine for RA/Dec <-> Alt/Az conversions
+#
+# A full ephem reduction (precession, nutation, aberration, sidereal time and
+# refraction) costs tens of microseconds, and the 518 position updates need one
+# or two of them for every message. Apart from the sidereal time, all of those
+# terms change so slowly that they can be computed once a second and reused.
+#
+# Every refresh the engine calibrates itself against ephem:
+#   * R, the rotation from J2000 to the true equator and equinox of date
+#     (precession and nutation)
+#   * beta, the annual aberration vector (Earth velocity / c) in that frame
+#   * the local apparent sidereal time at the refresh time
+# and, whenever the site pressure or temperature changes, a refraction table.
+#
+# Each conversion is then just the refraction lookup, the sidereal time from the
+# refresh time plus the Earth's rotation rate, a hour angle <-> horizon rotation
+# and the R/beta correction. The accuracy is checked against ephem to well under
+# an arcsecond by performance/benchmark_coordinates.py.
+#
+# The *_array versions convert whole NumPy arrays of positions and timestamps at
+# once (test grids, drift reports, sky coverage maps). They calibrate once per
+# BATCH_FRAME_INTERVAL of the timestamps, so a batch spanning months only costs
+# a few thousand small ephem calls on top of the vectorised arithmetic.
+#
+# -----------------------------------------------------------------------------
+import math
+import ephem
+import numpy as np
+
+EARTH_ROTATION_RATE = 2 * math.pi * 1.00273790935 / 86400   # radians of sidereal time per SI second
+UNIX_EPOCH_EPHEM_DATE = 25567.5                             # ephem.Date('1970/1/1')
+TWO_PI = 2 * math.pi
+BATCH_FRAME_INTERVAL = 600.0                                # seconds of timestamps sharing one calibration in the *_array conversions
+
+def unix2ephem(t: float) -> float:
+    # Convert a unix timestamp (UTC seconds) to an ephem date (days)
+    return t / 86400 + UNIX_EPOCH_EPHEM_DATE
+
+def _radec2vec(ra: float, dec: float):
+    cd = math.cos(dec)
+    return (cd * math.cos(ra), cd * math.sin(ra), math.sin(dec))
+
+def _vec2radec(x: float, y: float, z: float):
+    r = math.sqrt(x*x + y*y + z*z)
+    return math.atan2(y, x) % TWO_PI, math.asin(z / r)
+
+
+class RefractionTable:
+    """Atmospheric refraction as used by ephem, tabulated for one pressure and temperature
+
+    ``unrefract`` maps an apparent (refracted) altitude to the true altitude and
+    ``refract`` the reverse, by linear interpolation in tables of ephem's own
+    results on a uniform altitude grid.
+    """
+    MIN_ALT = -1.0                  # degrees
+    MAX_ALT = 90.0                  # degrees
+    STEP = 0.02                     # degrees
+
+    def __init__(self, observer: ephem.Observer):
+        self.pressure = observer.pressure
+        self.temp = observer.temp
+        n = int(round((self.MAX_ALT - self.MIN_ALT) / self.STEP)) + 1
+        refracted = ephem.Observer()
+        refracted.lat, refracted.long, refracted.elevation = observer.lat, observer.long, observer.elevation
+        refracted.date, refracted.epoch = observer.date, observer.epoch
+        refracted.pressure, refracted.temp = self.pressure, self.temp
+        unrefracted = ephem.Observer()
+        unrefracted.lat, unrefracted.long, unrefracted.elevation = observer.lat, observer.long, observer.elevation
+        unrefracted.date, unrefracted.epoch = observer.date, observer.epoch
+        unrefracted.pressure = 0
+        body = ephem.FixedBody()
+        body._epoch = observer.epoch
+        # _unrefract[i] is the true alt (radians) for the apparent alt on grid point i
+        # _refract[i] is the apparent alt (radians) for the true alt on grid point i
+        self._unrefract = []
+        self._refract = []
+        for i in range(n):
+            alt = math.radians(self.MIN_ALT + i * self.STEP)
+            body._ra, body._dec = refracted.radec_of(0.0, alt)
+            body.compute(unrefracted)
+            self._unrefract.append(float(body.alt))
+            body._ra, body._dec = unrefracted.radec_of(0.0, alt)
+            body.compute(refracted)
+            self._refract.append(float(body.alt))
+        self._min = math.radians(self.MIN_ALT)
+        self._scale = 1 / math.radians(self.STEP)
+        self._last = n - 2
+        self._grid = np.radians(self.MIN_ALT + np.arange(n) * self.STEP)
+        self._max = float(self._grid[-1])
+
+    def _lookup(self, table: list, alt: float) -> float:
+        x = (alt - self._min) * self._scale
+        i = int(x)
+        if i < 0 or i > self._last:
+            return alt                              # outside the table, no refraction
+        f = x - i
+        return table[i] + f * (table[i+1] - table[i])
+
+    def unrefract(self, alt: float) -> float:
+        return self._lookup(self._unrefract, alt)
+
+    def refract(self, alt: float) -> float:
+        return self._lookup(self._refract, alt)
+
+    def _lookup_array(self, table: list, alt: np.ndarray) -> np.ndarray:
+        inside = (alt >= self._min) & (alt <= self._max)
+        return np.where(inside, np.interp(alt, self._grid, table), alt)
+
+    def unrefract_array(self, alt: np.ndarray) -> np.ndarray:
+        return self._lookup_array(self._unrefract, alt)
+
+    def refract_array(self, alt: np.ndarray) -> np.ndarray:
+        return self._lookup_array(self._refract, alt)
+
+
+class CoordinateEngine:
+    """RA/Dec (J2000) <-> Alt/Az conversions for the site of an ``ephem.Observer``
+
+    The slowly varying terms are recalibrated against ephem whenever a conversion
+    is requested for a time more than ``refresh`` seconds from the last calibration,
+    and the site settings of the observer (lat, long, elevation, pressure, temp) are
+    re-read at the same time. Times are unix timestamps (UTC seconds). Angles are
+    in radians.
+    """
+    def __init__(self, observer: ephem.Observer, refresh: float = 1.0):
+        self._site = observer                       # observer holding the site settings (its date is never changed)
+        self._refresh = refresh                     # max seconds between calibrations
+        self._observer = ephem.Observer()           # private observer used for calibrations
+        self._body = ephem.FixedBody()              # private body used for calibrations
+        self._refraction = None                     # RefractionTable for the current pressure/temp (None if pressure is 0)
+        self._t0 = None                             # unix time of the last calibration
+        self.calibrations = 0                       # number of calibrations performed
+
+    def _update_site(self):
+        # (Re)read the site settings of the observer
+        site, obs = self._site, self._observer
+        obs.lat, obs.long, obs.elevation = site.lat, site.long, site.elevation
+        obs.epoch, obs.pressure = site.epoch, 0
+        self._lat = float(site.lat)
+        self._sinlat = math.sin(self._lat)
+        self._coslat = math.cos(self._lat)
+        if site.pressure > 0:
+            if not self._refraction or self._refraction.pressure != site.pressure or self._refraction.temp != site.temp:
+                self._refraction = RefractionTable(site)
+        else:
+            self._refraction = None
+
+    def _frame_of_date(self, t: float):
+        # Returns (lst0, R, beta) for unix time t, see the module header
+        obs, body = self._observer, self._body
+        obs.date = unix2ephem(t)
+        lst0 = float(obs.sidereal_time())
+
+        # Apparent place of date of the 6 J2000 basis directions +x, -x, +y, -y, +z, -z
+        # Apparent v = normalize(R u + beta), so to first order in beta
+        #   v(+e) - v(-e) = 2 R e     and     sum of all 6 v = 4 beta
+        body._epoch = self._site.epoch
+        apparent = []
+        for ra, dec in ((0, 0), (math.pi, 0), (math.pi/2, 0), (3*math.pi/2, 0), (0, math.pi/2), (0, -math.pi/2)):
+            body._ra, body._dec = ra, dec
+            body.compute(obs)
+            apparent.append(_radec2vec(float(body.g_ra), float(body.g_dec)))
+        beta = tuple(sum(v[i] for v in apparent) / 4 for i in range(3))
+        cols = [tuple((apparent[2*k][i] - apparent[2*k+1][i]) / 2 for i in range(3)) for k in range(3)]
+        # R as rows, with its columns re-orthonormalised (Gram-Schmidt)
+        c0 = cols[0]
+        n = math.sqrt(sum(x*x for x in c0)); c0 = tuple(x/n for x in c0)
+        c1 = cols[1]
+        d = sum(a*b for a, b in zip(c0, c1)); c1 = tuple(b - d*a for a, b in zip(c0, c1))
+        n = math.sqrt(sum(x*x for x in c1)); c1 = tuple(x/n for x in c1)
+        c2 = (c0[1]*c1[2] - c0[2]*c1[1], c0[2]*c1[0] - c0[0]*c1[2], c0[0]*c1[1] - c0[1]*c1[0])
+        R = tuple((c0[i], c1[i], c2[i]) for i in range(3))
+        return lst0, R, beta
+
+    def _calibrate(self, t: float):
+        self._update_site()
+        self._lst0, self._R, self._beta = self._frame_of_date(t)
+        self._t0 = t
+        self.calibrations += 1
+
+    def _frames_of_date(self, t: np.ndarray):
+        # Per element (lst0, R, beta, t0) for a 1-d array of unix times, one calibration per BATCH_FRAME_INTERVAL
+        self._update_site()
+        buckets, inverse = np.unique(np.round(t / BATCH_FRAME_INTERVAL), return_inverse=True)
+        t0 = buckets * BATCH_FRAME_INTERVAL
+        frames = [self._frame_of_date(float(tc)) for tc in t0]
+        self.calibrations += len(frames)
+        inverse = inverse.ravel()
+        lst0 = np.array([f[0] for f in frames])[inverse]
+        R = np.array([f[1] for f in frames])[inverse]
+        beta = np.array([f[2] for f in frames])[inverse]
+        return lst0, R, beta, t0[inverse]
+
+    def reset(self):
+        # Recalibrate on the next conversion, e.g. after the site settings of the observer changed
+        self._t0 = None
+
+    def _check(self, t: float):
+        if self._t0 is None or abs(t - self._t0) > self._refresh:
+            self._calibrate(t)
+
+    def sidereal_time(self, t: float) -> float:
+        # Local apparent sidereal time (radians)
+        self._check(t)
+        return (self._lst0 + EARTH_ROTATION_RATE * (t - self._t0)) % TWO_PI
+
+    def altaz2radec(self, alt: float, az: float, t: float):
+        """Convert an observed (refracted) alt/az to J2000 ra/dec"""
+        self._check(t)
+        if self._refraction:
+            alt = self._refraction.unrefract(alt)
+        # horizon -> hour angle/declination of date
+        sinlat, coslat = self._sinlat, self._coslat
+        ca, sa = math.cos(alt), math.sin(alt)
+        cA = math.cos(az)
+        z = sinlat * sa + coslat * ca * cA                  # sin(dec)
+        hx = coslat * sa - sinlat * ca * cA                 # cos(dec) cos(ha)
+        hy = -ca * math.sin(az)                             # cos(dec) sin(ha)
+        # rotate hour angle to right ascension: ra = lst - ha
+        lst = self._lst0 + EARTH_ROTATION_RATE * (t - self._t0)
+        cl, sl = math.cos(lst), math.sin(lst)
+        x = cl * hx + sl * hy
+        y = sl * hx - cl * hy
+        # remove aberration and apply R transpose
+        b = self._beta
+        x, y, z = x - b[0], y - b[1], z - b[2]
+        R = self._R
+        ux = R[0][0]*x + R[1][0]*y + R[2][0]*z
+        uy = R[0][1]*x + R[1][1]*y + R[2][1]*z
+        uz = R[0][2]*x + R[1][2]*y + R[2][2]*z
+        return _vec2radec(ux, uy, uz)
+
+    def radec2altaz(self, ra: float, dec: float, t: float):
+        """Convert J2000 ra/dec to an observed (refracted) alt/az"""
+        self._check(t)
+        ux, uy, uz = _radec2vec(ra, dec)
+        R, b = self._R, self._beta
+        x = R[0][0]*ux + R[0][1]*uy + R[0][2]*uz + b[0]
+        y = R[1][0]*ux + R[1][1]*uy + R[1][2]*uz + b[1]
+        z = R[2][0]*ux + R[2][1]*uy + R[2][2]*uz + b[2]
+        r = math.sqrt(x*x + y*y + z*z)
+        # rotate right ascension to hour angle: ha = lst - ra
+        lst = self._lst0 + EARTH_ROTATION_RATE * (t - self._t0)
+        cl, sl = math.cos(lst), math.sin(lst)
+        hx = (cl * x + sl * y) / r                          # cos(dec) cos(ha)
+        hy = (sl * x - cl * y) / r                          # cos(dec) sin(ha)
+        sd = z / r                                          # sin(dec)
+        # hour angle/declination of date -> horizon
+        sinlat, coslat = self._sinlat, self._coslat
+        alt = math.asin(max(-1.0, min(1.0, sinlat * sd + coslat * hx)))
+        az = math.atan2(-hy, coslat * sd - sinlat * hx) % TWO_PI
+        if self._refraction:
+            alt = self._refraction.refract(alt)
+        return alt, az
+
+    def altaz2radec_array(self, alt, az, t):
+        """Convert arrays of observed (refracted) alt/az at unix times t to J2000 ra/dec arrays
+
+        The arguments are broadcast against each other, so t may also be a single time.
+        """
+        alt, az, t = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (alt, az, t)))
+        shape = alt.shape
+        alt, az, t = alt.ravel(), az.ravel(), t.ravel()
+        lst0, R, beta, t0 = self._frames_of_date(t)
+        if self._refraction:
+            alt = self._refraction.unrefract_array(alt)
+        # horizon -> hour angle/declination of date
+        sinlat, coslat = self._sinlat, self._coslat
+        ca, sa = np.cos(alt), np.sin(alt)
+        cA = np.cos(az)
+        z = sinlat * sa + coslat * ca * cA
+        hx = coslat * sa - sinlat * ca * cA
+        hy = -ca * np.sin(az)
+        # rotate hour angle to right ascension: ra = lst - ha
+        lst = lst0 + EARTH_ROTATION_RATE * (t - t0)
+        cl, sl = np.cos(lst), np.sin(lst)
+        v = np.stack((cl * hx + sl * hy, sl * hx - cl * hy, z), axis=-1) - beta
+        # remove aberration and apply R transpose
+        u = np.einsum('nji,nj->ni', R, v)
+        ra = np.arctan2(u[:, 1], u[:, 0]) % TWO_PI
+        dec = np.arcsin(u[:, 2] / np.linalg.norm(u, axis=-1))
+        return ra.reshape(shape), dec.reshape(shape)
+
+    def radec2altaz_array(self, ra, dec, t):
+        """Convert arrays of J2000 ra/dec at unix times t to observed (refracted) alt/az arrays
+
+        The arguments are broadcast against each other, so t may also be a single time.
+        """
+        ra, dec, t = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (ra, dec, t)))
+        shape = ra.shape
+        ra, dec, t = ra.ravel(), dec.ravel(), t.ravel()
+        lst0, R, beta, t0 = self._frames_of_date(t)
+        cd = np.cos(dec)
+        u = np.stack((cd * np.cos(ra), cd * np.sin(ra), np.sin(dec)), axis=-1)
+        v = np.einsum('nij,nj->ni', R, u) + beta
+        x, y, z = (v / np.linalg.norm(v, axis=-1, keepdims=True)).T
+        # rotate right ascension to hour angle: ha = lst - ra
+        lst = lst0 + EARTH_ROTATION_RATE * (t - t0)
+        cl, sl = np.cos(lst), np.sin(lst)
+        hx = cl * x + sl * y
+        hy = sl * x - cl * y
+        # hour angle/declination of date -> horizon
+        sinlat, coslat = self._sinlat, self._coslat
+        alt = np.arcsin(np.clip(sinlat * z + coslat * hx, -1.0, 1.0))
+        az = np.arctan2(-hy, coslat * z - sinlat * hx) % TWO_PI
+        if self._refraction:
+            alt = self._refraction.refract_array(alt)
+        return alt.reshape(shape), az.reshape(shape)
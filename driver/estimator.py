@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+#
+# -----------------------------------------------------------------------------
+# estimator.py - Kinematic estimate of the Polaris position between 518 updates
+#
+# The AHRS reports the position of the Polaris in 518 messages at up to ~20Hz.
+# A reader asking for the position in between gets the last reported value,
+# which during a slew (or just tracking in alt/az) is stale by up to one update
+# interval plus however long the reader took to ask.
+#
+# PositionEstimator keeps a ring buffer of the most recent (monotonic time, alt,
+# az) samples and, as each sample arrives, fits a polynomial in time to them by
+# least squares: order 1 for position + velocity, order 2 adds acceleration.
+# A query for any instant then just evaluates the fitted polynomials, so it is
+# O(1) whatever the window size. The uncertainty of each estimate is the
+# prediction interval of the fit, from the scatter of the samples about it
+# (the AHRS noise, and how well the motion fits the polynomial) and how far the
+# requested time is from the samples.
+#
+# Extrapolation is capped at max_extrapolation seconds past the newest sample,
+# so if the 518 updates stop the estimate stops moving rather than running off.
+# The azimuth is unwrapped across 0/360 within the window.
+#
+# The accuracy against hold-the-last-value is measured on DATA4 position logs
+# by performance/benchmark_estimator.py.
+#
+# -----------------------------------------------------------------------------
+import math
+import numpy as np
+from typing import NamedTuple
+
+
+class PositionEstimate(NamedTuple):
+    """Estimated position at a requested time"""
+    altitude: float                             # degrees
+    azimuth: float                              # degrees, 0 to 360
+    sigma: float                                # 1 sigma uncertainty on the sky (arc seconds), inf with too few samples to fit
+    age: float                                  # seconds from the newest sample to the requested time (negative is interpolation)
+
+
+class PositionEstimator:
+    def __init__(self, size: int = 10, order: int = 2, max_extrapolation: float = 0.5):
+        self.size = size                                # number of samples in the window
+        self.order = order                              # 1 = velocity, 2 = velocity and acceleration
+        self.max_extrapolation = max_extrapolation      # seconds past the newest sample to extrapolate to at most
+        self._t = np.zeros(size)                        # sample times (s) relative to _base_ns
+        self._y = np.zeros((size, 2))                   # sample alt, unwrapped az (degrees)
+        self.clear()
+
+    def clear(self):
+        self._n = 0                                     # number of samples in the window
+        self._i = 0                                     # next slot of the ring buffer to fill
+        self._base_ns = None                            # monotonic time (ns) of time 0 for _t
+        self._last_ns = 0                               # monotonic time (ns) of the newest sample
+        self._last = (0.0, 0.0)                         # newest alt, unwrapped az
+        self._coef = None                               # fitted polynomial coefficients (order+1, 2) in time from the newest sample
+        self._xtx_inv = None                            # inverse of the normal matrix, for the uncertainty
+        self._var = (0.0, 0.0)                          # variance of the samples about the fit (alt, az) (degrees^2)
+        self.samples = 0                                # number of samples added
+
+    def add(self, t_ns: int, alt: float, az: float):
+        if self._base_ns is None:
+            self._base_ns = t_ns
+        elif self._n:
+            # keep the azimuth continuous with the previous sample
+            last_az = self._last[1]
+            az = last_az + (az - last_az + 180) % 360 - 180
+        i = self._i
+        self._t[i] = (t_ns - self._base_ns) / 1e9
+        self._y[i, 0] = alt
+        self._y[i, 1] = az
+        self._i = (i + 1) % self.size
+        if self._n < self.size:
+            self._n += 1
+        self._last_ns = t_ns
+        self._last = (alt, az)
+        self.samples += 1
+        self._fit()
+
+    def _fit(self):
+        n = self._n
+        if n < self.order + 2:
+            self._coef = None
+            return
+        # the order of the samples in the ring doesn't matter to a least squares fit
+        dt = self._t[:n] - (self._last_ns - self._base_ns) / 1e9
+        x = np.vander(dt, self.order + 1, increasing=True)
+        y = self._y[:n]
+        xtx_inv = np.linalg.pinv(x.T @ x)               # pinv, as frames from one read share a receive time
+        coef = xtx_inv @ (x.T @ y)
+        resid = y - x @ coef
+        var = (resid * resid).sum(axis=0) / (n - self.order - 1)
+        self._coef = coef
+        self._xtx_inv = xtx_inv
+        self._var = (float(var[0]), float(var[1]))
+
+    def estimate(self, t_ns: int) -> PositionEstimate:
+        age = (t_ns - self._last_ns) / 1e9
+        if self._coef is None:
+            alt, az = self._last
+            return PositionEstimate(alt, az % 360, math.inf, age)
+        dt = min(age, self.max_extrapolation)
+        x = np.array([dt ** k for k in range(self.order + 1)])
+        alt, az = x @ self._coef
+        # prediction interval: the scatter of a sample about the fit plus the uncertainty of the fit at dt
+        k = 1 + x @ self._xtx_inv @ x
+        cos_alt = math.cos(math.radians(alt))
+        sigma = math.sqrt(k * (self._var[0] + self._var[1] * cos_alt * cos_alt)) * 3600
+        return PositionEstimate(float(alt), float(az) % 360, sigma, age)
+
+    # Velocity (degrees/s) of alt and az from the fit, 0 with too few samples
+    def velocity(self):
+        if self._coef is None:
+            return 0.0, 0.0
+        return float(self._coef[1, 0]), float(self._coef[1, 1])
@@ -363,4 +363,7 @@ class AstroAlignmentError(Exception):
     pass
 
 class WatchdogError(Exception):
+    pass
+
+class PolarisTimeoutError(Exception):
     pass
\ No newline at end of file
@@ -73,8 +73,9 @@ def init_logging():
     formatter.converter = time.gmtime           # UTC time
     logger.handlers[0].setFormatter(formatter)  # This is the stdout handler, level set above
     # Add a logfile handler, same formatter and level
-    if Config.log_to_file or Config.log_performance_data:
-        logfile = 'alpaca.log' if (not Config.log_performance_data) else 'alpaca.csv'
+    csv_performance_data = Config.log_performance_data and Config.log_performance_data_format == 'csv'
+    if Config.log_to_file or csv_performance_data:
+        logfile = 'alpaca.csv' if csv_performance_data else 'alpaca.log'
         logdir = Config.log_dir if Config.log_dir else '.'
         logpath = os.path.join(logdir, logfile)
         handler = logging.handlers.RotatingFileHandler(logpath,
@@ -43,6 +43,7 @@ from config import Config
 from discovery import DiscoveryResponder
 import telescope
 import stellarium
+import stream
 import app
 import argparse
 
@@ -51,6 +52,10 @@ import argparse
 # ===========
 async def main():
 
+    # checked before logging starts, as it decides the name of the log file
+    if Config.log_performance_data_format not in ('csv', 'binary'):
+        raise ValueError(f"log_performance_data_format must be 'csv' or 'binary', not '{Config.log_performance_data_format}'")
+
     logger = log.init_logging()
     # Share this logger throughout
     log.logger = logger
@@ -58,24 +63,26 @@ async def main():
     discovery.logger = logger
     telescope.logger = logger
     shr.logger = logger
+    stream.logger = logger
 
 
-    # Output performance data log headers if enabled
-    if Config.log_performance_data == 1:        # Aim data
-        logger.info(f",Dataset,Time,AimAz,AimAlt,OffsetAz,OffsetAlt,AimErrorAz,AimErrorAlt")
-        logger.info(f",DATA1,{0:.3f},{0:.2f},{0:.2f},{0:.2f},{0:.2f},{0:.2f},{0:.2f}")
+    # Output performance data log headers if enabled (binary recordings describe themselves)
+    if Config.log_performance_data_format == 'csv':
+        if Config.log_performance_data == 1:        # Aim data
+            logger.info(f",Dataset,Time,AimAz,AimAlt,OffsetAz,OffsetAlt,AimErrorAz,AimErrorAlt")
+            logger.info(f",DATA1,{0:.3f},{0:.2f},{0:.2f},{0:.2f},{0:.2f},{0:.2f},{0:.2f}")
 
-    elif Config.log_performance_data == 2:      # Drift data
-        logger.info(f",Dataset,Time,TrackingT0,TrackingT1,TargetRA,TargetDec,DriftErrRA,DriftErrDec")
-        logger.info(f",DATA2,{0:.3f},{False},{False},{0:.7f},{0:.7f},{0:.3f},{0:.3f}")
+        elif Config.log_performance_data == 2:      # Drift data
+            logger.info(f",Dataset,Time,TrackingT0,TrackingT1,TargetRA,TargetDec,DriftErrRA,DriftErrDec")
+            logger.info(f",DATA2,{0:.3f},{False},{False},{0:.7f},{0:.7f},{0:.3f},{0:.3f}")
 
-    elif Config.log_performance_data == 3:      # Speed data
-        logger.info(f",Dataset,Time,Interval,Constant,RateAz,SpeedAz,RateAlt,SpeedAlt,SpeedRA,SpeedDec,SpeedTotal")
-        logger.info(f",DATA3,{0:.3f},{0:.2f},{False},{0:.2f},{0:.7f},{0:.2f},{0:.7f},{0:.7f},{0:.7f},'00:00:00.000'")
+        elif Config.log_performance_data == 3:      # Speed data
+            logger.info(f",Dataset,Time,Interval,Constant,RateAz,SpeedAz,RateAlt,SpeedAlt,SpeedRA,SpeedDec,SpeedTotal")
+            logger.info(f",DATA3,{0:.3f},{0:.2f},{False},{0:.2f},{0:.7f},{0:.2f},{0:.7f},{0:.7f},{0:.7f},'00:00:00.000'")
 
-    elif Config.log_performance_data == 4:      # Position data (heavy logging)
-        logger.info(f",Dataset,Time,Tracking,Slewing,Gotoing,TargetRA,TargetDEC,AscomRA,AscomDEC,AscomAz,AscomAlt,ErrorRA,ErrorDec")
-        logger.info(f",DATA4,{0:.3f},{False},{False},{False},{0:.7f},{0:.7f},{0:.7f},{0:.7f},{0:.7f},{0:.7f},{0:.3f},{0:.3f}")
+        elif Config.log_performance_data == 4:      # Position data (heavy logging)
+            logger.info(f",Dataset,Time,Tracking,Slewing,Gotoing,TargetRA,TargetDEC,AscomRA,AscomDEC,AscomAz,AscomAlt,ErrorRA,ErrorDec")
+            logger.info(f",DATA4,{0:.3f},{False},{False},{False},{0:.7f},{0:.7f},{0:.7f},{0:.7f},{0:.7f},{0:.7f},{0:.3f},{0:.3f}")
 
     # Initialize the ASCOM devices
     telescope.start_polaris(logger)
@@ -62,7 +62,7 @@ def set_management_logger(lgr):
 class apiversions:
     async def on_get(self, req: Request, resp: Response):
         apis = [ 1 ]                            # TODO MAKE CONFIG OR GLOBAL
-        resp.text = await PropertyResponse(apis, req)
+        resp.data = await PropertyResponse(apis, req)
 
 # -------------------------
 # Alpaca Server Description
@@ -75,7 +75,7 @@ class description:
             'Version'      : DeviceMetadata.Version,
             'Location'     : Config.location
             }
-        resp.text = await PropertyResponse(desc, req)
+        resp.data = await PropertyResponse(desc, req)
 
 # -----------------
 # ConfiguredDevices
@@ -90,4 +90,4 @@ class configureddevices():
             'UniqueID'      : TelescopeMetadata.DeviceID
             }
         ]
-        resp.text = await PropertyResponse(confarray, req)
+        resp.data = await PropertyResponse(confarray, req)
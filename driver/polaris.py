@@ -10,7 +10,8 @@
 # the connection to the Device, including all of its state parameters implied by 
 # ASCOM ITelescopeV3.
 #
-# It provides thread-safe access to read and write its properties.
+# It is owned by the asyncio event loop: all of its state is read and written
+# from that one thread, so no locking is needed.
 # It provides functions to perform methods required by ITelescopeV3.
 # It provides all the communications functions for asynchronous two 
 # way communication with the Benro Polaris Device.
@@ -69,23 +70,462 @@
 #
 #
 #
+import os
 import math
+import atexit
 import datetime
-import re
+from time import monotonic, monotonic_ns, perf_counter_ns
 import asyncio
 import ephem
-from threading import Lock
+from collections import deque
+import numpy as np
 from logging import Logger
+from typing import NamedTuple
 from config import Config
-from exceptions import AstroModeError, AstroAlignmentError, WatchdogError
-from shr import deg2rad, rad2hr, rad2deg, hr2rad, deg2dms, hr2hms, clamparcsec, empty_queue
+from exceptions import AstroModeError, AstroAlignmentError, WatchdogError, PolarisTimeoutError
+from coordinates import CoordinateEngine
+from estimator import PositionEstimator
+from telemetry import TelemetryStore, TelemetryRecorder
+from shr import deg2rad, rad2hr, rad2deg, hr2rad, deg2dms, hr2hms, clamparcsec, LatencyHistogram, MonotonicClock, Subscription
+
+# Find the value of a 'key:' field in the args of a message, returning its (start, end) offsets.
+# sep_key is the key preceded by its ';' separator, so that eg 'alt:' does not match 'salt:'
+def _find_arg(args: bytes, key: bytes, sep_key: bytes):
+    if args.startswith(key):
+        start = len(key)
+    else:
+        start = args.find(sep_key)
+        if start < 0:
+            raise KeyError(key.decode())
+        start += len(sep_key)
+    end = args.find(b';', start)
+    return start, end if end >= 0 else len(args)
+
+def parse_518_position(args: bytes):
+    """Fast path decoder for the args of a 518 AHRS position message
+
+    Returns the ``(compass, alt)`` fields as floats, converted straight from the
+    raw bytes of the message without decoding it or building a dict of every field
+    (the quaternions etc are never used). Raises KeyError if a field is missing.
+    """
+    start, end = _find_arg(args, b'compass:', b';compass:')
+    compass = float(args[start:end])
+    start, end = _find_arg(args, b'alt:', b';alt:')
+    alt = float(args[start:end])
+    return compass, alt
+
+
+class PolarisFramer:
+    """Incremental framer for the ``ddd@args#`` message stream from the Polaris
+
+    Received bytes are appended to a single ``bytearray``. Complete frames are
+    located by scanning for the ``#`` terminator and sliced through a ``memoryview``,
+    so only complete frames are ever copied out. Their args are returned as raw
+    bytes, leaving each command handler to decode only what it needs. A partial
+    frame at the end of a read is kept until the rest of it arrives. Consumed
+    bytes are removed from the front of the buffer once per read, rather than
+    once per message.
+
+    """
+    MAX_PARTIAL_FRAME = 65536                       # discard an unterminated frame if it grows beyond this many bytes
+
+    def __init__(self):
+        self._buffer = bytearray()                  # received bytes not yet consumed as complete frames
+        self.frames = 0                             # number of complete frames extracted
+        self.unmatched = 0                          # number of malformed frames discarded
+        self.bytes_received = 0                     # number of bytes received from the Polaris
+        self.bytes_copied = 0                       # number of bytes copied by the framer (appending reads and compacting the buffer)
+        self._rate_timestamp = monotonic()          # start of the current frames/sec measurement period
+        self._rate_frames = 0                       # frame count at the start of the current measurement period
+
+    def clear(self):
+        # discard any partial frame, eg when the connection is re-established
+        self._buffer.clear()
+
+    def feed(self, data) -> list:
+        # Add received data to the buffer, returning a list of (cmd, args bytes) for every complete frame.
+        # Malformed frames are returned as (None, frame bytes) so that the caller can log them.
+        buffer = self._buffer
+        buffer += data
+        self.bytes_received += len(data)
+        self.bytes_copied += len(data)
+        frames = []
+        start = 0
+        with memoryview(buffer) as view:
+            while True:
+                end = buffer.find(b'#', start)
+                if end < 0:
+                    break
+                # ddd@args# where ddd is a 3 digit command code
+                if end - start >= 4 and view[start+3] == 0x40 and buffer[start:start+3].isdigit():
+                    frames.append((str(view[start:start+3], 'ascii'), bytes(view[start+4:end])))
+                    self.frames += 1
+                else:
+                    frames.append((None, bytes(view[start:end+1])))
+                    self.unmatched += 1
+                start = end + 1
+        # remove the consumed frames, keeping any partial frame for the next read
+        if start:
+            del buffer[:start]
+            self.bytes_copied += len(buffer)
+        if len(buffer) > self.MAX_PARTIAL_FRAME:
+            frames.append((None, bytes(buffer[:64])))
+            self.unmatched += 1
+            buffer.clear()
+        return frames
+
+    def frame_rate(self) -> float:
+        # Average frames/sec since the last call
+        now = monotonic()
+        elapsed = now - self._rate_timestamp
+        rate = (self.frames - self._rate_frames) / elapsed if elapsed > 0 else 0.0
+        self._rate_timestamp = now
+        self._rate_frames = self.frames
+        return rate
+
+
+class PolarisProtocol(asyncio.Protocol):
+    """asyncio Protocol for the TCP connection to the Polaris device
+
+    Received data is handed to ``Polaris.data_received()`` from the event loop's
+    ``data_received`` callback, so messages are dispatched the moment they arrive
+    rather than on a polling interval. It also provides the ``write()`` and
+    ``drain()`` pair used by the ``PolarisSendQueue`` writer task.
+
+    """
+    def __init__(self, polaris):
+        self._polaris = polaris
+        self._transport = None
+        self._can_write = asyncio.Event()           # cleared while the transport has asked us to pause writing
+        self._can_write.set()
+        self.closed = asyncio.get_running_loop().create_future()   # completes with the exception to raise when the connection is lost
+
+    def connection_made(self, transport):
+        self._transport = transport
+
+    def data_received(self, data):
+        self._polaris.data_received(data, monotonic_ns())
+
+    def eof_received(self):
+        return False                                # close the transport
+
+    def connection_lost(self, exc):
+        self._can_write.set()
+        if not self.closed.done():
+            self.closed.set_result(exc if exc else ConnectionAbortedError('Polaris closed the connection'))
+
+    def pause_writing(self):
+        self._can_write.clear()
+
+    def resume_writing(self):
+        self._can_write.set()
+
+    def write(self, data):
+        if not self._transport.is_closing():
+            self._transport.write(data)
+
+    async def drain(self):
+        await self._can_write.wait()
+
+    def close(self):
+        self._transport.close()
+
+
+class PolarisSendQueue:
+    """Outbound message queue for the connection to the Polaris, sent by a single writer task
+
+    Messages are queued with one of three priorities:
+
+    * ``URGENT`` - goto abort and move stop. Queueing one discards any queued
+      ``REPEAT`` message, so a stale fast move can't follow the stop.
+    * ``NORMAL`` - everything else.
+    * ``REPEAT`` - the fast move message repeated every 50ms. Only the latest
+      one for each command code is kept, older ones are coalesced away.
+
+    ``URGENT`` and ``NORMAL`` messages are sent in the order queued, so a stop
+    or abort never overtakes the move start or GOTO queued before it, and
+    ``REPEAT`` messages after them. Only ``REPEAT`` messages are ever dropped.
+
+    The writer task joins everything queued by the time it runs into a single
+    write, then waits for ``drain()``. Messages queued while it waits go out
+    together in the next write. Records the queue depth and the latency from
+    queueing a message to its write being drained.
+
+    """
+    URGENT, NORMAL, REPEAT = 0, 1, 2
+
+    def __init__(self):
+        self._ordered = deque()                     # (message bytes, monotonic ns queued) of URGENT and NORMAL messages
+        self._repeat = deque()                      # (message bytes, monotonic ns queued) of REPEAT messages
+        self._ready = asyncio.Event()               # set when there is something to send
+        self.latency = LatencyHistogram()           # queued to drained latency of each message
+        self.frames = 0                             # number of messages sent
+        self.writes = 0                             # number of writes (batches of messages) made
+        self.bytes_sent = 0                         # number of bytes sent
+        self.coalesced = 0                          # number of REPEAT messages replaced or discarded before being sent
+        self.max_depth = 0                          # largest number of messages queued at once
+
+    @property
+    def depth(self) -> int:
+        return len(self._ordered) + len(self._repeat)
+
+    def put(self, msg: bytes, priority: int = NORMAL):
+        repeat = self._repeat
+        if repeat:
+            if priority == self.URGENT:
+                self.coalesced += len(repeat)
+                repeat.clear()
+            elif priority == self.REPEAT:
+                cmd = msg[:6]                       # '1&ddd&'
+                kept = [m for m in repeat if m[0][:6] != cmd]
+                self.coalesced += len(repeat) - len(kept)
+                repeat.clear()
+                repeat.extend(kept)
+        (repeat if priority == self.REPEAT else self._ordered).append((msg, monotonic_ns()))
+        depth = self.depth
+        if depth > self.max_depth:
+            self.max_depth = depth
+        self._ready.set()
+
+    def clear(self):
+        # discard anything queued, eg when the connection is re-established
+        self._ordered.clear()
+        self._repeat.clear()
+
+    async def writer(self, protocol):
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            batch = list(self._ordered)
+            batch.extend(self._repeat)
+            self._ordered.clear()
+            self._repeat.clear()
+            if not batch:
+                continue
+            data = b''.join([msg for msg, _ in batch])
+            protocol.write(data)
+            await protocol.drain()
+            now = monotonic_ns()
+            for _, queued_ns in batch:
+                self.latency.record_ns(now - queued_ns)
+            self.frames += len(batch)
+            self.writes += 1
+            self.bytes_sent += len(data)
+
+    def summary(self) -> str:
+        return f"{self.frames} msgs | {self.writes} writes | {self.bytes_sent} bytes | {self.coalesced} coalesced | depth {self.depth} (max {self.max_depth}) | latency {self.latency.summary()}"
+
+
+class PolarisRequest:
+    """A command sent to the Polaris, waiting for its replies"""
+    def __init__(self, cmd: str, seq: int, replies: int):
+        loop = asyncio.get_running_loop()
+        self.cmd = cmd                              # command code, eg '519'
+        self.seq = seq                              # sequence number of the request
+        self.replies = [loop.create_future() for _ in range(replies)]   # completed with the arg dict of each reply, in order
+        self.received = 0                           # number of replies received so far
+        self.sent_ns = monotonic_ns()               # monotonic time (ns) the command was (last) sent
+
+
+class PolarisRPC:
+    """Matches the replies from the Polaris to the commands waiting for them
+
+    The Polaris replies to a command with a message of the same command code,
+    but without anything to say which request it answers. Each request is
+    keyed by its command code and a sequence number, and replies complete the
+    oldest request waiting for that command code, so concurrent callers each
+    get their own reply in turn. Replies nobody is waiting for (eg to the 15s
+    keepalive MODE query) are ignored.
+
+    ``call()`` sends a command and waits for its first reply with a deadline,
+    resending it on timeout up to ``retries`` times. Further replies (eg the
+    second GOTO reply when the slew stops) are waited for with ``wait()``.
+
+    As replies can't be told apart, a late reply completes whichever request
+    for its command code is then the oldest. Only retry commands where that
+    is harmless (queries and idempotent settings), never a GOTO. A request
+    that times out, or whose caller is cancelled or aborted, is dropped, and
+    for STALE_REPLY_WINDOW seconds after that the replies it was still owed
+    are ignored, so its late replies don't complete the next request out of
+    step. A reply that never comes can cost the next request its reply in
+    that window. Records the latency of each reply for each command code
+    ('519' first reply, '519/2' second reply).
+
+    """
+    STALE_REPLY_WINDOW = 2.0                        # seconds the replies owed to a dropped request are ignored for
+
+    def __init__(self):
+        self._pending = {}                          # {cmd: {seq: PolarisRequest}} oldest first
+        self._seq = 0                               # sequence number of the last request
+        self.latency = {}                           # {'cmd' or 'cmd/n': LatencyHistogram} from sending to the nth reply
+        self.timeouts = 0                           # number of replies that missed their deadline
+        self.retries = 0                            # number of times a command was resent
+        self.unsolicited = 0                        # number of replies with no request waiting for them
+        self.stale = 0                              # number of late replies to dropped requests ignored
+        self._owed = {}                             # {cmd: [replies owed to dropped requests, monotonic ns until ignored]}
+
+    def request(self, cmd: str, replies: int = 1) -> PolarisRequest:
+        self._seq += 1
+        request = PolarisRequest(cmd, self._seq, replies)
+        self._pending.setdefault(cmd, {})[request.seq] = request
+        return request
+
+    # Ignore the replies still owed to a dropped request for STALE_REPLY_WINDOW seconds
+    def _owe(self, request: PolarisRequest):
+        n = len(request.replies) - request.received
+        if n <= 0:
+            return
+        now = monotonic_ns()
+        owed = self._owed.get(request.cmd)
+        count = owed[0] if owed and owed[1] > now else 0
+        self._owed[request.cmd] = [count + n, now + int(self.STALE_REPLY_WINDOW * 1e9)]
+
+    def discard(self, request: PolarisRequest):
+        if self._pending.get(request.cmd, {}).pop(request.seq, None):
+            self._owe(request)
+        for reply in request.replies:
+            if not reply.done():
+                reply.cancel()
+
+    # Complete the oldest request waiting for cmd with a reply, return False if none were waiting
+    def resolve(self, cmd: str, arg_dict: dict) -> bool:
+        owed = self._owed.get(cmd)
+        if owed:
+            if owed[1] > monotonic_ns():
+                # a late reply to a dropped request
+                owed[0] -= 1
+                if not owed[0]:
+                    del self._owed[cmd]
+                self.stale += 1
+                return False
+            del self._owed[cmd]
+        pending = self._pending.get(cmd)
+        if not pending:
+            self.unsolicited += 1
+            return False
+        request = next(iter(pending.values()))
+        n = request.received
+        request.replies[n].set_result(arg_dict)
+        request.received = n + 1
+        key = cmd if n == 0 else f"{cmd}/{n+1}"
+        latency = self.latency.get(key)
+        if latency is None:
+            latency = self.latency[key] = LatencyHistogram()
+        latency.record_ns(monotonic_ns() - request.sent_ns)
+        if request.received == len(request.replies):
+            del pending[request.seq]
+        return True
+
+    # Complete every reply of every request waiting for cmd, eg when a GOTO is aborted
+    def resolve_all(self, cmd: str, arg_dict: dict):
+        for request in self._pending.pop(cmd, {}).values():
+            self._owe(request)
+            for reply in request.replies:
+                if not reply.done():
+                    reply.set_result(arg_dict)
+
+    # Fail every request waiting for a reply, eg when the connection is lost
+    def cancel_all(self, exc: Exception):
+        pending, self._pending = self._pending, {}
+        self._owed.clear()                          # nothing more will arrive on the connection lost
+        for requests in pending.values():
+            for request in requests.values():
+                for reply in request.replies:
+                    if not reply.done():
+                        reply.set_exception(exc)
+                        reply.exception()           # mark retrieved, as nobody may be waiting for the later replies
+
+    # Wait for reply n of a request, raising PolarisTimeoutError if it hasn't arrived within timeout seconds
+    async def wait(self, request: PolarisRequest, n: int, timeout: float) -> dict:
+        try:
+            return await asyncio.wait_for(asyncio.shield(request.replies[n]), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.discard(request)
+            raise PolarisTimeoutError(f"No reply {n+1} to command {request.cmd} (seq {request.seq}) within {timeout}s")
+        except BaseException:
+            self.discard(request)
+            raise
+
+    # Send a command with send() and wait for its first reply, resending it up to retries times
+    async def call(self, request: PolarisRequest, send, timeout: float, retries: int = 0) -> dict:
+        try:
+            for attempt in range(retries + 1):
+                if attempt:
+                    self.retries += 1
+                request.sent_ns = monotonic_ns()
+                await send()
+                try:
+                    return await asyncio.wait_for(asyncio.shield(request.replies[0]), timeout)
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+        except BaseException:
+            self.discard(request)
+            raise
+        self.discard(request)
+        raise PolarisTimeoutError(f"No reply to command {request.cmd} (seq {request.seq}) after {retries + 1} attempts of {timeout}s")
+
+    def stats(self):
+        # (reply, LatencyHistogram) for each command code replied to
+        return sorted(self.latency.items())
+
+    def summary(self) -> str:
+        waiting = sum(len(p) for p in self._pending.values())
+        return f"{waiting} waiting | {self.timeouts} timeouts | {self.retries} retries | {self.unsolicited} unsolicited replies | {self.stale} stale replies"
+
+
+class PolarisCommand:
+    """Entry in the Polaris command dispatch table
+
+    ``handler(cmd, args)`` is called for each message received with the command
+    code. If ``parse_args`` is True the args are passed as the dict returned by
+    ``Polaris.polaris_parse_args()``, otherwise the args string is passed so
+    the handler can parse it lazily, or not at all. If ``decode`` is False the
+    args are passed as the raw bytes received. Counts the messages handled and
+    the cumulative time spent in the handler.
+
+    """
+    __slots__ = ('handler', 'parse_args', 'decode', 'count', 'total_ns')
+
+    def __init__(self, handler, parse_args: bool = True, decode: bool = True):
+        self.handler = handler
+        self.parse_args = parse_args
+        self.decode = decode
+        self.count = 0                              # number of messages handled
+        self.total_ns = 0                           # cumulative time spent in handler (ns)
+
+
+class PolarisState(NamedTuple):
+    """Immutable snapshot of the telescope position and motion state
+
+    A new snapshot is built and swapped into ``Polaris.state`` whenever the
+    position or motion state changes, so readers always see a coherent set of
+    values without taking any lock. ``seq`` increases by one with each snapshot
+    and ``timestamp`` is the unix time of the position update it was built from.
+
+    """
+    seq: int = 0
+    timestamp: float = 0.0
+    rightascension: float = 0.0                 # hours, ASCOM (synced) J2000
+    declination: float = 0.0                    # degrees, ASCOM (synced) J2000
+    altitude: float = 0.0                       # degrees, ASCOM (synced)
+    azimuth: float = 0.0                        # degrees, ASCOM (synced)
+    tracking: bool = False
+    slewing: bool = False
+    gotoing: bool = False
+    athome: bool = False
+    atpark: bool = False
+
 
 class Polaris:
     """Simulated telescope device that communicates with Polaris Device
     
     Properties and  methods generally follow the Alpaca interface.
-    Hopefully you are familiar with Python threading and the need to lock
-    shared data items.
+    All access must be from the asyncio event loop that runs the Alpaca
+    server, the Stellarium servers and ``client()``. None of the methods
+    that change several state items await between the changes, so readers
+    never see them half done. Readers that need a coherent set of position
+    and motion values should read the ``state`` snapshot once.
 
     **Mechanical vs Virtual Position**
 
@@ -98,30 +538,34 @@ class Polaris:
     # Only override __init_()  and run() (pydoc 17.1.2)
     #
     def __init__(self, logger: Logger):
-        self._lock = Lock()
         self.name: str = 'device'
         self.logger = logger
         #
         # Polaris device communications state variables
         #
-        self._reader = None                         # Stream to receive data from the Polaris device (opened by polaris.client())
-        self._writer = None                         # Stream to transmit data to the Polaris device (used by polaris.send_msg())
-        self._response_queues = {
-            '284': asyncio.Queue(),                 # queue for MODE result
-            '519': asyncio.Queue(),                 # queue for GOTO result (2 return msgs per GOTO)
-            '531': asyncio.Queue()                  # queue for TRACK result
-        }
+        self._writer = None                         # PolarisProtocol to transmit data to the Polaris device (opened by polaris.client(), written by the _send_queue writer task)
+        self._send_queue = PolarisSendQueue()       # Messages queued by polaris.send_msg() for the writer task
+        self._rpc = PolarisRPC()                    # Requests waiting for MODE ('284'), GOTO ('519', 2 replies per GOTO) and TRACK ('531') replies
         self._current_mode = -1                     # Current Mode of the Polaris Device (8 = Astro, 1=Photo, 2=Pano, 3=Focus, 4=Timelapse, 5=Pathlapse, 6=HDR, 7=HolyG 10=Video, )
-        self._polaris_msg_re = re.compile(r'^(\d\d\d)@([^#]*)#')
+        self._framer = PolarisFramer()              # Incremental framer for messages received from the Polaris device
+        self._recv_ns = 0                           # Monotonic time (ns) that the message being parsed was received
+        self._clock = MonotonicClock()              # Converts monotonic timestamps to wall clock time for the astronomy
+        self._latency_518 = LatencyHistogram()      # Latency from receiving a 518 message to updating the position state
+        self._estimator = PositionEstimator(Config.position_estimation_window, Config.position_estimation_order)  # Polaris alt/az between 518 updates
+        self._telemetry = TelemetryStore(Config.telemetry_samples)  # History of the 518 position updates
+        self._recorders = {}                        # TelemetryRecorder for each performance dataset recorded, opened on its first row
+        self._commands = self._command_table()      # Handlers for each message received from Polaris, keyed by command code
         self._every_50ms_msg_to_send = None         # Fast Move message to send every 50ms
         self._every_50ms_counter = 0                # Fast Move counter, incrementing every 50ms up to 1s
-        self._every_50ms_last_timestamp = None      # Fast Move counter, last 1s timestamp
+        self._every_50ms_last_ns = 0                # Fast Move counter, last 1s monotonic timestamp (ns)
         self._every_50ms_last_alt = None            # Fast Move counter, last 1s polaris altitude
         self._every_50ms_last_az = None             # Fast Move counter, last 1s polaris azimuth
         self._startup_timestamp = datetime.datetime.now()  # Timestamp for when the driver started.
-        self._performance_data_start_timestamp = None      # Timestamp for Performance Data logging.
-        self._last_518_timestamp = None                    # Timestamp for last 518 Position Update message from Polaris.
+        self._performance_data_start_ns = 0                # Monotonic timestamp (ns) for the start of Performance Data logging.
+        self._last_518_ns = 0                              # Monotonic timestamp (ns) the last 518 Position Update message from Polaris was received.
         self._task_exception = None                 # record of any exception from sub tasks
+        self._task_failed = None                    # asyncio.Event set with _task_exception, to wake read_msgs (created by polaris.client)
+        self._background_tasks = set()              # commands run in the background by run_in_background(), held until done
         self._task_errorstr = ''                    # record of any connection issues with polaris (reset at next attempt to reconnect)
         self._task_errorstr_last_attempt = ''       # record of any connection issues with polaris
         self._N_point_alignment_results = {}        # record of all sync results for N point alignment
@@ -138,6 +582,7 @@ class Polaris:
         self._observer.lat = deg2rad(self._sitelatitude)            # dms version on lat
         self._observer.long = deg2rad(self._sitelongitude)          # dms version of long
         self._observer.elevation = self._siteelevation              # site elevation
+        self._coords = CoordinateEngine(self._observer)             # Cached conversions for the 518 position path, recalibrated against _observer every second
         #
         # Telescope device completion flags
         #
@@ -150,6 +595,8 @@ class Polaris:
         self._slewing: bool = False                 # True if telescope is in the process of moving in response to one of the Goto methods or the MoveAxis(TelescopeAxes, Double) method, False at all other times.
         self._gotoing: bool = False                 # True if telescope is in the process of moving in response to one of the Goto methods, False at all other times.
         self._ispulseguiding: bool = False          # True if a PulseGuide(GuideDirections, Int32) command is in progress, False otherwise
+        self._state = PolarisState()                # Immutable snapshot of position and motion state, replaced (never modified) by _publish_state()
+        self._subscriptions = set()                 # Subscriptions pushed every new state snapshot, see subscribe()
         #
         # Telescope device state variables
         #
@@ -241,19 +688,35 @@ class Polaris:
         if Config.log_performance_data == 2 and not Config.log_performance_data_test == 2:
             background_driftcheck = asyncio.create_task(self.every_2min_drift_check())
             background_driftcheck.add_done_callback(self.task_done)
-
+        if Config.log_polaris_stats:
+            background_stats = asyncio.create_task(self._every_60s_log_stats())
+            background_stats.add_done_callback(self.task_done)
+        # calibrate the coordinate engine (and build its refraction table) now, not on the first 518 message
+        self._coords.sidereal_time(self._clock.now())
 
         while True:
             try:
                 self._connected = False             # set to true when "Polaris communication init... done"
                 self._task_exception = None
-                client_reader, client_writer = await asyncio.open_connection(Config.polaris_ip_address, Config.polaris_port)
-                self._reader = client_reader
-                self._writer = client_writer
+                self._task_failed = asyncio.Event()
+                self._framer.clear()
+                self._estimator.clear()
+                self._telemetry.clear()
+                loop = asyncio.get_running_loop()
+                _, protocol = await loop.create_connection(lambda: PolarisProtocol(self), Config.polaris_ip_address, Config.polaris_port)
+                self._writer = protocol
+                self._send_queue.clear()
+                send_task = asyncio.create_task(self._send_queue.writer(protocol))
+                send_task.add_done_callback(self.task_done)
                 logger.info(f'==STARTUP== Polaris Client on {Config.polaris_ip_address}:{Config.polaris_port}. ')
                 init_task = asyncio.create_task(self.polaris_init())
                 init_task.add_done_callback(self.task_done)
-                await self.read_msgs()
+                try:
+                    await self.read_msgs()
+                finally:
+                    send_task.cancel()
+                    protocol.close()
+                    self._rpc.cancel_all(ConnectionAbortedError('Polaris connection closed'))
 
             except ConnectionAbortedError as e:
                 self._task_errorstr = f'==STARTUP== The Polaris network connection was aborted.'
@@ -318,32 +781,62 @@ class Polaris:
                 await asyncio.sleep(2)
                 continue
 
+            except PolarisTimeoutError as e:
+                self._task_errorstr = f'==STARTUP== Polaris not replying. Resetting connection.'
+                logger.error(f'{self._task_errorstr} {e}')
+                await asyncio.sleep(2)
+                continue
+
     def task_done(self, task):
         # task.exception raises an exception if the task was cancelled, so only grab it if not cancelled.
         if not task.cancelled():
             # task.exception returns None if no exception
-            self._task_exception = task.exception()
-
-    async def send_msg(self, msg):
+            self.set_task_exception(task.exception())
+
+    # Record an exception from a sub task, and wake read_msgs to raise it for polaris.client
+    def set_task_exception(self, e):
+        self._task_exception = e
+        if e and self._task_failed:
+            self._task_failed.set()
+
+    # Run a command in the background for a caller that doesn't wait for it (eg an async GOTO). The task is
+    # held until done, and any exception logged as there is no caller to raise it to.
+    def run_in_background(self, coro, label: str):
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(lambda t: self._background_done(t, label))
+        return task
+
+    def _background_done(self, task, label: str):
+        self._background_tasks.discard(task)
+        if task.cancelled():
+            return
+        e = task.exception()
+        if isinstance(e, PolarisTimeoutError):
+            self.logger.error(f'->> Polaris: {label} timed out. {e}')
+        elif e:
+            self.logger.error(f'->> Polaris: {label} failed. {type(e).__name__}: {e}')
+
+    # Queue a message for the writer task, see PolarisSendQueue for the priorities
+    async def send_msg(self, msg, priority: int = PolarisSendQueue.NORMAL):
         if Config.log_polaris_protocol:
             self.logger.info(f'->> Polaris: send_msg: {msg}')
         if self._writer:
-            self._writer.write(msg.encode())
-            await self._writer.drain()
+            self._send_queue.put(msg.encode(), priority)
 
     async def _every_2s_watchdog_check(self):
         while True:
             try: 
                 # calculate age of last 518 message
-                curr_timestamp = datetime.datetime.now()
-                if not self._last_518_timestamp:
-                    self._last_518_timestamp = curr_timestamp
-                age_of_518 = (curr_timestamp - self._last_518_timestamp).total_seconds()
+                now_ns = monotonic_ns()
+                if not self._last_518_ns:
+                    self._last_518_ns = now_ns
+                age_of_518 = (now_ns - self._last_518_ns) / 1e9
 
                 # self.logger.info(f'->> Polaris: age_of_518 is {age_of_518}s.')
                 # if we dont have any updates, even after trying to restart AHRS, then reboot the connection
                 if self._connected and age_of_518 > 5:
-                    self._task_exception = WatchdogError("==ERROR==: No position update for over 5s. Rebooting Connection.")
+                    self.set_task_exception(WatchdogError("==ERROR==: No position update for over 5s. Rebooting Connection."))
 
                 # if we dont have any updates for over 2s, then restart AHRS.
                 if self._connected and age_of_518 > 2:
@@ -353,7 +846,7 @@ class Polaris:
                 await asyncio.sleep(2)
 
             except Exception as e:
-                self._task_exception = e
+                self.set_task_exception(e)
                 break
 
     async def every_2min_drift_check(self):
@@ -366,7 +859,26 @@ class Polaris:
                 else:
                     await asyncio.sleep(10)
             except Exception as e:
-                self._task_exception = e
+                self.set_task_exception(e)
+                break
+
+    async def _every_60s_log_stats(self):
+        while True:
+            try: 
+                await asyncio.sleep(60)
+                framer = self._framer
+                self.logger.info(f'->> Polaris: STATS recv {framer.frame_rate():.1f} frames/s | {framer.frames} frames | {framer.unmatched} unmatched | {framer.bytes_received} bytes received | {framer.bytes_copied} bytes copied')
+                self.logger.info(f'->> Polaris: STATS 518 recv to position update latency | {self._latency_518.summary()}')
+                self.logger.info(f'->> Polaris: STATS clock {self._clock.summary()}')
+                self.logger.info(f'->> Polaris: STATS send {self._send_queue.summary()}')
+                self.logger.info(f'->> Polaris: STATS rpc {self._rpc.summary()}')
+                for reply, latency in self._rpc.stats():
+                    self.logger.info(f'->> Polaris: STATS rpc {reply} send to reply latency | {latency.summary()}')
+                for cmd, count, total_ms in self.command_stats():
+                    self.logger.info(f'->> Polaris: STATS cmd {cmd} | {count} msgs | {total_ms:.1f}ms total | {total_ms/count*1000:.1f}us per msg')
+
+            except Exception as e:
+                self.set_task_exception(e)
                 break
 
     async def _every_15s_send_polaris_keepalive(self):
@@ -377,7 +889,7 @@ class Polaris:
                 await asyncio.sleep(15)
 
             except Exception as e:
-                self._task_exception = e
+                self.set_task_exception(e)
                 break
 
     async def every_50ms_send_message(self):
@@ -386,10 +898,10 @@ class Polaris:
                 await self.every_50ms_counter_check()
                 msg = self._every_50ms_msg_to_send
                 if (msg):
-                    await self.send_msg(msg)
+                    await self.send_msg(msg, PolarisSendQueue.REPEAT)
                 await asyncio.sleep(0.05)
             except Exception as e:
-                self._task_exception = e
+                self.set_task_exception(e)
                 break
 
     async def every_50ms_counter_check(self):
@@ -402,11 +914,11 @@ class Polaris:
 
             # if we want to log performance data around speed travelled
             if (Config.log_performance_data == 3):
-                curr_timestamp = datetime.datetime.now()
-                last_timestamp = self._every_50ms_last_timestamp
-                time = self.get_performance_data_time()
+                now_ns = monotonic_ns()
+                last_ns = self._every_50ms_last_ns
+                time = self.get_performance_data_time(now_ns)
                 # if we have a last recording
-                if last_timestamp:
+                if last_ns:
                     r_curr = self._axis_ASCOM_slewing_rates
                     r_last = self._every_50ms_last_a_rates
                     r_constant = (r_curr[0] == r_last[0] and r_curr[1] == r_last[1] and r_curr[2] == r_last[2])
@@ -415,12 +927,15 @@ class Polaris:
                     d_alt = (self._p_altitude - self._every_50ms_last_p_altitude + 180) % 360 - 180
                     d_az = (self._p_azimuth - self._every_50ms_last_p_azimuth + 180) % 360 - 180
                     d_total = math.sqrt(d_alt*d_alt + d_az*d_az)
-                    d_sec = (curr_timestamp - last_timestamp).total_seconds()
-                    if d_sec>0:
+                    d_sec = (now_ns - last_ns) / 1e9
+                    recorder = self.performance_recorder('DATA3')
+                    if d_sec>0 and recorder:
+                        recorder.append(self._clock.wall(now_ns), time, d_sec, r_constant, r_curr[0], d_az/d_sec, r_curr[1], d_alt/d_sec, d_ra/d_sec, d_dec/d_sec, d_total/d_sec)
+                    elif d_sec>0:
                         self.logger.info(f",DATA3,{time:.3f},{d_sec:.2f},{r_constant},{r_curr[0]:.2f},{d_az/d_sec:.7f},{r_curr[1]:.2f},{d_alt/d_sec:.7f},{d_ra/d_sec:.7f},{d_dec/d_sec:.7f},'{deg2dms(d_total/d_sec)}'")
 
                 # Store values for next run
-                self._every_50ms_last_timestamp = curr_timestamp
+                self._every_50ms_last_ns = now_ns
                 self._every_50ms_last_p_rightascension = self._p_rightascension
                 self._every_50ms_last_p_declination = self._p_declination
                 self._every_50ms_last_p_altitude = self._p_altitude
@@ -428,22 +943,29 @@ class Polaris:
                 self._every_50ms_last_a_rates = self._axis_ASCOM_slewing_rates.copy()
 
     def every_50ms_msg_to_set(self, msg):
-        self._lock.acquire()
         self._every_50ms_msg_to_send = msg
-        self._lock.release()
     
     def every_50ms_msg_to_clear(self):
-        self._lock.acquire()
         self._every_50ms_msg_to_send = None
-        self._lock.release()
 
-    def get_performance_data_time(self):
-        dt_now = datetime.datetime.now()
-        if not self._performance_data_start_timestamp:
-            self._performance_data_start_timestamp = dt_now
-        time = (dt_now - self._performance_data_start_timestamp).total_seconds()
+    # Seconds since performance data logging started, at monotonic time t_ns (default now)
+    def get_performance_data_time(self, t_ns: int = None):
+        t_ns = monotonic_ns() if t_ns is None else t_ns
+        if not self._performance_data_start_ns:
+            self._performance_data_start_ns = t_ns
+        time = (t_ns - self._performance_data_start_ns) / 1e9
         return time
 
+    # The recorder for a performance dataset ('DATA1' ... 'DATA4'), or None to log it as CSV lines
+    def performance_recorder(self, dataset: str):
+        recorder = self._recorders.get(dataset)
+        if recorder is None and Config.log_performance_data_format == 'binary':
+            logdir = Config.log_dir if Config.log_dir else '.'
+            recorder = TelemetryRecorder(os.path.join(logdir, f'alpaca.{dataset}.tlm'), dataset, Config.num_keep_logs)
+            atexit.register(recorder.close)
+            self._recorders[dataset] = recorder
+        return recorder
+
     def radec2altaz(self, ra, dec, inthefuture=0, epoch=ephem.J2000):
         target = ephem.FixedBody()
         target._ra = hr2rad(ra)
@@ -463,6 +985,77 @@ class Polaris:
         dec = rad2deg(dec_rad)
         return ra, dec
 
+    # Fast versions of radec2altaz/altaz2radec for the 518 position path, for unix time t
+    def fast_radec2altaz(self, ra, dec, t):
+        alt, az = self._coords.radec2altaz(hr2rad(ra), deg2rad(dec), t)
+        return rad2deg(alt), rad2deg(az)
+
+    def fast_altaz2radec(self, alt, az, t):
+        ra, dec = self._coords.altaz2radec(deg2rad(alt), deg2rad(az), t)
+        return rad2hr(ra), rad2deg(dec)
+
+    # Convert a Polaris alt/az at unix time t to (p_ra, p_dec, a_ra, a_dec, a_alt, a_az) with the sync pointing model
+    def polaris2ascom(self, p_alt, p_az, t):
+        p_ra, p_dec = self.fast_altaz2radec(p_alt, p_az, t)
+        if Config.sync_pointing_model==1:
+            # Use RA/Dec Sync Pointing model
+            a_ra, a_dec = self.radec_polaris2ascom(p_ra, p_dec)
+            a_alt, a_az = self.fast_radec2altaz(a_ra, a_dec, t)
+        else:
+            # Use Alt/Az Sync Pointing model
+            a_alt, a_az = self.altaz_polaris2ascom(p_alt, p_az)
+            a_ra, a_dec= self.fast_altaz2radec(a_alt, a_az, t)
+        return p_ra, p_dec, a_ra, a_dec, a_alt, a_az
+
+    # The state with the position estimated for monotonic time t_ns (default now) from the recent
+    # 518 updates, and the uncertainty of the estimate (arc seconds)
+    def estimate_state(self, t_ns: int = None):
+        t_ns = monotonic_ns() if t_ns is None else t_ns
+        state = self._state
+        est = self._estimator.estimate(t_ns)
+        t = self._clock.wall(t_ns)
+        _, _, a_ra, a_dec, a_alt, a_az = self.polaris2ascom(est.altitude, est.azimuth, t)
+        return state._replace(timestamp=t, rightascension=a_ra, declination=a_dec, altitude=a_alt, azimuth=a_az), est.sigma
+
+    # The state to report the position from: estimated for now if position_estimation is enabled, otherwise the last 518 update
+    def position_state(self) -> PolarisState:
+        if Config.position_estimation and self._estimator.samples:
+            return self.estimate_state()[0]
+        return self._state
+
+    # Build a new state snapshot from the current values and swap it in. A single
+    # attribute assignment, so a reader sees either the previous or the new snapshot.
+    def _publish_state(self, timestamp: float = None):
+        prev = self._state
+        self._state = PolarisState(
+            prev.seq + 1, prev.timestamp if timestamp is None else timestamp,
+            self._rightascension, self._declination, self._altitude, self._azimuth,
+            self._tracking, self._slewing, self._gotoing, self._athome, self._atpark)
+        for subscription in self._subscriptions:
+            subscription.publish(self._state)
+
+    # Push channel for consumers that want every state change rather than polling. Each
+    # subscriber gets at most max_rate snapshots per second, always the latest one, so a
+    # slow subscriber skips snapshots instead of holding up the 518 receive path.
+    def subscribe(self, max_rate: float = 0) -> Subscription:
+        subscription = Subscription(max_rate)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscriptions.discard(subscription)
+
+    # Batch versions of radec2altaz/altaz2radec for arrays of positions (hours/degrees) and unix times t (default now)
+    def radec2altaz_array(self, ra, dec, t=None):
+        t = self._clock.now() if t is None else t
+        alt, az = self._coords.radec2altaz_array(np.radians(np.asarray(ra) * 15), np.radians(dec), t)
+        return np.degrees(alt), np.degrees(az)
+
+    def altaz2radec_array(self, alt, az, t=None):
+        t = self._clock.now() if t is None else t
+        ra, dec = self._coords.altaz2radec_array(np.radians(alt), np.radians(az), t)
+        return np.degrees(ra) / 15, np.degrees(dec)
+
     def radec_sync_reset(self):
         self._adj_sync_rightascension = 0
         self._adj_sync_declination = 0
@@ -523,6 +1116,7 @@ class Polaris:
         self._targetdeclination = a_dec
         self._altitude = a_alt
         self._azimuth = a_az
+        self._publish_state()
 
         if Config.sync_pointing_model==0 and Config.sync_N_point_alignment:
             # Record all synctocordinates results
@@ -547,39 +1141,39 @@ class Polaris:
 
         return
 
+    # Supervise the connection. Messages are dispatched by data_received() as they arrive.
     async def read_msgs(self):
-        buffer = ""
+        closed = self._writer.closed
         while True:
-            # read protocol from Polaris, adding it to the buffer
-            if self._reader:
-                data = await self._reader.read(1024)
-                if data:
-                    buffer += data.decode()
-
             # raise any subtask exceptions so polaris.client can pick them up
             if  self._task_exception:
                 raise self._task_exception
-                   
-            # parse all the messages in the buffer
-            while buffer:
-                cmd, args, buffer = self.parse_msg(buffer)
-                if cmd:
-                    if Config.log_polaris_protocol and not((cmd == "518" or cmd == "284" or cmd == "525") and Config.supress_polaris_frequent_msgs):
-                        self.logger.info(f'<<- Polaris: recv_msg: {cmd}@{args}#')
-                    self.polaris_parse_cmd(cmd, args)
-            else:
-                # dont overload the platform trying to read data from polaris too quickly
-                await asyncio.sleep(0.05)
-
-    # Parse a buffer returning a matched (cmd, args, remainingbuffer) or a cleared remaining buffer (False, False, "")
-    def parse_msg(self, buffer):
-        m = self._polaris_msg_re.match(buffer)
-        if m:
-            return (m.group(1), m.group(2), buffer[len(m.group(0)):])
-        else:
-            if Config.log_polaris and Config.log_polaris_protocol:
-                self.logger.info(f"<<- Polaris: Unmatched msg: {buffer}")
-            return (False, False, "")
+            # raise the connection error once the connection is lost
+            if closed.done():
+                raise closed.result()
+            # wait for either, rather than polling for sub task exceptions
+            self._task_failed.clear()
+            failed = asyncio.ensure_future(self._task_failed.wait())
+            try:
+                await asyncio.wait([closed, failed], return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                failed.cancel()
+
+    # Called by PolarisProtocol for all data received from the Polaris
+    def data_received(self, data, recv_ns):
+        self._recv_ns = recv_ns
+        try:
+            for cmd, args in self._framer.feed(data):
+                if not cmd:
+                    if Config.log_polaris and Config.log_polaris_protocol:
+                        self.logger.info(f"<<- Polaris: Unmatched msg: {args.decode('utf-8', 'replace')}")
+                    continue
+                if Config.log_polaris_protocol and not((cmd == "518" or cmd == "284" or cmd == "525") and Config.supress_polaris_frequent_msgs):
+                    self.logger.info(f"<<- Polaris: recv_msg: {cmd}@{args.decode('utf-8', 'replace')}#")
+                self.polaris_parse_cmd(cmd, args)
+        except Exception as e:
+            # pass on to polaris.client via read_msgs
+            self.set_task_exception(e)
 
     def polaris_parse_args(self, args_str):
         # chop the last ";" and split
@@ -590,141 +1184,128 @@ class Polaris:
             arg_dict[name] = value
         return arg_dict
 
+    # Dispatch a message received from Polaris (args as raw bytes) to its handler in the command table
     def polaris_parse_cmd(self, cmd, args):
-        # return result of MODE request {} 
-        if cmd == "284":
-            arg_dict = self.polaris_parse_args(args)
-            self._lock.acquire()
-            self._current_mode = int(arg_dict['mode'])
-            self._tracking = bool(arg_dict['track'] == '1') if 'track' in arg_dict else False
-            self._lock.release()
-            if Config.log_polaris and not Config.supress_polaris_frequent_msgs:
-                self.logger.info(f"<<- Polaris: MODE status changed: {cmd} {arg_dict}")
-            if cmd in self._response_queues:
-                self._response_queues[cmd].put_nowait(arg_dict)
-
-        # return result of POSITION update from AHRS {} 
-        elif cmd == "518":
-            dt_now = datetime.datetime.now()
-            self._last_518_timestamp = dt_now
-            arg_dict = self.polaris_parse_args(args)
-            p_az = float(arg_dict['compass'])
-            p_alt = -float(arg_dict['alt'])
-            self._lock.acquire()
-            self._p_altitude = p_alt
-            self._p_azimuth = p_az
-            p_ra, p_dec = self.altaz2radec(p_alt, p_az)
-            self._p_rightascension = p_ra 
-            self._p_declination = p_dec
-            self._lock.release()
-            if Config.sync_pointing_model==1:
-                # Use RA/Dec Sync Pointing model
-                a_ra, a_dec = self.radec_polaris2ascom(p_ra, p_dec)
-                self._rightascension = a_ra 
-                self._declination = a_dec
-                a_alt, a_az = self.radec2altaz(a_ra, a_dec)
-                self._altitude = a_alt
-                self._azimuth = a_az
+        command = self._commands.get(cmd)
+        if command is None:
+            # return result of unrecognised msg
+            if Config.log_polaris and not Config.log_polaris_protocol:
+                self.logger.info(f"<<- Polaris: response to command received: {cmd} {args.decode('utf-8', 'replace')}")
+            return
+        t0 = perf_counter_ns()
+        if command.decode:
+            args = args.decode('utf-8', 'replace')
+            if command.parse_args:
+                args = self.polaris_parse_args(args)
+        command.handler(cmd, args)
+        command.count += 1
+        command.total_ns += perf_counter_ns() - t0
+
+    # return result of MODE request {} 
+    def _recv_284_mode(self, cmd, arg_dict):
+        self._current_mode = int(arg_dict['mode'])
+        self._tracking = bool(arg_dict['track'] == '1') if 'track' in arg_dict else False
+        self._publish_state()
+        if Config.log_polaris and not Config.supress_polaris_frequent_msgs:
+            self.logger.info(f"<<- Polaris: MODE status changed: {cmd} {arg_dict}")
+        self._rpc.resolve(cmd, arg_dict)
+
+    # return result of POSITION update from AHRS {}, converted at the time it was received
+    def _recv_518_position(self, cmd, args):
+        recv_ns = self._recv_ns
+        self._last_518_ns = recv_ns
+        t_now = self._clock.wall(recv_ns)
+        compass, alt = parse_518_position(args)
+        p_az = compass
+        p_alt = -alt
+        self._p_altitude = p_alt
+        self._p_azimuth = p_az
+        if Config.position_estimation:
+            self._estimator.add(recv_ns, p_alt, p_az)     # only fitted when used, it is the costliest step here
+        p_ra, p_dec, a_ra, a_dec, a_alt, a_az = self.polaris2ascom(p_alt, p_az, t_now)
+        self._p_rightascension = p_ra 
+        self._p_declination = p_dec
+        self._rightascension = a_ra 
+        self._declination = a_dec
+        self._altitude = a_alt
+        self._azimuth = a_az
+        self._publish_state(t_now)
+        self._telemetry.append(recv_ns, p_alt, p_az, a_ra, a_dec, self._tracking, self._slewing)
+        self._latency_518.record_ns(monotonic_ns() - recv_ns)
+
+        # if we ant to log position data
+        if Config.log_performance_data == 4:
+            a_slew = self._slewing
+            a_goto = self._gotoing
+            a_track = self.tracking
+            t_ra = self._targetrightascension if self._targetrightascension else a_ra       # Target Right Ascention (hours)
+            t_dec = self._targetdeclination if self._targetdeclination else a_dec           # Target Declination (degrees)
+            e_ra = clamparcsec((t_ra - a_ra)*3600*360/24)                                   # Error Right Ascention (arc seconds)
+            e_dec = clamparcsec((t_dec - a_dec)*3600)                                       # Error Declination (arc seconds)
+            time = self.get_performance_data_time(recv_ns)
+            recorder = self.performance_recorder('DATA4')
+            if recorder:
+                recorder.append(t_now, time, a_track, a_slew, a_goto, t_ra, t_dec, a_ra, a_dec, a_az, a_alt, e_ra, e_dec)
             else:
-                # Use Alt/Az Sync Pointing model
-                a_alt, a_az = self.altaz_polaris2ascom(p_alt, p_az)
-                self._altitude = a_alt
-                self._azimuth = a_az
-                a_ra, a_dec= self.altaz2radec(a_alt, a_az)
-                self._rightascension = a_ra 
-                self._declination = a_dec
-
-            # if we ant to log position data
-            if Config.log_performance_data == 4:
-                a_slew = self._slewing
-                a_goto = self._gotoing
-                a_track = self.tracking
-                t_ra = self._targetrightascension if self._targetrightascension else a_ra       # Target Right Ascention (hours)
-                t_dec = self._targetdeclination if self._targetdeclination else a_dec           # Target Declination (degrees)
-                e_ra = clamparcsec((t_ra - a_ra)*3600*360/24)                                   # Error Right Ascention (arc seconds)
-                e_dec = clamparcsec((t_dec - a_dec)*3600)                                       # Error Declination (arc seconds)
-                time = self.get_performance_data_time()
                 self.logger.info(f",DATA4,{time:.3f},{a_track},{a_slew},{a_goto},{t_ra:.7f},{t_dec:.7f},{a_ra:.7f},{a_dec:.7f},{a_az:.7f},{a_alt:.7f},{e_ra:.3f},{e_dec:.3f}")
 
-        # return result of GOTO request {'ret': 'X', 'track': '1'}  X=1 (starting slew), X=2 (stopping slew)
-        elif cmd == "519":
-            arg_dict = self.polaris_parse_args(args)
-            if cmd in self._response_queues:
-                self._response_queues[cmd].put_nowait(arg_dict)
-
-        # return result of UNKNOWN command SP_SendMsgToApp success;type[2],code[525],val[Tempa509ca361d0000265a ;]
-        elif cmd == "525":
-            if Config.log_polaris and not Config.supress_polaris_frequent_msgs:
-                self.logger.info(f"<<- Polaris: 525 status changed: {cmd} {args}")
-
-        # return result of TRACK change request {'ret': 'X'} where X=0 (NoTracking), X=1 (Tracking)
-        elif cmd == "531":
-            arg_dict = self.polaris_parse_args(args)
-            self._lock.acquire()
-            self._tracking = (arg_dict['ret'] == '1')
-            self._lock.release()
-            if Config.log_polaris:
-                self.logger.info(f"<<- Polaris: TRACK status changed: {cmd} {arg_dict}")
-            if cmd in self._response_queues:
-                self._response_queues[cmd].put_nowait(arg_dict)
-
-        # return result of FILE request {'type':1; 'class':0; 'path':'/app/sd/normal/SP_0052.jpg'; 'size':'916156'; 'cTime':'2023-10-24 22:33:12'; 'duration':'0'} 
-        elif cmd == "771":
-            arg_dict = self.polaris_parse_args(args)
-            if Config.log_polaris:
-                self.logger.info(f"<<- Polaris: FILE status changed: {cmd} {arg_dict}")
-
-        # return result of STORAGE request {'status': '1', 'totalspace': '30420', 'freespace': '30163', 'usespace': '256'} 
-        elif cmd == "775":
-            arg_dict = self.polaris_parse_args(args)
-            if Config.log_polaris:
-                self.logger.info(f"<<- Polaris: STORAGE status changed: {cmd} {arg_dict}")
-
-        # return result of BATTTERY request {'capacity': 'X', 'charge': 'Y'}  X=batttery%, Y=1 (charging), Y=0 (draining)
-        elif cmd == "778":
-            arg_dict = self.polaris_parse_args(args)
-            if Config.log_polaris:
-                self.logger.info(f"<<- Polaris: BATTERY status changed: {cmd} {arg_dict}")
-
-        # return result of VERSION request {'hw':'1.3.1.4'; 'sw': '6.0.0.40'; 'exAxis':'1.0.2.11'; 'sv':'1'} 
-        elif cmd == "780":
-            arg_dict = self.polaris_parse_args(args)
-            if Config.log_polaris:
-                self.logger.info(f"<<- Polaris: VERSION status changed: {cmd} {arg_dict}")
-
-        # return result of SECURITY request {'step': '1', 'password': 'YmVucm8=', 'securityQ': '2', 'securityA': 'QnJhaW4='}
-        elif cmd == "790":
-            arg_dict = self.polaris_parse_args(args)
-            if Config.log_polaris:
-                self.logger.info(f"<<- Polaris: SECURITY status changed: {cmd} {arg_dict}")
+    # return result of GOTO request {'ret': 'X', 'track': '1'}  X=1 (starting slew), X=2 (stopping slew)
+    def _recv_519_goto(self, cmd, arg_dict):
+        self._rpc.resolve(cmd, arg_dict)
 
-        # return result of WIFI request {'band': '1'}
-        elif cmd == "802":
-            arg_dict = self.polaris_parse_args(args)
-            if Config.log_polaris:
-                self.logger.info(f"<<- Polaris: WIFI status changed: {cmd} {arg_dict}")
-
-        # return result of Connection request result {'ret': '0'}
-        elif cmd == "808":
-            arg_dict = self.polaris_parse_args(args)
-            if Config.log_polaris and Config.log_polaris_protocol:
-                self.logger.info(f"<<- Polaris: Connection request result: {cmd} {arg_dict}")
-
-        # return result of Position Updaten request result {'ret': '1'}
-        elif cmd == "520":
-            arg_dict = self.polaris_parse_args(args)
-            if Config.log_polaris and Config.log_polaris_protocol:
-                self.logger.info(f"<<- Polaris: Position Update request result: {cmd} {arg_dict}")
+    # return result of UNKNOWN command SP_SendMsgToApp success;type[2],code[525],val[Tempa509ca361d0000265a ;]
+    def _recv_525_unknown(self, cmd, args):
+        if Config.log_polaris and not Config.supress_polaris_frequent_msgs:
+            self.logger.info(f"<<- Polaris: 525 status changed: {cmd} {args}")
 
+    # return result of TRACK change request {'ret': 'X'} where X=0 (NoTracking), X=1 (Tracking)
+    def _recv_531_track(self, cmd, arg_dict):
+        self._tracking = (arg_dict['ret'] == '1')
+        self._publish_state()
+        if Config.log_polaris:
+            self.logger.info(f"<<- Polaris: TRACK status changed: {cmd} {arg_dict}")
+        self._rpc.resolve(cmd, arg_dict)
+
+    # Create a handler for messages that are only logged, parsing the args only if they will be logged
+    def _recv_log_only(self, description: str, log_protocol: bool = False):
+        def handler(cmd, args):
+            if Config.log_polaris and (Config.log_polaris_protocol or not log_protocol):
+                self.logger.info(f"<<- Polaris: {description}: {cmd} {self.polaris_parse_args(args)}")
+        return handler
+
+    # Table of handlers for each message received from Polaris
+    def _command_table(self) -> dict:
+        return {
+            '518': PolarisCommand(self._recv_518_position, decode=False),
+            '284': PolarisCommand(self._recv_284_mode),
+            '525': PolarisCommand(self._recv_525_unknown, parse_args=False),
+            '519': PolarisCommand(self._recv_519_goto),
+            '531': PolarisCommand(self._recv_531_track),
+            # return result of FILE request {'type':1; 'class':0; 'path':'/app/sd/normal/SP_0052.jpg'; 'size':'916156'; 'cTime':'2023-10-24 22:33:12'; 'duration':'0'} 
+            '771': PolarisCommand(self._recv_log_only('FILE status changed'), parse_args=False),
+            # return result of STORAGE request {'status': '1', 'totalspace': '30420', 'freespace': '30163', 'usespace': '256'} 
+            '775': PolarisCommand(self._recv_log_only('STORAGE status changed'), parse_args=False),
+            # return result of BATTTERY request {'capacity': 'X', 'charge': 'Y'}  X=batttery%, Y=1 (charging), Y=0 (draining)
+            '778': PolarisCommand(self._recv_log_only('BATTERY status changed'), parse_args=False),
+            # return result of VERSION request {'hw':'1.3.1.4'; 'sw': '6.0.0.40'; 'exAxis':'1.0.2.11'; 'sv':'1'} 
+            '780': PolarisCommand(self._recv_log_only('VERSION status changed'), parse_args=False),
+            # return result of SECURITY request {'step': '1', 'password': 'YmVucm8=', 'securityQ': '2', 'securityA': 'QnJhaW4='}
+            '790': PolarisCommand(self._recv_log_only('SECURITY status changed'), parse_args=False),
+            # return result of WIFI request {'band': '1'}
+            '802': PolarisCommand(self._recv_log_only('WIFI status changed'), parse_args=False),
+            # return result of Connection request result {'ret': '0'}
+            '808': PolarisCommand(self._recv_log_only('Connection request result', log_protocol=True), parse_args=False),
+            # return result of Position Updaten request result {'ret': '1'}
+            '520': PolarisCommand(self._recv_log_only('Position Update request result', log_protocol=True), parse_args=False),
+        }
 
-        # return result of unrecognised msg
-        else:
-            if Config.log_polaris and not Config.log_polaris_protocol:
-                self.logger.info(f"<<- Polaris: response to command received: {cmd} {args}")
+    def command_stats(self) -> list:
+        # per command (cmd, count, total handler time ms), busiest first
+        stats = [(cmd, c.count, c.total_ns / 1e6) for cmd, c in self._commands.items() if c.count]
+        return sorted(stats, key=lambda x: x[2], reverse=True)
 
 
     def aim_altaz_log_result(self):
-        self._lock.acquire()
         a_alt = self._aim_altitude
         a_az = self._aim_azimuth
         err_alt = self._aim_altitude - self._altitude
@@ -736,21 +1317,22 @@ class Polaris:
              self._adj_azimuth = self._adj_azimuth + err_az
         adj_alt = self._adj_altitude
         adj_az = self._adj_azimuth
-        self._lock.release()
         time = self.get_performance_data_time()
         self.logger.info(f"->> Polaris: GOTO AimOffset (Az {deg2dms(adj_az)} Alt {deg2dms(adj_alt)}) | Error Az {err_az*3600:.3f} Alt {err_alt*3600:.3f}")
         # if we want to log Aim data
         if Config.log_performance_data == 1:
-            self.logger.info(f",DATA1,{time:.3f},{a_az:.7f},{a_alt:.7f},{adj_az:.7f},{adj_alt:.7f},{err_az*3600:.3f},{err_alt*3600:.3f}")
+            recorder = self.performance_recorder('DATA1')
+            if recorder:
+                recorder.append(self._clock.now(), time, a_az, a_alt, adj_az, adj_alt, err_az*3600, err_alt*3600)
+            else:
+                self.logger.info(f",DATA1,{time:.3f},{a_az:.7f},{a_alt:.7f},{adj_az:.7f},{adj_alt:.7f},{err_az*3600:.3f},{err_alt*3600:.3f}")
 
     def aim_altaz_log_and_correct(self, alt: float, az:float):
         # log the original aiming co-ordinates and grab the last error ajustments
-        self._lock.acquire()
         self._aim_altitude = alt
         self._aim_azimuth = az
         adj_alt = self._adj_altitude
         adj_az = self._adj_azimuth
-        self._lock.release()
 
         # ajust the aiming altaz and clap az being sent to the Polaris -180° < polaris_az < 180°
         calt = alt + adj_alt if Config.aiming_adjustment_enabled else alt
@@ -763,44 +1345,38 @@ class Polaris:
         state = 1 if tracking else 0
         if Config.log_polaris:
             self.logger.info(f"->> Polaris: TRACK request change to {state}")
-        empty_queue(self._response_queues[cmd])
-        await self.send_msg(f"1&{cmd}&3&state:{state};speed:0;#")
-        await self._response_queues[cmd].get() 
+        msg = f"1&{cmd}&3&state:{state};speed:0;#"
+        await self._rpc.call(self._rpc.request(cmd), lambda: self.send_msg(msg), Config.polaris_reply_timeout, Config.polaris_reply_retries)
 
     # Abort Slew
     # eg state:0;yaw:0.0;pitch:0.0;lat:-33.655422;track:0;speed:0;lng:151.12244;
     async def send_cmd_goto_abort(self):
-        self._lock.acquire()
         self._slewing = False
         self._gotoing = False
-        self._lock.release()
+        self._publish_state()
         # log the command
         if Config.log_polaris:
             self.logger.info(f"->> Polaris: GOTO ABORT")
         arg_dict = {'ret': '-1', 'track': '-1'}
         cmd = '519'
         msg = f"1&{cmd}&3&state:0;yaw:0.0;pitch:0.0;lat:{self._sitelatitude:.5f};track:0;speed:0;lng:{self._sitelongitude:.5f};#"
-        await self.send_msg(msg)
-        self._response_queues[cmd].put_nowait(arg_dict)
-        self._response_queues[cmd].put_nowait(arg_dict)
+        await self.send_msg(msg, PolarisSendQueue.URGENT)
+        self._rpc.resolve_all(cmd, arg_dict)
 
     # Assumes polaris altaz
     async def send_cmd_goto_altaz(self, alt, az, istracking = True):
-        self._lock.acquire()
         currently_slewing = self._slewing
         currently_gotoing = self._gotoing
         currently_tracking = self._tracking
-        self._lock.release()
 
         # if we are currently slewing or gotoing, dont try again
         if currently_slewing or currently_gotoing:
             return
 
         # Mark that we are gotoing and slewing
-        self._lock.acquire()
         self._slewing = True
         self._gotoing = True
-        self._lock.release()
+        self._publish_state()
 
         # log the command
         if Config.log_polaris:
@@ -809,35 +1385,35 @@ class Polaris:
         # log the aiming alt/az and correct it based on previous aiming results
         calt, caz = self.aim_altaz_log_and_correct(alt, az)
 
-        # if we are currently sidereal tracking then turn off tracking
-        if currently_tracking:
-            await self.send_cmd_change_tracking_state(False)
+        try:
+            # if we are currently sidereal tracking then turn off tracking
+            if currently_tracking:
+                await self.send_cmd_change_tracking_state(False)
 
-        # compose and send the GOTO message
-        finaltrack = 1 if istracking else 0
-        cmd = '519'
-        msg = f"1&{cmd}&3&state:1;yaw:{caz:.5f};pitch:{calt:.5f};lat:{self._sitelatitude:.5f};track:{finaltrack};speed:0;lng:{self._sitelongitude:.5f};#"
-        empty_queue(self._response_queues[cmd])
-        await self.send_msg(msg)
+            # compose and send the GOTO message
+            finaltrack = 1 if istracking else 0
+            cmd = '519'
+            msg = f"1&{cmd}&3&state:1;yaw:{caz:.5f};pitch:{calt:.5f};lat:{self._sitelatitude:.5f};track:{finaltrack};speed:0;lng:{self._sitelongitude:.5f};#"
+            request = self._rpc.request(cmd, replies=2)
 
-        # Wait for 1st response of slew started
-        ret_dict = await self._response_queues[cmd].get()
-        if Config.log_polaris:
-            self.logger.info(f"<<- Polaris: GOTO starting slew: {cmd} {ret_dict}")
-            
-        # wait for 2nd response of slew stopped
-        ret_dict = await self._response_queues[cmd].get()
-        if Config.log_polaris:
-            self.logger.info(f"<<- Polaris: GOTO stopping slew: {cmd} {ret_dict}")
+            # Wait for 1st response of slew started. Never resent, as a second GOTO would be replied to as well.
+            ret_dict = await self._rpc.call(request, lambda: self.send_msg(msg), Config.polaris_reply_timeout, retries=0)
+            if Config.log_polaris:
+                self.logger.info(f"<<- Polaris: GOTO starting slew: {cmd} {ret_dict}")
+
+            # wait for 2nd response of slew stopped
+            ret_dict = await self._rpc.wait(request, 1, Config.polaris_goto_timeout)
+            if Config.log_polaris:
+                self.logger.info(f"<<- Polaris: GOTO stopping slew: {cmd} {ret_dict}")
 
-        # wait for sidereal tracking to settle
-        await asyncio.sleep(Config.tracking_settle_time)
+            # wait for sidereal tracking to settle
+            await asyncio.sleep(Config.tracking_settle_time)
 
-        # mark the slew as complete      
-        self._lock.acquire()
-        self._slewing = False
-        self._gotoing = False
-        self._lock.release()
+        finally:
+            # mark the slew as complete (or failed)
+            self._slewing = False
+            self._gotoing = False
+            self._publish_state()
         if Config.log_polaris:
             self.logger.info(f"<<- Polaris: GOTO slew complete")
 
@@ -886,9 +1462,7 @@ class Polaris:
             self.logger.info(f"->> Polaris: MODE query status info request")
         cmd = '284'
         msg = f"1&{cmd}&2&-1#"
-        empty_queue(self._response_queues[cmd])
-        await self.send_msg(msg)
-        ret_dict = await self._response_queues[cmd].get()
+        ret_dict = await self._rpc.call(self._rpc.request(cmd), lambda: self.send_msg(msg), Config.polaris_reply_timeout, Config.polaris_reply_retries)
         return ret_dict
 
     async def send_cmd_query_current_mode_async(self):
@@ -967,10 +1541,8 @@ class Polaris:
             # await self.send_cmd_524()
             # await self.send_cmd_305()
             # await self.send_cmd_780()
-            self._lock.acquire()
             self._connected = True
             self._task_errorstr = ''
-            self._lock.release()
             # if we want to run Aim test or Drift test over a set of targets in the sky
             if Config.log_performance_data_test == 1 or Config.log_performance_data_test == 2:
                 asyncio.create_task(self.goto_tracking_test())
@@ -1032,19 +1604,29 @@ class Polaris:
         a0_ra = self._rightascension
         a0_dec = self._declination
         a0_track = self.tracking
-        t0 = datetime.datetime.now()
+        t0_ns = monotonic_ns()
         await asyncio.sleep(duration)
         a1_ra = self._rightascension
         a1_dec = self._declination
         a1_track = self.tracking
-        t1 = datetime.datetime.now()
-        d_t = (t1 - t0).total_seconds()
-        d_ra = clamparcsec((a0_ra - a1_ra)*3600/24*360)/d_t*60
-        d_dec = clamparcsec((a0_dec - a1_dec)*3600)/d_t*60
+        d_t = (monotonic_ns() - t0_ns) / 1e9
+        # fit the drift to all the position updates over the test if they are still held, otherwise use the two end points
+        # (drift() is None with under 2 updates held, eg if the AHRS stream stopped)
+        telemetry = self._telemetry
+        drift = telemetry.drift(telemetry.window(t0_ns)) if telemetry.count and telemetry.first_ns() <= t0_ns else None
+        if drift:
+            d_ra, d_dec = drift
+        else:
+            d_ra = clamparcsec((a0_ra - a1_ra)*3600/24*360)/d_t*60
+            d_dec = clamparcsec((a0_dec - a1_dec)*3600)/d_t*60
         a_ra = ra if ra else self._targetrightascension if self._targetrightascension else self._rightascension
         a_dec = dec if dec else self._targetdeclination if self._targetdeclination else self._declination
         time = self.get_performance_data_time()
-        self.logger.info(f",DATA2,{time:.3f},{a0_track},{a1_track},{a_ra},{a_dec},{d_ra:.3f},{d_dec:.3f}")
+        recorder = self.performance_recorder('DATA2')
+        if recorder:
+            recorder.append(self._clock.now(), time, a0_track, a1_track, a_ra, a_dec, d_ra, d_dec)
+        else:
+            self.logger.info(f",DATA2,{time:.3f},{a0_track},{a1_track},{a_ra},{a_dec},{d_ra:.3f},{d_dec:.3f}")
         return
 
 
@@ -1053,25 +1635,18 @@ class Polaris:
     #
     @property
     def connected(self) -> bool:
-        self._lock.acquire()
-        res = self._connected
-        self._lock.release()
-        return res
+        return self._connected
 
     def connectionquery(self, client: str):
-        self._lock.acquire()
         # if no record of client, assume it was connected so that it can continue working
         if not client in self._connections:
             self._connections[client] = True
         res = self._connections[client]
-        self._lock.release()
         return res
                           
     def connectionrequest(self, client: str, connect: bool):
-        self._lock.acquire()
         self._connections[client] = connect
         numclients = sum(v for v in self._connections.values() if v)
-        self._lock.release()
         if Config.log_polaris:
             self.logger.info(f'[connection request] Client {client} Connected: {connect} Total Connected Clients: {numclients}')
 
@@ -1079,94 +1654,63 @@ class Polaris:
         if  self._task_errorstr:
             raise Exception(self._task_errorstr)
         
+    @property
+    def state(self) -> PolarisState:
+        # the latest position and motion state snapshot, read it once to get a coherent set of values
+        return self._state
+
     @property
     def tracking(self) -> bool:
-        self._lock.acquire()
-        res = self._tracking
-        self._lock.release()
-        return res
+        return self._state.tracking
     @tracking.setter
     def tracking (self, tracking: int):
-        self._lock.acquire()
         self._tracking = tracking
-        self._lock.release()
+        self._publish_state()
 
     @property
     def sideofpier(self) -> int:
-        self._lock.acquire()
-        res =  self._sideofpier
-        self._lock.release()
-        return res
+        return self._sideofpier
     @sideofpier.setter
     def sideofpier (self, sideofpier: int):
-        self._lock.acquire()
         self._sideofpier = sideofpier
-        self._lock.release()
 
     @property
     def athome(self) -> bool:
-        self._lock.acquire()
-        res =  self._athome
-        self._lock.release()
-        return res
+        return self._state.athome
 
     @property
     def atpark(self) -> bool:
-        self._lock.acquire()
-        res =  self._atpark
-        self._lock.release()
-        return res
+        return self._state.atpark
 
     @property
     def slewing(self) -> bool:
-        self._lock.acquire()
-        res =  self._slewing
-        self._lock.release()
-        return res
+        return self._state.slewing
 
     @property
     def gotoing(self) -> bool:
-        self._lock.acquire()
-        res =  self._gotoing
-        self._lock.release()
-        return res
+        return self._state.gotoing
 
     @property
     def ispulseguiding(self) -> bool:
-        self._lock.acquire()
-        res =  self._ispulseguiding
-        self._lock.release()
-        return res
+        return self._ispulseguiding
     #
     # Telescope device variables
     #
     @property
     def altitude(self) -> float:
-        self._lock.acquire()
-        res =  self._altitude
-        self._lock.release()
-        return res
+        return self._state.altitude
 
     @property
     def azimuth(self) -> float:
-        self._lock.acquire()
-        res =  self._azimuth
-        self._lock.release()
-        return res
+        return self._state.azimuth
 
     @property
     def declination(self) -> float:
-        self._lock.acquire()
-        res =  self._declination
-        self._lock.release()
-        return res
+        return self._state.declination
 
     @property
     def rightascension(self) -> float:
-        self._lock.acquire()
-        res =  self._rightascension
-        self._lock.release()
-        return res
+        return self._state.rightascension
 
     @property
     def siderealtime(self) -> float:
@@ -1179,336 +1723,226 @@ class Polaris:
         res = datetime.datetime.now(datetime.timezone.utc).isoformat().split('+')[0]
         return res
 
+    @property
+    def devicestate(self) -> list:
+        # ASCOM DeviceState: all the implemented operational properties in one response.
+        # The position and motion values come from one state snapshot, TimeStamp is when it was taken.
+        state = self._state
+        now = datetime.datetime.now(datetime.timezone.utc)
+        timestamp = datetime.datetime.fromtimestamp(state.timestamp, datetime.timezone.utc) if state.timestamp else now
+        return [
+            { "Name": "Altitude", "Value": state.altitude },
+            { "Name": "AtHome", "Value": state.athome },
+            { "Name": "AtPark", "Value": state.atpark },
+            { "Name": "Azimuth", "Value": state.azimuth },
+            { "Name": "Declination", "Value": state.declination },
+            { "Name": "RightAscension", "Value": state.rightascension },
+            { "Name": "SideOfPier", "Value": self._sideofpier },
+            { "Name": "SiderealTime", "Value": rad2hr(self._coords.sidereal_time(now.timestamp())) },
+            { "Name": "Slewing", "Value": state.slewing },
+            { "Name": "Tracking", "Value": state.tracking },
+            { "Name": "UTCDate", "Value": now.isoformat().split('+')[0] },
+            { "Name": "TimeStamp", "Value": timestamp.isoformat().split('+')[0] },
+        ]
+
     #
     # Telescope device rates
     #
     @property
     def trackingrate(self) -> int:
-        self._lock.acquire()
-        res =  self._trackingrate
-        self._lock.release()
-        return res
+        return self._trackingrate
     @trackingrate.setter
     def trackingrate (self, trackingrate: int):
-        self._lock.acquire()
         self._trackingrate = trackingrate
-        self._lock.release()
 
     @property
     def trackingrates(self):
-        self._lock.acquire()
-        res =  self._trackingrates
-        self._lock.release()
-        return res
+        return self._trackingrates
 
     @property
     def declinationrate(self) -> float:
-        self._lock.acquire()
-        res =  self._declinationrate
-        self._lock.release()
-        return res
+        return self._declinationrate
     @declinationrate.setter
     def declinationrate (self, declinationrate: float):
-        self._lock.acquire()
         self._declinationrate = declinationrate
-        self._lock.release()
 
     @property
     def rightascensionrate(self) -> float:
-        self._lock.acquire()
-        res =  self._rightascensionrate
-        self._lock.release()
-        return res
+        return self._rightascensionrate
     @rightascensionrate.setter
     def rightascensionrate (self, rightascensionrate: float):
-        self._lock.acquire()
         self._rightascensionrate = rightascensionrate
-        self._lock.release()
 
     @property
     def guideratedeclination(self) -> float:
-        self._lock.acquire()
-        res =  self._guideratedeclination
-        self._lock.release()
-        return res
+        return self._guideratedeclination
     @guideratedeclination.setter
     def guideratedeclination (self, guideratedeclination: float):
-        self._lock.acquire()
         self._guideratedeclination = guideratedeclination
-        self._lock.release()
 
     @property
     def guideraterightascension(self) -> float:
-        self._lock.acquire()
-        res =  self._guideraterightascension
-        self._lock.release()
-        return res
+        return self._guideraterightascension
     @guideraterightascension.setter
     def guideraterightascension (self, guideraterightascension: float):
-        self._lock.acquire()
         self._guideraterightascension = guideraterightascension
-        self._lock.release()
     #
     # Telescope device settings
     #
     @property
     def alignmentmode(self) -> int:
-        self._lock.acquire()
-        res =  self._alignmentmode
-        self._lock.release()
-        return res
+        return self._alignmentmode
 
     @property
     def aperturearea(self) -> float:
-        self._lock.acquire()
-        res =  self._aperturearea
-        self._lock.release()
-        return res
+        return self._aperturearea
 
     @property
     def aperturediameter(self) -> float:
-        self._lock.acquire()
-        res =  self._aperturediameter
-        self._lock.release()
-        return res
+        return self._aperturediameter
 
     @property
     def equatorialsystem(self) -> float:
-        self._lock.acquire()
-        res =  self._equatorialsystem
-        self._lock.release()
-        return res
+        return self._equatorialsystem
 
     @property
     def focallength(self) -> float:
-        self._lock.acquire()
-        res = self._focallength
-        self._lock.release()
-        return res
+        return self._focallength
 
     @property
     def siteelevation(self) -> float:
-        self._lock.acquire()
-        res = self._siteelevation
-        self._lock.release()
-        return res
+        return self._siteelevation
     @siteelevation.setter
     def siteelevation (self, siteelevation: float):
-        self._lock.acquire()
         self._siteelevation = siteelevation
-        self._lock.release()
 
     @property
     def sitelatitude(self) -> float:
-        self._lock.acquire()
-        res = self._sitelatitude
-        self._lock.release()
-        return res
+        return self._sitelatitude
     @sitelatitude.setter
     def sitelatitude (self, sitelatitude: float):
-        self._lock.acquire()
         self._sitelatitude = sitelatitude
         self._observer.lat = deg2rad(sitelatitude) 
-        self._lock.release()
+        self._coords.reset()
 
     @property
     def sitelongitude(self) -> float:
-        self._lock.acquire()
-        res =  self._sitelongitude
-        self._lock.release()
-        return res
+        return self._sitelongitude
     @sitelongitude.setter
     def sitelongitude (self, sitelongitude: float):
-        self._lock.acquire()
         self._sitelongitude = sitelongitude
         self._observer.long = deg2rad(sitelongitude) 
-        self._lock.release()
+        self._coords.reset()
     
     @property
     def slewsettletime(self) -> int:
-        self._lock.acquire()
-        res =  self._slewsettletime
-        self._lock.release()
-        return res
+        return self._slewsettletime
     @slewsettletime.setter
     def slewsettletime (self, slewsettletime: int):
-        self._lock.acquire()
         self._slewsettletime = slewsettletime
-        self._lock.release()
 
     @property
     def supportedactions(self) -> float:
-        self._lock.acquire()
-        res =  self._supportedactions
-        self._lock.release()
-        return res
+        return self._supportedactions
 
     @property
     def targetdeclination(self) -> float:
-        self._lock.acquire()
-        res =  self._targetdeclination
-        self._lock.release()
-        return res
+        return self._targetdeclination
     @targetdeclination.setter
     def targetdeclination (self, targetdeclination: float):
-        self._lock.acquire()
         self._targetdeclination = targetdeclination
-        self._lock.release()
 
     @property
     def targetrightascension(self) -> float:
-        self._lock.acquire()
-        res =  self._targetrightascension
-        self._lock.release()
-        return res
+        return self._targetrightascension
     @targetrightascension.setter
     def targetrightascension (self, targetrightascension: float):
-        self._lock.acquire()
         self._targetrightascension = targetrightascension
-        self._lock.release()
     #
     # Telescope capability constants
     #
     @property
     def canfindhome(self) -> bool:
-        self._lock.acquire()
-        res =  self._canfindhome
-        self._lock.release()
-        return res
+        return self._canfindhome
 
     @property
     def canpark(self) -> bool:
-        self._lock.acquire()
-        res =  self._canpark
-        self._lock.release()
-        return res
+        return self._canpark
 
     @property
     def canpulseguide(self) -> bool:
-        self._lock.acquire()
-        res =  self._canpulseguide
-        self._lock.release()
-        return res
+        return self._canpulseguide
 
     @property
     def cansetdeclinationrate(self) -> bool:
-        self._lock.acquire()
-        res =  self._cansetdeclinationrate
-        self._lock.release()
-        return res
+        return self._cansetdeclinationrate
 
     @property
     def cansetguiderates(self) -> bool:
-        self._lock.acquire()
-        res =  self._cansetguiderates
-        self._lock.release()
-        return res
+        return self._cansetguiderates
 
     @property
     def cansetpark(self) -> bool:
-        self._lock.acquire()
-        res =  self._cansetpark
-        self._lock.release()
-        return res
+        return self._cansetpark
 
     @property
     def cansetpierside(self) -> bool:
-        self._lock.acquire()
-        res =  self._cansetpierside
-        self._lock.release()
-        return res
+        return self._cansetpierside
 
     @property
     def cansetrightascensionrate(self) -> bool:
-        self._lock.acquire()
-        res =  self._cansetrightascensionrate
-        self._lock.release()
-        return res
+        return self._cansetrightascensionrate
 
     @property
     def cansettracking(self) -> bool:
-        self._lock.acquire()
-        res =  self._cansettracking
-        self._lock.release()
-        return res
+        return self._cansettracking
 
     @property
     def canslew(self) -> bool:
-        self._lock.acquire()
-        res =  self._canslew
-        self._lock.release()
-        return res
+        return self._canslew
 
     @property
     def canslewasync(self) -> bool:
-        self._lock.acquire()
-        res =  self._canslewasync
-        self._lock.release()
-        return res
+        return self._canslewasync
 
     @property
     def canslewaltaz(self) -> bool:
-        self._lock.acquire()
-        res =  self._canslewaltaz
-        self._lock.release()
-        return res
+        return self._canslewaltaz
 
     @property
     def canslewaltazasync(self) -> bool:
-        self._lock.acquire()
-        res =  self._canslewaltazasync
-        self._lock.release()
-        return res
+        return self._canslewaltazasync
 
     @property
     def cansync(self) -> bool:
-        self._lock.acquire()
-        res =  self._cansync
-        self._lock.release()
-        return res
+        return self._cansync
 
     @property
     def cansyncaltaz(self) -> bool:
-        self._lock.acquire()
-        res =  self._cansyncaltaz
-        self._lock.release()
-        return res
+        return self._cansyncaltaz
 
     @property
     def canunpark(self) -> bool:
-        self._lock.acquire()
-        res =  self._canunpark
-        self._lock.release()
-        return res
+        return self._canunpark
 
     @property
     def doesrefraction(self) -> bool:
-        self._lock.acquire()
-        res =  self._doesrefraction
-        self._lock.release()
-        return res
+        return self._doesrefraction
     @doesrefraction.setter
     def doesrefraction (self, doesrefraction: float):
-        self._lock.acquire()
         self._doesrefraction = doesrefraction
         self._observer.pressure = Config.site_pressure if doesrefraction else 0
-        self._lock.release()
+        self._coords.reset()
     #
     # Telescope method constants
     #
     @property
     def axisrates(self) -> bool:
-        self._lock.acquire()
-        res =  self._axisrates
-        self._lock.release()
-        return res
+        return self._axisrates
 
     @property
     def canmoveaxis(self) -> bool:
-        self._lock.acquire()
-        res =  self._canmoveaxis
-        self._lock.release()
-        return res
+        return self._canmoveaxis
 
     
     
@@ -1520,10 +1954,8 @@ class Polaris:
     async def SlewToCoordinates(self, rightascension, declination, isasync = True) -> None:
         a_ra = rightascension
         a_dec = declination
-        self._lock.acquire()
         self._targetrightascension = a_ra
         self._targetdeclination = a_dec
-        self._lock.release()
         inthefuture = Config.aiming_adjustment_time if Config.aiming_adjustment_enabled else 0
         if Config.sync_pointing_model==1:
             # Use RA/Dec Sync Pointing model
@@ -1543,7 +1975,7 @@ class Polaris:
             self.logger.info(f"->> Polaris: GOTO ASCOM   Alt {deg2dms(a_alt)} Az {deg2dms(a_az)}")
             self.logger.info(f"->> Polaris: GOTO POLARIS Alt {deg2dms(p_alt)} Az {deg2dms(p_az)} | SyncOffset (Alt {deg2dms(o_alt)} Az {deg2dms(o_az)})")
         if isasync:
-            asyncio.create_task(self.send_cmd_goto_altaz(p_alt, p_az, istracking=True))
+            self.run_in_background(self.send_cmd_goto_altaz(p_alt, p_az, istracking=True), 'GOTO')
         else:
             await self.send_cmd_goto_altaz(p_alt, p_az, istracking=True)
 
@@ -1634,25 +2066,23 @@ class Polaris:
         if cmdtype==1:
             if Config.log_polaris:
                 self.logger.info(f"->> Polaris: MOVE Slow Az/Alt/Rot Axis {axis} Rate {rate}")
-            self._lock.acquire()
             self._axis_ASCOM_slewing_rates[axis] = ascomrate
             self._axis_Polaris_slewing_rates[axis] = rate
             self._slewing = any(self._axis_Polaris_slewing_rates)
-            self._lock.release()
+            self._publish_state()
             if self._every_50ms_msg_to_send and rate == 0:
                 self.every_50ms_msg_to_clear()                  # stop fast move msgs
                 if Config.log_polaris_protocol:
                     self.logger.info(f'->> Polaris: stop_fastmove_repeating')
             state = 0 if rate == 0 else 1
-            await self.send_msg(f"1&{cmd}&3&key:{key};state:{state};level:{rate};#")
+            await self.send_msg(f"1&{cmd}&3&key:{key};state:{state};level:{rate};#", PolarisSendQueue.NORMAL if state else PolarisSendQueue.URGENT)
 
         # if cmdtype=2 then fast Alt/Az move
         elif cmdtype==2:
-            self._lock.acquire()
             self._axis_ASCOM_slewing_rates[axis] = ascomrate
             self._axis_Polaris_slewing_rates[axis] = rate
             self._slewing = any(self._axis_Polaris_slewing_rates)
-            self._lock.release()
+            self._publish_state()
             msg=f"1&{cmd}&3&speed:{rate};#"
             if Config.log_polaris:
                 self.logger.info(f"->> Polaris: MOVE Fast Az/Alt/Rot Axis {axis} Rate {rate}")
@@ -1664,24 +2094,20 @@ class Polaris:
         elif cmdtype==3:
             if Config.log_polaris:
                 self.logger.info(f"->> Polaris: Move Equatorial RA/Dec Axis: {axis} Rate: {rate} degrees")
-            self._lock.acquire()
             ra = self._rightascension + ((rate*24/360) if axis==0 else 0)
             dec = self._declination + (rate if axis==1 else 0)
-            self._lock.release()
             await self.SlewToCoordinates(ra, dec, isasync=True)
 
     async def park(self):
-        self._lock.acquire()
         self._atpark = True
         self._adj_sync_declination = 0
         self._adj_sync_rightascension = 0
         self._adj_altitude = 0
         self._adj_azimuth = 0
-        self._lock.release()
+        self._publish_state()
         await self.send_cmd_park()
 
     async def unpark(self):
-        self._lock.acquire()
         self._atpark = False
-        self._lock.release()
+        self._publish_state()
 
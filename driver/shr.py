@@ -58,12 +58,13 @@
 # 01-Jun-2023   rbd 0.3 Issue #2 Do not return empty Value field in property
 #               response, and omit Value if error is not success().
 
-from threading import Lock
 from exceptions import Success
 import json
+import itertools
 import re
 import math
 import asyncio
+from time import monotonic, monotonic_ns, time_ns
 from falcon import Request, Response, HTTPBadRequest
 from logging import Logger
 from config import Config
@@ -74,6 +75,20 @@ logger: Logger = None
 
 _bad_title = 'Bad Alpaca Request'
 
+# ----------------------------
+# JSON encoder for the replies
+# ----------------------------
+# orjson is used if it is installed (several times faster), otherwise the
+# standard library json. Either way json_encode() returns bytes for resp.data.
+# Another encoder can be plugged in by assigning it to shr.json_encode.
+try:
+    import orjson
+    def json_encode(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    def json_encode(obj) -> bytes:
+        return json.dumps(obj).encode()
+
 # --------------------------
 # Alpaca Device/Server Info
 # --------------------------
@@ -96,6 +111,26 @@ def to_bool(str: str) -> bool:
         raise HTTPBadRequest(title=_bad_title, description=f'Bad boolean value "{val}"')
     return val == _bools[0]
 
+# ---------------------------------------------------------
+# Index of the query string (GET) or body "form" data (PUT)
+# fields by case-folded name, built once per request (by
+# PreProcessRequest) and kept in req.context.fields. Where
+# a name appears more than once the first one is used, as
+# a linear scan would.
+# ---------------------------------------------------------
+async def request_fields(req: Request) -> dict:
+    fields = getattr(req.context, 'fields', None)
+    if fields is None:
+        items = req.params.items() if req.method == 'GET' else (await req.get_media()).items()
+        fields = req.context.fields = {name.lower(): value for name, value in reversed(items)}    # reversed so the first one wins
+    return fields
+
+def _required_field(fields: dict, name: str) -> str:
+    value = fields.get(name.lower())
+    if value is None:
+        raise HTTPBadRequest(title=_bad_title, description=f'Missing, empty, or misspelled parameter "{name}"')
+    return value
+
 # ---------------------------------------------------------
 # Get parameter/field from query string or body "form" data
 # If default is missing then the field is required. Maybe the
@@ -104,33 +139,28 @@ def to_bool(str: str) -> bool:
 # caseless (mostly for the ClientID and ClientTransactionID)
 # ---------------------------------------------------------
 async def get_request_field(name: str, req: Request, caseless: bool = False, default: str = None) -> str:
-    bad_desc = f'Missing, empty, or misspelled parameter "{name}"'
-    lcName = name.lower()
-    if req.method == 'GET':
-        for param in req.params.items():        # [name,value] tuples
-            if param[0].lower() == lcName:
-                return param[1]
-        if default == None:
-            raise HTTPBadRequest(title=_bad_title, description=bad_desc)                # Missing or incorrect casing
-        return default                          # not in args, return default
+    if req.method == 'GET' or caseless:
+        fields = getattr(req.context, 'fields', None)
+        if fields is None:
+            fields = await request_fields(req)
+        value = fields.get(name.lower())
+        if value is not None:
+            return value
     else:                                       # Assume PUT since we never route other methods
-        formdata = await req.get_media()
-        if caseless:
-            for fn in formdata.keys():
-                if fn.lower() == lcName:
-                    return formdata[fn]
-        else:
-            if name in formdata and formdata[name] != '':
-                return formdata[name]
-        if default == None:
-            raise HTTPBadRequest(title=_bad_title, description=bad_desc)                # Missing or incorrect casing
-        return default
+        formdata = await req.get_media()        # exact case, parsed once and cached by Falcon
+        value = formdata.get(name)
+        if value is not None and value != '':
+            return value
+    if default == None:
+        bad_desc = f'Missing, empty, or misspelled parameter "{name}"'
+        raise HTTPBadRequest(title=_bad_title, description=bad_desc)                    # Missing or incorrect casing
+    return default                              # not in args, return default
 
 #
 # Log the request as soon as the resource handler gets it so subsequent
 # logged messages are in the right order. Logs PUT body as well.
 #
-ispollreq = re.compile('connected|utcdate|canslew|cansetpierside|canpulseguide|alignmentmode|cansetguiderates|slewing|sideofpier|siteelevation|sitelatitude|sitelongitude|siderealtime|declination|rightascension|azimuth|altitude|tracking|cansettracking|athome|atpark')
+ispollreq = re.compile('connected|devicestate|utcdate|canslew|cansetpierside|canpulseguide|alignmentmode|cansetguiderates|slewing|sideofpier|siteelevation|sitelatitude|sitelongitude|siderealtime|declination|rightascension|azimuth|altitude|tracking|cansettracking|athome|atpark')
 
 async def log_request(req: Request):
     if Config.supress_alpaca_polling_msgs and req.method=="GET" and ispollreq.search(req.path):
@@ -185,7 +215,8 @@ class PreProcessRequest():
             msg = f'Device number {str(devnum)} does not exist. Maximum device number is {self.maxdev}.'
             logger.error(msg)
             raise HTTPBadRequest(title=_bad_title, description=msg)
-        test = str(await get_request_field('ClientID', req, True))        # Caseless
+        fields = await request_fields(req)                              # Caseless, indexed once here for the responder too
+        test = str(_required_field(fields, 'ClientID'))
         if not test:
             msg = 'Request has missing Alpaca ClientID value'
             logger.error(msg)
@@ -194,11 +225,16 @@ class PreProcessRequest():
             msg = f'Request has bad Alpaca ClientID value {test}'
             logger.error(msg)
             raise HTTPBadRequest(title=_bad_title, description=msg)
-        test  = str(await get_request_field('ClientTransactionID', req, True))
+        test  = str(_required_field(fields, 'ClientTransactionID'))
         if not self._pos_or_zero(test):
             msg = f'Request has bad Alpaca ClientTransactionID value {test}'
             logger.error(msg)
             raise HTTPBadRequest(title=_bad_title, description=msg)
+        # Parsed once here for the response. Only echoed from a PUT if exactly cased.
+        if req.method != 'GET':
+            test = (await req.get_media()).get('ClientTransactionID', '0')
+            test = test if self._pos_or_zero(test) else '0'
+        req.context.clienttransactionid = int(test)
 
     #
     # params contains {'devnum': n } from the URI template matcher
@@ -208,11 +244,21 @@ class PreProcessRequest():
         await log_request(req)                            # Log even a bad request
         await self._check_request(req, params['devnum'])   # Raises to 400 error on check failure
 
+# ---------------------------------------------------------
+# ClientTransactionID for the response, parsed once per request by
+# PreProcessRequest (or here, for the management API which isn't)
+# ---------------------------------------------------------
+async def client_transaction_id(req: Request) -> int:
+    ctid = getattr(req.context, 'clienttransactionid', None)
+    if ctid is None:
+        ctid = req.context.clienttransactionid = int(await get_request_field('ClientTransactionID', req, False, 0))
+    return ctid
+
 # ------------------
 # PropertyResponse
 # ------------------
-async def PropertyResponse(value, req: Request, err = Success()):
-    """Form a ``PropertyResponse`` string.
+async def PropertyResponse(value, req: Request, err = Success()) -> bytes:
+    """Form a ``PropertyResponse`` for ``resp.data``.
 
     Args:
         value:  The value of the requested property, or None if there was an
@@ -226,7 +272,7 @@ async def PropertyResponse(value, req: Request, err = Success()):
     """
     res = {
         "ServerTransactionID": getNextTransId(),
-        "ClientTransactionID": int(await get_request_field('ClientTransactionID', req, False, 0)),  #Caseless on GET
+        "ClientTransactionID": await client_transaction_id(req),
         "ErrorNumber": err.Number,
         "ErrorMessage": err.Message
     }
@@ -234,13 +280,41 @@ async def PropertyResponse(value, req: Request, err = Success()):
         res["Value"] = value
         log_response(req, str(value))
 
-    return json.dumps(res)
+    return json_encode(res)
+
+# ----------------------
+# StaticPropertyResponse
+# ----------------------
+class StaticPropertyResponse:
+    """A cached successful ``PropertyResponse`` for a value that never changes during a session
+
+    The value is read and serialised on first use, and each response only splices
+    the ServerTransactionID and ClientTransactionID into the cached template. The
+    response decodes to the same JSON as that of ``PropertyResponse(value, req)``.
+
+    Args:
+        getvalue: Called once (on the first request) to get the value, eg
+            ``lambda: polaris.canpark`` as the device is created after import.
+    """
+    def __init__(self, getvalue):
+        self._getvalue = getvalue
+        self._tail = None               # b'"ErrorNumber":0,...,"Value":<json>}'
+        self._valuestr = None           # value as logged
+
+    async def __call__(self, req: Request) -> bytes:
+        if self._tail is None:
+            value = self._getvalue()
+            self._tail = json_encode({"ErrorNumber": 0, "ErrorMessage": "", "Value": value})[1:]
+            self._valuestr = str(value)
+        ctid = await client_transaction_id(req)
+        log_response(req, self._valuestr)
+        return b'{"ServerTransactionID":%d,"ClientTransactionID":%d,%s' % (getNextTransId(), ctid, self._tail)
 
 # --------------
 # MethodResponse
 # --------------
-async def MethodResponse(req: Request, err = Success(), value = None): # value useless unless Success
-    """Initialize a MethodResponse string.
+async def MethodResponse(req: Request, err = Success(), value = None) -> bytes: # value useless unless Success
+    """Form a MethodResponse for ``resp.data``.
 
     Args:
         req: The Falcon Request property that was provided to the responder.
@@ -252,7 +326,7 @@ async def MethodResponse(req: Request, err = Success(), value = None): # value u
     """
     res = {
         "ServerTransactionID": getNextTransId(),
-        "ClientTransactionID": int(await get_request_field('ClientTransactionID', req, False, 0)),
+        "ClientTransactionID": await client_transaction_id(req),
         "ErrorNumber": err.Number,
         "ErrorMessage": err.Message
     }
@@ -260,20 +334,16 @@ async def MethodResponse(req: Request, err = Success(), value = None): # value u
         res["Value"] = value
         logger.info(f'{req.remote_addr} <- {str(value)}')
 
-    return json.dumps(res)
+    return json_encode(res)
 
 
 # -------------------------------
 # Thread-safe ServerTransactionID
 # -------------------------------
-_lock = Lock()
-_stid = 0
+_stid = itertools.count(1)                 # next() of a count is atomic
 
 def getNextTransId() -> int:
-    with _lock:
-        global _stid
-        _stid += 1
-    return _stid
+    return next(_stid)
 
 
 # -------------------------------
@@ -330,9 +400,175 @@ def rad2deg(rad):
 def deg2rad(deg):
     return deg*2*math.pi/360
 
-def empty_queue(q: asyncio.Queue):
-  while not q.empty():
-    try:
-        q.get_nowait()
-    except asyncio.QueueEmpty:
-        break
+# -------------------------------
+# Timekeeping
+# -------------------------------
+class MonotonicClock:
+    """Converts ``time.monotonic_ns()`` timestamps to unix (wall clock) time
+
+    Events are timestamped with ``monotonic_ns()``, which is cheap, high resolution
+    and never jumps, so intervals between them are always right. For astronomy the
+    wall clock time of a timestamp is ``wall()``, using an offset between the two
+    clocks that is measured again every ``recalibrate_s`` so it follows any NTP
+    correction of the wall clock.
+
+    """
+    def __init__(self, recalibrate_s: float = 60):
+        self.recalibrate_ns = int(recalibrate_s * 1e9)
+        self.calibrations = 0                       # number of times the offset has been measured
+        self.max_step_ns = 0                        # largest change in the offset on recalibrating (ns)
+        self.offset_ns = None                       # wall clock time_ns() - monotonic_ns()
+        self.calibrate()
+
+    def calibrate(self):
+        # use the wall clock reading most tightly bracketed by two monotonic readings
+        best = None
+        for _ in range(3):
+            m0 = monotonic_ns()
+            w = time_ns()
+            m1 = monotonic_ns()
+            if best is None or m1 - m0 < best[0]:
+                best = (m1 - m0, w - (m0 + m1) // 2)
+        if self.offset_ns is not None:
+            self.max_step_ns = max(self.max_step_ns, abs(best[1] - self.offset_ns))
+        self.offset_ns = best[1]
+        self.calibrated_ns = monotonic_ns()
+        self.calibrations += 1
+
+    # unix time (seconds) of a monotonic_ns() timestamp
+    def wall(self, mono_ns: int) -> float:
+        if mono_ns - self.calibrated_ns > self.recalibrate_ns:
+            self.calibrate()
+        return (mono_ns + self.offset_ns) / 1e9
+
+    def now(self) -> float:
+        return self.wall(monotonic_ns())
+
+    def summary(self) -> str:
+        return f"{self.calibrations} calibrations | offset {self.offset_ns/1e9:.6f}s | max step {self.max_step_ns/1e6:.3f}ms"
+
+# -------------------------------
+# Performance statistics
+# -------------------------------
+class LatencyHistogram:
+    """Histogram of latencies in power of 2 buckets, from under 1us to over 30s
+
+    Bucket ``n`` counts latencies from 2**(n-1) to 2**n microseconds. Recording a
+    sample is a couple of integer operations, so it can sit on the hot path.
+    """
+    NUM_BUCKETS = 26
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.buckets = [0] * self.NUM_BUCKETS       # count of samples in each bucket
+        self.count = 0                              # number of samples recorded
+        self.total_ns = 0                           # sum of all samples (ns)
+        self.max_ns = 0                             # largest sample (ns)
+
+    def record_ns(self, ns: int):
+        if ns < 0:
+            ns = 0
+        n = (ns // 1000).bit_length()
+        self.buckets[n if n < self.NUM_BUCKETS else self.NUM_BUCKETS - 1] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def mean_ms(self) -> float:
+        return self.total_ns / self.count / 1e6 if self.count else 0.0
+
+    def percentile_ms(self, pct: float) -> float:
+        # upper bound of the bucket holding the requested percentile
+        target = self.count * pct / 100
+        seen = 0
+        for n, c in enumerate(self.buckets):
+            seen += c
+            if c and seen >= target:
+                return min(2**n / 1000, self.max_ns / 1e6)
+        return 0.0
+
+    def summary(self) -> str:
+        return f"n {self.count} | mean {self.mean_ms():.3f}ms | p50 {self.percentile_ms(50):.3f}ms | p99 {self.percentile_ms(99):.3f}ms | max {self.max_ns/1e6:.3f}ms"
+
+# -------------------------------
+# Push subscriptions
+# -------------------------------
+class Subscription:
+    """Latest value subscription to a stream of published snapshots
+
+    ``publish()`` is called by the producer and never blocks or queues: if the
+    consumer has not taken the previous value yet it is replaced and counted as
+    dropped, so a slow consumer always gets the newest value and never a backlog.
+    ``get()`` waits for a new value, no sooner than ``min_interval`` after the
+    previous one, which limits each subscriber to ``max_rate`` values per second.
+    """
+    def __init__(self, max_rate: float = 0):
+        self.min_interval = 1 / max_rate if max_rate > 0 else 0.0
+        self._value = None
+        self._pending = False                       # a value has been published and not taken yet
+        self._event = asyncio.Event()
+        self._last = 0.0                            # monotonic time the last value was taken
+        self.published = 0                          # number of values published
+        self.delivered = 0                          # number of values taken by the consumer
+        self.dropped = 0                            # number of values replaced before being taken
+
+    def publish(self, value):
+        if self._pending:
+            self.dropped += 1
+        self._value = value
+        self._pending = True
+        self.published += 1
+        self._event.set()
+
+    async def get(self, timeout: float = None):
+        # The latest value, or None if nothing new was published within timeout seconds
+        if self.min_interval:
+            wait = self._last + self.min_interval - monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)           # anything published meanwhile replaces the pending value
+        if not self._pending:
+            self._event.clear()
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        self._pending = False
+        self._last = monotonic()
+        self.delivered += 1
+        return self._value
+
+    def summary(self) -> str:
+        return f"published {self.published} | delivered {self.delivered} | dropped {self.dropped}"
+
+
+class TokenBucket:
+    """Token bucket rate limiter, ``rate`` tokens a second up to a maximum of ``burst``
+
+    ``acquire()`` takes a token, waiting for one to be refilled when the bucket is
+    empty, so short bursts go straight through but the sustained rate is capped.
+    A rate of 0 means no limit.
+    """
+    def __init__(self, rate: float, burst: float = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = self.burst
+        self._t = monotonic()
+        self.waits = 0                              # number of acquires that had to wait for a token
+
+    def _refill(self):
+        now = monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._t) * self.rate)
+        self._t = now
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        self._refill()
+        if self.tokens < 1:
+            self.waits += 1
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+            self._refill()
+        self.tokens -= 1
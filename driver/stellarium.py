@@ -46,9 +46,10 @@
 
 import asyncio
 import telescope
+from collections import deque
 import time
 from config import Config
-from shr import DeviceMetadata
+from shr import DeviceMetadata, TokenBucket
 from datetime import datetime
 from shr import deg2dms,hr2hms,rad2deg,rad2hr,hr2rad,deg2rad,bytes2hexascii
 import ephem
@@ -195,6 +196,140 @@ def radec2bytes(ra, dec, t):
     return data
 
 
+#____________Position Encodings_____________
+class PositionEncodings:
+    """The current position encoded for the SynScan and Binary protocols, shared by all connections
+
+    Each encoding is built on first use after a new Polaris state snapshot, tagged
+    with the snapshot it was built from, and then served to every connection until
+    the next snapshot. A snapshot is never modified once published, so checking
+    the tag against the snapshot being served means a stale encoding is never sent.
+
+    """
+    def __init__(self):
+        self._synscan_state = None          # snapshot the SynScan encoding was built from
+        self._synscan = b''
+        self._binary_state = None           # snapshot the Binary encoding was built from
+        self._binary = b''
+        self.encoded = 0                    # number of encodings built
+        self.served = 0                     # number of encodings served
+
+    @property
+    def synscan_seq(self) -> int:
+        return self._synscan_state.seq if self._synscan_state else -1
+
+    @property
+    def binary_seq(self) -> int:
+        return self._binary_state.seq if self._binary_state else -1
+
+    # SynScan 'e' reply "34AB0500,12CE0500#"
+    def synscan(self, state) -> bytes:
+        self.served += 1
+        if state is not self._synscan_state:
+            self._synscan = radec_to_SynScan24bit(state.rightascension, state.declination)
+            self._synscan_state = state
+            self.encoded += 1
+        return self._synscan
+
+    # Binary protocol current position message, timed at the position update it came from
+    def binary(self, state) -> bytes:
+        self.served += 1
+        if state is not self._binary_state:
+            t = int(state.timestamp or time.time())
+            self._binary = bytes(radec2bytes(state.rightascension, state.declination, t))
+            self._binary_state = state
+            self.encoded += 1
+        return self._binary
+
+position_encodings = PositionEncodings()
+
+
+#____________Replies_____________
+# Constant replies, built once
+REPLY_OK = b'#'
+REPLY_GOTOING = {False: b'0#', True: b'1#'}                 # 'L' reply, by gotoing
+REPLY_TRACKING = {False: b'\x00#', True: b'\x02#'}          # 't' reply, by tracking. Off or Equatorial tracking.
+REPLY_ALIGNED = {False: b'\x00#', True: b'\x01#'}           # 'J' reply, by connected
+REPLY_VERSION = DeviceMetadata.VersionSynScan.encode('ascii')
+MOVE_AXES = {                                               # 'P' fixed rate move: (data[2], data[3]) -> (axis, direction, label)
+    (0x10, 0x24): (0, 1, 'Azm +ve'),
+    (0x10, 0x25): (0, -1, 'Azm -ve'),
+    (0x11, 0x24): (1, 1, 'Alt +ve'),
+    (0x11, 0x25): (1, -1, 'Alt -ve'),
+}
+
+
+#____________Framing_____________
+class SynScanFramer:
+    """Incremental framer for the SynScan and Stellarium Binary command streams
+
+    Neither protocol has a terminator on the commands sent to the telescope, so
+    commands are framed by their length, known from the first byte. Received
+    bytes are appended to a buffer and every complete command in it is returned,
+    so pipelined commands arriving in one read are all handled, and a command
+    split across reads is kept until the rest of it arrives. A run of bytes that
+    doesn't start a known command is returned as one frame, for the caller to log.
+
+    """
+    COMMAND_LENGTHS = {                 # Length of each command, including the command byte
+        0x14: 20,                       # Stellarium Binary GOTO: length 20 (0x14 0x00), type 0, time, ra, dec
+        ord('K'): 2,                    # Echo 'K',x
+        ord('e'): 1, ord('E'): 1,       # Get precise / Get RA/Dec
+        ord('z'): 1, ord('Z'): 1,       # Get precise / Get Azm-Alt
+        ord('r'): 18, ord('R'): 10,     # GOTO precise 'r34AB0500,12CE0500' / GOTO 'R34AB,12CE'
+        ord('b'): 18, ord('B'): 10,     # GOTO precise / GOTO Azm-Alt
+        ord('s'): 18, ord('S'): 10,     # SYNC precise / SYNC
+        ord('t'): 1, ord('T'): 2,       # Get / Set Tracking mode
+        ord('P'): 8,                    # Slew 'P',a,b,c,d,e,f,g
+        ord('w'): 1, ord('W'): 9,       # Get / Set Location
+        ord('h'): 1, ord('H'): 9,       # Get / Set Time
+        ord('V'): 1, ord('m'): 1,       # Get Version / Get Model
+        ord('J'): 1, ord('L'): 1,       # Is Alignment Complete / Is GOTO in Progress
+        ord('M'): 1, ord('p'): 1,       # Cancel GOTO / Get Pointing State
+    }
+
+    def __init__(self):
+        self._buffer = bytearray()      # received bytes not yet returned as complete commands
+        self.frames = 0                 # number of complete commands extracted
+        self.unknown = 0                # number of unknown byte runs returned
+        self.bytes_received = 0         # number of bytes received from the client
+
+    def feed(self, data) -> list:
+        # Add received data to the buffer, returning the bytes of every complete command
+        buffer = self._buffer
+        buffer += data
+        self.bytes_received += len(data)
+        lengths = self.COMMAND_LENGTHS
+        frames = []
+        start = 0
+        end = len(buffer)
+        while start < end:
+            length = lengths.get(buffer[start])
+            if length is None:
+                # skip to the next byte that starts a known command
+                stop = start + 1
+                while stop < end and buffer[stop] not in lengths:
+                    stop += 1
+                frames.append(bytes(buffer[start:stop]))
+                self.unknown += 1
+                start = stop
+                continue
+            if start + length > end:
+                break                   # partial command, wait for the rest
+            frames.append(bytes(buffer[start:start+length]))
+            self.frames += 1
+            start += length
+        if start:
+            del buffer[:start]
+        return frames
+
+
+# Small angle separation of two ra (hours), dec (degrees) positions in arc seconds
+def position_change_arcsec(ra1, dec1, ra2, dec2):
+    d_ra = (ra1 - ra2 + 12) % 24 - 12
+    return math.hypot(d_ra * 15 * math.cos(math.radians(dec1)), dec1 - dec2) * 3600
+
+
 class Stellarium:
 
     def __init__(self, logger: Logger, reader, writer):
@@ -202,6 +337,9 @@ class Stellarium:
         self.reader = reader
         self.writer = writer
         self.stellarium_binary_protocol = True          # Assume Binary unless Ka received in first 5 seconds
+        self.position_updates = False                   # Binary Protocol position updates have started, see start_position_updates()
+        self.framer = SynScanFramer()                   # splits the received byte stream into commands
+        self.poll_limiter = TokenBucket(Config.stellarium_poll_max_rate, Config.stellarium_poll_burst)   # rate limit for polled 'e' and 'L' queries
 
     #____________Low Level Comms_____________
     async def stellarium_send_msg(self, msg, ispolled=False):
@@ -213,193 +351,203 @@ class Stellarium:
     #____________Stellarium/SynScan Protocol_____________
     # SynScan Protocol (https://inter-static.skywatcher.com/downloads/synscanserialcommunicationprotocol_version33.pdf)
     # Stellarium Binary Protocol
-    async def process_protocol(self, data):
+    # Each command is dispatched on its first byte to a handler in HANDLERS (see the end of the class).
+    # Returns the handler's coroutine for the caller to await, rather than awaiting it in another coroutine.
+    def process_protocol(self, data):
 
         # hex/ascii dump of message recieved
         if Config.log_stellarium_protocol:
             if not(Config.supress_stellarium_polling_msgs and (data[0]==0x4c or data[0]==0x65)):
                 self.logger.info(f"<<- Stellarium: recv_msg: {bytes2hexascii(data)}")
 
-
-        # SynSCAN Echo Command 'K',x | Reply x, "#"
-        if data[0]==0x4b:               
-            msg = bytearray([data[1],ord('#')])
-            telescope.polaris.radec_sync_reset()
-            self.logger.info(f"<<- Stellarium: SynScan ECHO Command 'K{chr(data[1])}' | Reset SyncOffset to (RA 0 Dec 0)")
-            self.stellarium_binary_protocol = False
-            await self.stellarium_send_msg(msg)
-
-        # SynSCAN Get Slewing state 'L' | Reply “0#" or "1#"
-        elif data[0]==0x4c: 
-            if not Config.supress_stellarium_polling_msgs:              
-                self.logger.info(f"<<- Stellarium: SynScan Get SLEWING state 'L' | {telescope.polaris.slewing}")
-            msg = b'1#' if telescope.polaris.gotoing else b'0#'
-            await self.stellarium_send_msg(msg, ispolled=True)
-
-        # SynSCAN Get Tracking state 't' | Reply 0 = Tracking off, 1 = Alt/Az tracking, 2 = Equatorial tracking, 3 = PEC mode (Sidereal + PEC)
-        elif data[0]==0x74: 
-            if not Config.supress_stellarium_polling_msgs:              
-                self.logger.info(f"<<- Stellarium: SynScan Get TRACKING state 't' | {telescope.polaris.tracking}")
-            msg = bytearray([2,ord('#')]) if telescope.polaris.tracking else bytearray([0,ord('#')])
-            await self.stellarium_send_msg(msg, ispolled=True)
-
-        # SynSCAN Set Tracking state 'T',m | Where m=0 Off, m=1 Alt/Az, m=2 Equitorial, m=3 Sidereal+PEC mode
-        elif data[0]==0x54: 
-            self.logger.info(f"<<- Stellarium: SynScan Set Tracking 'T'")
-            new_state = True if data[1]==0x02 or data[1]==0x03 else False
-            telescope.polaris.send_cmd_change_tracking_state(new_state)
-            msg = b'#'
-            await self.stellarium_send_msg(msg)
-
-        # SynSCAN Is Alignment Complete 'J' | Reply 1 = Aligned
-        elif data[0]==0x4a: 
-            if not Config.supress_stellarium_polling_msgs:              
-                self.logger.info(f"<<- Stellarium: SynScan Is Alignment Complete 'J'")
-            msg = bytearray([1, ord('#')]) if telescope.polaris.connected else bytearray([0, ord('#')])
-            await self.stellarium_send_msg(msg, ispolled=True)
-
-        # SynSCAN Cancel GOTO 'M' | Reply “#"
-        elif data[0]==0x4d:               
-            self.logger.info(f"<<- Stellarium: SynScan Cancel GOTO 'M'")
-            await telescope.polaris.send_cmd_goto_abort()
-            msg = b'#'
-            await self.stellarium_send_msg(msg)
-
-        # SynSCAN Fixed Rate Move Azm Command 'P':02:10:25:Rate:00:00:00
-        elif data[0]==0x50 and data[1]==0x02:
-            rate = data[4]
-            if rate < 0 or rate > telescope.polaris.axisrates[0]['Maximum'] or math.isnan(rate):
-                self.logger.error(f"<<- Stellarium: SynScan Move Rate invalid {bytes2hexascii(data)}")
-            else:
-                if data[2]==0x10 and data[3]==0x24:
-                    self.logger.info(f"<<- Stellarium: SynScan Move Azm +ve 'P': Rate {rate}")
-                    await telescope.polaris.move_axis(0, rate)
-                if data[2]==0x10 and data[3]==0x25:
-                    self.logger.info(f"<<- Stellarium: SynScan Move Azm -ve 'P': Rate {rate}")
-                    await telescope.polaris.move_axis(0, -rate)
-                if data[2]==0x11 and data[3]==0x24:
-                    self.logger.info(f"<<- Stellarium: SynScan Move Alt +ve 'P': Rate {rate}")
-                    await telescope.polaris.move_axis(1, rate)
-                if data[2]==0x11 and data[3]==0x25:
-                    self.logger.info(f"<<- Stellarium: SynScan Move Alt -ve 'P': Rate {rate}")
-                    await telescope.polaris.move_axis(1, -rate)
-            msg = b'#'
-            await self.stellarium_send_msg(msg)
-
-        # SynSCAN Get Version Command 'V' | Reply 6 decimals in ascii,"#"
-        elif data[0]==0x56:
-            version = DeviceMetadata.VersionSynScan               
-            self.logger.info(f"<<- Stellarium: SynScan Get VERSION Command 'V' | {version}")
-            msg = bytearray(ord(c) for c in version)
-            await self.stellarium_send_msg(msg)
-
-        # SynSCAN Get precise RA/DEC 'e' | Reply “34AB0500,12CE0500#” 
-        elif data[0]==0x65:               
-            await asyncio.sleep(0.1)            # dont let Stellarium PLUS get too carried away
-            if not Config.supress_stellarium_polling_msgs:              
-                self.logger.info(f"<<- Stellarium: SynScan Get RA/DEC Command 'e'")
-            msg = radec_to_SynScan24bit(telescope.polaris.rightascension, telescope.polaris.declination)
-            await self.stellarium_send_msg(msg, ispolled=True)
-
-        # SynSCAN GOTO 'r34AB0500,12CE0500', | Reply “#"
-        elif data[0]==0x72:               
-            ra, dec = synScan24bit_to_radec(data)
-            if ra < 0 or ra > 24 or math.isnan(ra):
-                self.logger.error(f"<<- Stellarium: SynScan GOTO RA invalid {bytes2hexascii(data)}")
-            elif dec < -90 or dec > 90 or math.isnan(dec):
-                self.logger.error(f"<<- Stellarium: SynScan GOTO Dec invalid {bytes2hexascii(data)}")
-            else:
-                self.logger.info(f"<<- Stellarium: SynScan GOTO Ra: {hr2hms(ra)} Dec: {deg2dms(dec)}")
-                if telescope.polaris.connected:
-                    await telescope.polaris.SlewToCoordinates(ra, dec, isasync=True)
-            msg = b'#'
-            await self.stellarium_send_msg(msg)
-
-        # SynSCAN SYNC 's34AB0500,12CE0500', | Reply “#"
-        elif data[0]==0x73:               
-            ra, dec = synScan24bit_to_radec(data)
-            if ra < 0 or ra > 24 or math.isnan(ra):
-                self.logger.error(f"<<- Stellarium: SynScan SYNC RA invalid {bytes2hexascii(data)}")
-            elif dec < -90 or dec > 90 or math.isnan(dec):
-                self.logger.error(f"<<- Stellarium: SynScan SYNC Dec invalid {bytes2hexascii(data)}")
-            else:
-                self.logger.info(f"<<- Stellarium: SynScan SYNC Ra: {ra} Dec: {dec}")
-                if telescope.polaris.connected:
-                    await telescope.polaris.radec_ascom_sync(ra, dec)
-            msg = b'#'
-            await self.stellarium_send_msg(msg)
-
-        # SynSCAN Get TIME 'h', | Reply “QRSTUVWX#" where Q hr, R min, S sec, T Month, U day, V year, W GMT offset, X DST
-        elif data[0]==0x68:               
-            msg, msg_ascii = datetime2QRSTUVWX(datetime.now())
-            self.logger.info(f"<<- Stellarium: SynScan Get TIME h | {msg_ascii}")
-            await self.stellarium_send_msg(msg)
-
-        # SynSCAN Set TIME 'HQRSTUVWX', | Reply “#" where Q hr, R min, S sec, T Month, U day, V year, W GMT offset, X DST
-        elif data[0]==0x48:
-            msg_ascii = HQRSTUVWX2datetime(data)               
-            self.logger.info(f"<<- Stellarium: SynScan Set TIME H | {msg_ascii}")
-            # Mot Implemented
-            msg = b'#'
-            await self.stellarium_send_msg(msg)
-
-        # SynSCAN Get LOCATION 'w', | Reply “ABCDEFGH#" where 
-        elif data[0]==0x77:
-            lat = telescope.polaris.sitelatitude
-            lon = telescope.polaris.sitelongitude          
-            self.logger.info(f"<<- Stellarium: SynScan Get LOCATION w | Lat: {lat:0.9} Lon: {lon:0.9}")
-            msg = latlon2ABCDEGFGH(lat, lon)
-            await self.stellarium_send_msg(msg)
-
-        # SynSCAN Set LOCATION 'WABCDEFGH', | Reply “#" where 
-        elif data[0]==0x57:               
-            lat, lon = WABCDEGFGH2latlon(data)
-            if lon < -180 or lon > 180 or math.isnan(lon):
-                self.logger.error(f"<<- Stellarium: SynScan SYNC Lon invalid {bytes2hexascii(data)}")
-            elif lat < -90 or lat > 90 or math.isnan(lat):
-                self.logger.error(f"<<- Stellarium: SynScan SYNC Lat invalid {bytes2hexascii(data)}")
-            else:
-                telescope.polaris.sitelatitude = lat
-                telescope.polaris.sitelongitude = lon         
-                self.logger.info(f"<<- Stellarium: SynScan Set LOCATION W | Lat: {lat:0.9} Lon: {lon:0.9}")
-            msg = b'#'
-            await self.stellarium_send_msg(msg)
-
-        # Stellarium Desktop Binary Goto Command 
-        elif data[0]==0x14:               
-            (ra, dec, t) = bytes2radect(data)
-            if ra < 0 or ra > 24 or math.isnan(ra):
-                self.logger.error(f"<<- Stellarium: Binary GOTO RA invalid {bytes2hexascii(data)}")
-            elif dec < -90 or dec > 90 or math.isnan(dec):
-                self.logger.error(f"<<- Stellarium: Binary GOTO Dec invalid {bytes2hexascii(data)}")
-            else:
-                self.logger.info(f"<<- Stellarium: Binary GOTO command Ra={ra} Dec={dec} t={t}")
-                self.stellarium_binary_protocol = True
-                if telescope.polaris.connected:
-                    await telescope.polaris.SlewToCoordinates(ra, dec, isasync=True)
-
+        handler = self.HANDLERS.get(data[0])
+        if handler is None:
+            handler = Stellarium.unknown_command
+        return handler(self, data)
+
+    async def unknown_command(self, data):
+        self.logger.error(f"<<- Stellarium: Unknown Command: {bytes2hexascii(data)}")
+
+    # SynSCAN Echo Command 'K',x | Reply x, "#"
+    async def synscan_echo(self, data):
+        msg = bytes((data[1], 0x23))
+        telescope.polaris.radec_sync_reset()
+        self.logger.info(f"<<- Stellarium: SynScan ECHO Command 'K{chr(data[1])}' | Reset SyncOffset to (RA 0 Dec 0)")
+        self.stellarium_binary_protocol = False
+        self.follow_position()
+        await self.stellarium_send_msg(msg)
+
+    # SynSCAN Get Slewing state 'L' | Reply “0#" or "1#"
+    async def synscan_get_slewing(self, data):
+        await self.poll_limiter.acquire()   # dont let Stellarium PLUS get too carried away
+        state = telescope.polaris.state
+        if not Config.supress_stellarium_polling_msgs:              
+            self.logger.info(f"<<- Stellarium: SynScan Get SLEWING state 'L' | {state.slewing}")
+        await self.stellarium_send_msg(REPLY_GOTOING[state.gotoing], ispolled=True)
+
+    # SynSCAN Get Tracking state 't' | Reply 0 = Tracking off, 1 = Alt/Az tracking, 2 = Equatorial tracking, 3 = PEC mode (Sidereal + PEC)
+    async def synscan_get_tracking(self, data):
+        tracking = telescope.polaris.state.tracking
+        if not Config.supress_stellarium_polling_msgs:              
+            self.logger.info(f"<<- Stellarium: SynScan Get TRACKING state 't' | {tracking}")
+        await self.stellarium_send_msg(REPLY_TRACKING[tracking], ispolled=True)
+
+    # SynSCAN Set Tracking state 'T',m | Where m=0 Off, m=1 Alt/Az, m=2 Equitorial, m=3 Sidereal+PEC mode
+    async def synscan_set_tracking(self, data):
+        self.logger.info(f"<<- Stellarium: SynScan Set Tracking 'T'")
+        new_state = True if data[1]==0x02 or data[1]==0x03 else False
+        # reply straight away rather than hold up the client for the Polaris reply (and any retries)
+        telescope.polaris.run_in_background(telescope.polaris.send_cmd_change_tracking_state(new_state), 'SynScan Set Tracking')
+        await self.stellarium_send_msg(REPLY_OK)
+
+    # SynSCAN Is Alignment Complete 'J' | Reply 1 = Aligned
+    async def synscan_is_aligned(self, data):
+        if not Config.supress_stellarium_polling_msgs:              
+            self.logger.info(f"<<- Stellarium: SynScan Is Alignment Complete 'J'")
+        await self.stellarium_send_msg(REPLY_ALIGNED[telescope.polaris.connected], ispolled=True)
+
+    # SynSCAN Cancel GOTO 'M' | Reply “#"
+    async def synscan_cancel_goto(self, data):
+        self.logger.info(f"<<- Stellarium: SynScan Cancel GOTO 'M'")
+        await telescope.polaris.send_cmd_goto_abort()
+        await self.stellarium_send_msg(REPLY_OK)
+
+    # SynSCAN Fixed Rate Move Azm Command 'P':02:10:25:Rate:00:00:00
+    async def synscan_move(self, data):
+        if data[1]!=0x02:
+            return await self.unknown_command(data)
+        rate = data[4]
+        if rate < 0 or rate > telescope.polaris.axisrates[0]['Maximum'] or math.isnan(rate):
+            self.logger.error(f"<<- Stellarium: SynScan Move Rate invalid {bytes2hexascii(data)}")
+        else:
+            move = MOVE_AXES.get((data[2], data[3]))
+            if move:
+                axis, sign, label = move
+                self.logger.info(f"<<- Stellarium: SynScan Move {label} 'P': Rate {rate}")
+                await telescope.polaris.move_axis(axis, sign * rate)
+        await self.stellarium_send_msg(REPLY_OK)
+
+    # SynSCAN Get Version Command 'V' | Reply 6 decimals in ascii,"#"
+    async def synscan_get_version(self, data):
+        self.logger.info(f"<<- Stellarium: SynScan Get VERSION Command 'V' | {DeviceMetadata.VersionSynScan}")
+        await self.stellarium_send_msg(REPLY_VERSION)
+
+    # SynSCAN Get precise RA/DEC 'e' | Reply “34AB0500,12CE0500#” 
+    async def synscan_get_radec(self, data):
+        await self.poll_limiter.acquire()   # dont let Stellarium PLUS get too carried away
+        if not Config.supress_stellarium_polling_msgs:              
+            self.logger.info(f"<<- Stellarium: SynScan Get RA/DEC Command 'e'")
+        state = telescope.polaris.position_state()
+        msg = position_encodings.synscan(state)
+        await self.stellarium_send_msg(msg, ispolled=True)
+
+    # SynSCAN GOTO 'r34AB0500,12CE0500', | Reply “#"
+    async def synscan_goto(self, data):
+        ra, dec = synScan24bit_to_radec(data)
+        if ra < 0 or ra > 24 or math.isnan(ra):
+            self.logger.error(f"<<- Stellarium: SynScan GOTO RA invalid {bytes2hexascii(data)}")
+        elif dec < -90 or dec > 90 or math.isnan(dec):
+            self.logger.error(f"<<- Stellarium: SynScan GOTO Dec invalid {bytes2hexascii(data)}")
+        else:
+            self.logger.info(f"<<- Stellarium: SynScan GOTO Ra: {hr2hms(ra)} Dec: {deg2dms(dec)}")
+            if telescope.polaris.connected:
+                await telescope.polaris.SlewToCoordinates(ra, dec, isasync=True)
+        await self.stellarium_send_msg(REPLY_OK)
+
+    # SynSCAN SYNC 's34AB0500,12CE0500', | Reply “#"
+    async def synscan_sync(self, data):
+        ra, dec = synScan24bit_to_radec(data)
+        if ra < 0 or ra > 24 or math.isnan(ra):
+            self.logger.error(f"<<- Stellarium: SynScan SYNC RA invalid {bytes2hexascii(data)}")
+        elif dec < -90 or dec > 90 or math.isnan(dec):
+            self.logger.error(f"<<- Stellarium: SynScan SYNC Dec invalid {bytes2hexascii(data)}")
+        else:
+            self.logger.info(f"<<- Stellarium: SynScan SYNC Ra: {ra} Dec: {dec}")
+            if telescope.polaris.connected:
+                await telescope.polaris.radec_ascom_sync(ra, dec)
+        await self.stellarium_send_msg(REPLY_OK)
+
+    # SynSCAN Get TIME 'h', | Reply “QRSTUVWX#" where Q hr, R min, S sec, T Month, U day, V year, W GMT offset, X DST
+    async def synscan_get_time(self, data):
+        msg, msg_ascii = datetime2QRSTUVWX(datetime.now())
+        self.logger.info(f"<<- Stellarium: SynScan Get TIME h | {msg_ascii}")
+        await self.stellarium_send_msg(msg)
+
+    # SynSCAN Set TIME 'HQRSTUVWX', | Reply “#" where Q hr, R min, S sec, T Month, U day, V year, W GMT offset, X DST
+    async def synscan_set_time(self, data):
+        msg_ascii = HQRSTUVWX2datetime(data)               
+        self.logger.info(f"<<- Stellarium: SynScan Set TIME H | {msg_ascii}")
+        # Mot Implemented
+        await self.stellarium_send_msg(REPLY_OK)
+
+    # SynSCAN Get LOCATION 'w', | Reply “ABCDEFGH#" where 
+    async def synscan_get_location(self, data):
+        lat = telescope.polaris.sitelatitude
+        lon = telescope.polaris.sitelongitude          
+        self.logger.info(f"<<- Stellarium: SynScan Get LOCATION w | Lat: {lat:0.9} Lon: {lon:0.9}")
+        msg = latlon2ABCDEGFGH(lat, lon)
+        await self.stellarium_send_msg(msg)
+
+    # SynSCAN Set LOCATION 'WABCDEFGH', | Reply “#" where 
+    async def synscan_set_location(self, data):
+        lat, lon = WABCDEGFGH2latlon(data)
+        if lon < -180 or lon > 180 or math.isnan(lon):
+            self.logger.error(f"<<- Stellarium: SynScan SYNC Lon invalid {bytes2hexascii(data)}")
+        elif lat < -90 or lat > 90 or math.isnan(lat):
+            self.logger.error(f"<<- Stellarium: SynScan SYNC Lat invalid {bytes2hexascii(data)}")
+        else:
+            telescope.polaris.sitelatitude = lat
+            telescope.polaris.sitelongitude = lon         
+            self.logger.info(f"<<- Stellarium: SynScan Set LOCATION W | Lat: {lat:0.9} Lon: {lon:0.9}")
+        await self.stellarium_send_msg(REPLY_OK)
+
+    # Stellarium Desktop Binary Goto Command 
+    async def binary_goto(self, data):
+        (ra, dec, t) = bytes2radect(data)
+        if ra < 0 or ra > 24 or math.isnan(ra):
+            self.logger.error(f"<<- Stellarium: Binary GOTO RA invalid {bytes2hexascii(data)}")
+        elif dec < -90 or dec > 90 or math.isnan(dec):
+            self.logger.error(f"<<- Stellarium: Binary GOTO Dec invalid {bytes2hexascii(data)}")
         else:
-            self.logger.error(f"<<- Stellarium: Unknown Command: {bytes2hexascii(data)}")
+            self.logger.info(f"<<- Stellarium: Binary GOTO command Ra={ra} Dec={dec} t={t}")
+            self.stellarium_binary_protocol = True
+            self.follow_position()
+            if telescope.polaris.connected:
+                await telescope.polaris.SlewToCoordinates(ra, dec, isasync=True)
+
+    # Command handlers keyed by the first byte of the command
+    HANDLERS = {
+        ord('K'): synscan_echo,
+        ord('L'): synscan_get_slewing,
+        ord('t'): synscan_get_tracking,
+        ord('T'): synscan_set_tracking,
+        ord('J'): synscan_is_aligned,
+        ord('M'): synscan_cancel_goto,
+        ord('P'): synscan_move,
+        ord('V'): synscan_get_version,
+        ord('e'): synscan_get_radec,
+        ord('r'): synscan_goto,
+        ord('s'): synscan_sync,
+        ord('h'): synscan_get_time,
+        ord('H'): synscan_set_time,
+        ord('w'): synscan_get_location,
+        ord('W'): synscan_set_location,
+        0x14: binary_goto,
+    }
 
     #____________Stellarium Pos Updates_____________
-    # Background Loop to send position updates every 500ms for the Binary Protocol
-    async def every_500ms_send_position_update(self):
+    # Position updates for the Binary Protocol are sent by the stellarium_hub, shared by all connections.
+    # This connection follows them from 5 seconds after connecting, for as long as it is using the Binary Protocol.
+    async def start_position_updates(self):
         await asyncio.sleep(5)      # wait 5 seconds for first SynScan Ka protocol to turn off updates
-        while True:
-            try:
-                if self.stellarium_binary_protocol:
-                    # Current time
-                    t = int(datetime.now().timestamp())
-                    # current (RA, Dec)
-                    ra = telescope.polaris.rightascension
-                    dec = telescope.polaris.declination
-                    data = radec2bytes(ra, dec, t)
-                    await self.stellarium_send_msg(data, ispolled = True)
-                await asyncio.sleep(0.5)
-            except Exception as e:
-                self.logger.error(f"==ERROR== Network connection to Stellarium lost from Position Updates. {e}")
-                await asyncio.sleep(5)
-                break
+        self.position_updates = True
+        self.follow_position()
+
+    def follow_position(self):
+        if self.position_updates and self.stellarium_binary_protocol:
+            stellarium_hub.join(self)
+        else:
+            stellarium_hub.leave(self)
 
 
     #____________Stellarium Client_____________
@@ -410,23 +558,137 @@ class Stellarium:
                 data = await self.reader.read(256)
                 if not data:
                     break
-                await self.process_protocol(data)
-                await asyncio.sleep(0.25)                # slow down Stellarium from polling too quickly and overloading this loop
+                # handle every complete command received, polled queries are rate limited by poll_limiter, commands are handled at once
+                for command in self.framer.feed(data):
+                    await self.process_protocol(command)
             except Exception as e:
                 self.logger.error(f"==ERROR== Network connection to Stellarium lost from Client. {e}")
                 await asyncio.sleep(5)
                 break
 
+#____________Stellarium Hub_____________
+class HubClient:
+    """A connection following the position updates from the StellariumHub
+
+    Frames are queued for the connection's own sender task, so a client that is
+    slow to drain never holds up the hub or the other clients. The queue holds
+    at most MAX_QUEUED_FRAMES, when it is full the oldest frame is dropped, as
+    only the most recent positions are of any use to a client that is behind.
+
+    """
+    MAX_QUEUED_FRAMES = 4
+
+    def __init__(self, stellarium):
+        self.stellarium = stellarium
+        self.queue = deque(maxlen=self.MAX_QUEUED_FRAMES)
+        self.ready = asyncio.Event()
+        self.sent = 0                                   # number of frames sent
+        self.dropped = 0                                # number of frames dropped because the client was behind
+        self.task = asyncio.create_task(self.sender())
+
+    def push(self, frame):
+        if len(self.queue) == self.MAX_QUEUED_FRAMES:
+            self.dropped += 1
+        self.queue.append(frame)
+        self.ready.set()
+
+    async def sender(self):
+        queue = self.queue
+        try:
+            while True:
+                await self.ready.wait()
+                self.ready.clear()
+                while queue:
+                    await self.stellarium.stellarium_send_msg(queue.popleft(), ispolled = True)
+                    self.sent += 1
+        except Exception as e:
+            self.stellarium.logger.error(f"==ERROR== Network connection to Stellarium lost from Position Updates. {e}")
+            stellarium_hub.leave(self.stellarium)
+
+
+class StellariumHub:
+    """Publishes the Binary Protocol position updates to all connected clients
+
+    A single task follows the Polaris state snapshots and decides when to send
+    an update: when the position has moved more than stellarium_update_threshold
+    arc seconds from the last one sent, at most stellarium_update_max_rate times
+    a second, and at least every stellarium_update_heartbeat seconds. Each update
+    is encoded once and the same frame is pushed to every client. The task runs
+    while there is at least one client.
+
+    """
+    def __init__(self):
+        self.clients = {}                               # Stellarium connection -> HubClient
+        self.frame = None                               # the last frame published
+        self.published = 0                              # number of frames published
+        self.errors = 0                                 # number of position updates that failed
+        self._task = None
+
+    def join(self, stellarium):
+        if stellarium in self.clients:
+            return
+        client = self.clients[stellarium] = HubClient(stellarium)
+        if self.frame:
+            client.push(self.frame)                     # start with the current position
+        if self._task is None:
+            self._task = asyncio.create_task(self.publish())
+
+    def leave(self, stellarium):
+        client = self.clients.pop(stellarium, None)
+        if client:
+            client.task.cancel()
+        if not self.clients and self._task:
+            self._task.cancel()
+            self._task = None
+            self.frame = None
+
+    async def publish(self):
+        polaris = telescope.polaris
+        subscription = polaris.subscribe(Config.stellarium_update_max_rate)
+        sent_ra = sent_dec = None
+        sent_at = 0.0
+        try:
+            state = polaris.state
+            while True:
+                try:
+                    now = time.monotonic()
+                    # the current position, for a new snapshot or the heartbeat (state None). The newest snapshot,
+                    # or with position_estimation its estimate for now rather than the last 518 update
+                    state = polaris.position_state()
+                    ra = state.rightascension
+                    dec = state.declination
+                    if sent_ra is None or now - sent_at >= Config.stellarium_update_heartbeat or \
+                            position_change_arcsec(ra, dec, sent_ra, sent_dec) > Config.stellarium_update_threshold:
+                        self.frame = position_encodings.binary(state)
+                        for client in self.clients.values():
+                            client.push(self.frame)
+                        self.published += 1
+                        sent_ra, sent_dec, sent_at = ra, dec, now
+                except Exception as e:
+                    # carry on with the next snapshot, this task ending would stop the updates to every client
+                    self.errors += 1
+                    polaris.logger.error(f"==ERROR== Stellarium position update failed. {type(e).__name__}: {e}")
+                state = await subscription.get(Config.stellarium_update_heartbeat)
+        finally:
+            polaris.unsubscribe(subscription)
+
+stellarium_hub = StellariumHub()
+
+
 # Called once for every client connection
 async def stellarium_handler(logger, reader, writer):
     # Create a stellarium object to hold all state info about the connection
     stellarium = Stellarium(logger, reader, writer)       
 
-    # Create a background task to send position updates whenever its binary protocol
-    asyncio.create_task(stellarium.every_500ms_send_position_update())
+    # Create a background task to start position updates whenever its binary protocol
+    updates = asyncio.create_task(stellarium.start_position_updates())
 
     # Perform the main Stellarium protocol reading and handling
-    await stellarium.client()
+    try:
+        await stellarium.client()
+    finally:
+        updates.cancel()
+        stellarium_hub.leave(stellarium)
 
 
 # Main entry for Stellarium
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# stream.py - Server push of the telescope position and motion state
+#
+# GET /stream/v1/telescope/0/state opens a Server-Sent Events stream with a
+# 'state' event for every new Polaris state snapshot (ie as the 518 position
+# updates arrive), so dashboards and tools can follow the mount without polling.
+#
+#   event: state
+#   id: <snapshot seq>
+#   data: {"seq":..,"timestamp":..,"altitude":..,"azimuth":..,...}
+#
+# The first event has all the fields, after that only the fields that changed
+# plus seq and timestamp. Each subscriber gets at most maxrate events per second
+# (?maxrate=N, capped at stream_max_rate in config.toml). A subscriber that can't
+# keep up skips to the latest snapshot, it never holds up the Polaris connection.
+# A ': ping' comment is sent after stream_heartbeat seconds without an event.
+#
+# Python Compatibility: Requires Python 3.7 or later
+# -----------------------------------------------------------------------------
+from falcon import Request, Response, HTTPBadRequest
+from falcon.asgi import SSEvent
+from logging import Logger
+from config import Config
+from shr import json_encode, log_request
+import telescope
+
+logger: Logger = None
+
+
+async def state_events(polaris, max_rate: float, client: str):
+    subscription = polaris.subscribe(max_rate)
+    logger.info(f'{client} <- stream opened, max rate {max_rate or "unlimited"}')
+    sent = {}
+    try:
+        state = polaris.state                           # start with the current state
+        while True:
+            if state is None:
+                yield None                              # heartbeat, also how a closed connection gets noticed
+            else:
+                fields = state._asdict()
+                # seq and timestamp change with every snapshot, skip snapshots with nothing else new
+                delta = {name: value for name, value in fields.items() if name not in sent or sent[name] != value}
+                if delta.keys() - {'seq', 'timestamp'} or not sent:
+                    delta['seq'] = state.seq
+                    delta['timestamp'] = state.timestamp
+                    yield SSEvent(data=json_encode(delta), event='state', event_id=str(state.seq))
+                    sent = fields
+            state = await subscription.get(Config.stream_heartbeat)
+    finally:
+        polaris.unsubscribe(subscription)
+        logger.info(f'{client} <- stream closed, {subscription.summary()}')
+
+
+class state:
+    async def on_get(self, req: Request, resp: Response, devnum: int):
+        await log_request(req)
+        # checked here rather than by PreProcessRequest, as a stream client (eg a browser EventSource) sends no ClientID
+        if devnum > telescope.maxdev:
+            msg = f'Device number {str(devnum)} does not exist. Maximum device number is {telescope.maxdev}.'
+            logger.error(msg)
+            raise HTTPBadRequest(title='Bad Alpaca Request', description=msg)
+        max_rate = req.get_param_as_float('maxrate', min_value=0, default=Config.stream_max_rate)
+        if Config.stream_max_rate > 0 and not 0 < max_rate <= Config.stream_max_rate:
+            max_rate = Config.stream_max_rate
+        resp.sse = state_events(telescope.polaris, max_rate, req.remote_addr)
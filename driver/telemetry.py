@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+#
+# -----------------------------------------------------------------------------
+# telemetry.py - Position history of the Polaris for drift, speed and settle analysis,
+#                and the binary recordings of the performance data (see below)
+#
+# TelemetryStore keeps the most recent 518 position updates in a fixed size ring
+# buffer, a NumPy structured array allocated once at startup. Each update is
+# written in place as one record, so the samples held are no Python objects and
+# memory stays at RECORD_DTYPE itemsize (25 bytes) per sample whatever the
+# length of the session: 200,000 samples (~2.8 hours at 20Hz) is 5MB, about 6x
+# less than a deque of tuples. Appending costs more per sample than a deque
+# (~0.6us against ~0.15us, see performance/benchmark_telemetry.py), which at
+# 20Hz is negligible.
+#
+# Positions are stored as float32, in steps of up to ~0.1" for RA (at 16-24h)
+# and azimuth and ~0.03" for Dec and altitude, well inside the AHRS noise. Times
+# are the int64 monotonic_ns() receive time of each update, increasing through
+# the ring, so windows are found by binary search.
+#
+# window() returns the samples between two times as a new array, and drift(),
+# speed() and settle_time() analyse a window by least squares rather than from
+# two noisy end points.
+#
+# -----------------------------------------------------------------------------
+import os
+import json
+import mmap
+import struct
+import numpy as np
+from bisect import bisect_left, bisect_right
+
+RECORD_DTYPE = np.dtype([
+    ('t_ns', '<i8'),                            # monotonic_ns() receive time
+    ('p_alt', '<f4'),                           # Polaris altitude (degrees)
+    ('p_az', '<f4'),                            # Polaris azimuth (degrees)
+    ('ra', '<f4'),                              # ASCOM right ascension (hours)
+    ('dec', '<f4'),                             # ASCOM declination (degrees)
+    ('flags', 'u1'),                            # TRACKING | SLEWING
+])
+TRACKING = 1
+SLEWING = 2
+
+
+class TelemetryStore:
+    def __init__(self, capacity: int = 200000):
+        self.capacity = capacity
+        self._buf = np.zeros(capacity, dtype=RECORD_DTYPE)
+        self._t_ns = self._buf['t_ns']              # view of the times, for last_ns()
+        self.clear()
+
+    def clear(self):
+        self._i = 0                                 # next slot to write
+        self.count = 0                              # number of samples held, up to capacity
+        self.appended = 0                           # number of samples appended since cleared
+
+    @property
+    def nbytes(self) -> int:
+        return self._buf.nbytes
+
+    def append(self, t_ns: int, p_alt: float, p_az: float, ra: float, dec: float, tracking: bool, slewing: bool):
+        i = self._i
+        # the whole record in one assignment, cheaper than one NumPy scalar assignment per field
+        self._buf[i] = (t_ns, p_alt, p_az, ra, dec, (TRACKING if tracking else 0) | (SLEWING if slewing else 0))
+        i += 1
+        self._i = 0 if i == self.capacity else i
+        if self.count < self.capacity:
+            self.count += 1
+        self.appended += 1
+
+    # The held samples as (older, newer) slices of the ring, each in time order
+    def _segments(self):
+        if self.count < self.capacity:
+            return (self._buf[:self.count],)
+        return (self._buf[self._i:], self._buf[:self._i])
+
+    def first_ns(self) -> int:
+        return int(self._segments()[0]['t_ns'][0]) if self.count else 0
+
+    def last_ns(self) -> int:
+        return int(self._t_ns[self._i - 1]) if self.count else 0
+
+    # Copy of the samples with start_ns <= t_ns <= end_ns (default to the newest), in time order
+    def window(self, start_ns: int, end_ns: int = None) -> np.ndarray:
+        parts = []
+        for seg in self._segments():
+            # bisect rather than np.searchsorted, which would copy the strided t_ns field of the whole ring first
+            t = seg['t_ns']
+            lo = bisect_left(t, start_ns)
+            hi = len(t) if end_ns is None else bisect_right(t, end_ns)
+            if hi > lo:
+                parts.append(seg[lo:hi])
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=RECORD_DTYPE)
+
+    # Copy of the samples in the last seconds before the newest one
+    def last(self, seconds: float) -> np.ndarray:
+        return self.window(self.last_ns() - int(seconds * 1e9))
+
+    # RA and Dec drift (arc seconds per minute) fitted over a window, None with under 2 samples.
+    # Positive when the position moves to lower RA/Dec, as for the DATA2 drift error.
+    @staticmethod
+    def drift(samples: np.ndarray):
+        if len(samples) < 2:
+            return None
+        t = (samples['t_ns'] - samples['t_ns'][0]) / 1e9
+        ra = np.unwrap(samples['ra'].astype(np.float64), period=24)
+        ra_rate = np.polyfit(t, ra, 1)[0]                           # hours per second
+        dec_rate = np.polyfit(t, samples['dec'].astype(np.float64), 1)[0]   # degrees per second
+        return float(-ra_rate * 3600 * 15 * 60), float(-dec_rate * 3600 * 60)
+
+    # Alt and az speed (degrees per second) fitted over a window, None with under 2 samples
+    @staticmethod
+    def speed(samples: np.ndarray):
+        if len(samples) < 2:
+            return None
+        t = (samples['t_ns'] - samples['t_ns'][0]) / 1e9
+        if t[-1] <= 0:
+            return None
+        alt_rate = np.polyfit(t, samples['p_alt'].astype(np.float64), 1)[0]
+        az_rate = np.polyfit(t, np.unwrap(samples['p_az'].astype(np.float64), period=360), 1)[0]
+        return float(alt_rate), float(az_rate)
+
+    # Seconds from the first sample of a window until RA/Dec stay within tolerance (arc seconds) of
+    # their final value (the median of the last second), None if they never settle within the window
+    @staticmethod
+    def settle_time(samples: np.ndarray, tolerance: float = 10.0):
+        if len(samples) < 2:
+            return None
+        t = (samples['t_ns'] - samples['t_ns'][0]) / 1e9
+        tail = t >= t[-1] - 1.0
+        ra = samples['ra'].astype(np.float64) * 15
+        dec = samples['dec'].astype(np.float64)
+        ra_end = np.median(ra[tail])
+        dec_end = np.median(dec[tail])
+        d_ra = ((ra - ra_end + 180) % 360 - 180) * np.cos(np.radians(dec_end))
+        err = np.hypot(d_ra, dec - dec_end) * 3600
+        outside = np.nonzero(err > tolerance)[0]
+        if not len(outside):
+            return 0.0
+        if outside[-1] == len(err) - 1:
+            return None
+        return float(t[outside[-1] + 1])
+
+
+# -----------------------------------------------------------------------------
+# Performance data recordings
+#
+# With log_performance_data_format = 'binary' the DATA1-DATA4 performance data
+# is recorded to alpaca.DATAn.tlm rather than logged as CSV lines in alpaca.csv.
+# Formatting every value and taking the logging handler locks for each row
+# (DATA4 on every 518 update) is replaced by writing one fixed size record into
+# a memory-mapped file.
+#
+# File layout, little endian:
+#   0   8 bytes   magic b'ABPTLM01'
+#   8   uint64    number of records, updated after each record is written
+#   16  uint32    length of the JSON description that follows
+#   20  JSON      {"dataset": "DATA4", "fields": [[name, numpy format], ...]}
+#   HEADER_SIZE   the records, packed, in RECORDING_DTYPES[dataset] layout
+#
+# The file is grown GROW_RECORDS at a time and cut to its records on close(),
+# and as the record count is kept in the header a recording stopped without
+# close() still reads back. The field names are the CSV column names, plus Wall
+# (the unix time of the row, in place of the log line timestamp), so
+# read_recording() loads straight into a NumPy array, and the notebooks'
+# performance_shr.load_telemetry() into a pandas DataFrame with the CSV columns.
+# -----------------------------------------------------------------------------
+MAGIC = b'ABPTLM01'
+HEADER_SIZE = 4096
+GROW_RECORDS = 65536
+
+RECORDING_DTYPES = {
+    'DATA1': np.dtype([('Wall', '<f8'), ('Time', '<f8'), ('AimAz', '<f8'), ('AimAlt', '<f8'), ('OffsetAz', '<f8'),
+                       ('OffsetAlt', '<f8'), ('AimErrorAz', '<f8'), ('AimErrorAlt', '<f8')]),
+    'DATA2': np.dtype([('Wall', '<f8'), ('Time', '<f8'), ('TrackingT0', '?'), ('TrackingT1', '?'), ('TargetRA', '<f8'),
+                       ('TargetDec', '<f8'), ('DriftErrRA', '<f8'), ('DriftErrDec', '<f8')]),
+    'DATA3': np.dtype([('Wall', '<f8'), ('Time', '<f8'), ('Interval', '<f8'), ('Constant', '?'), ('RateAz', '<f8'),
+                       ('SpeedAz', '<f8'), ('RateAlt', '<f8'), ('SpeedAlt', '<f8'), ('SpeedRA', '<f8'), ('SpeedDec', '<f8'),
+                       ('SpeedTotal', '<f8')]),     # SpeedTotal in degrees per second, rather than the CSV's d:m:s string
+    'DATA4': np.dtype([('Wall', '<f8'), ('Time', '<f8'), ('Tracking', '?'), ('Slewing', '?'), ('Gotoing', '?'),
+                       ('TargetRA', '<f8'), ('TargetDEC', '<f8'), ('AscomRA', '<f8'), ('AscomDEC', '<f8'), ('AscomAz', '<f8'),
+                       ('AscomAlt', '<f8'), ('ErrorRA', '<f8'), ('ErrorDec', '<f8')]),
+}
+
+
+class TelemetryRecorder:
+    def __init__(self, path: str, dataset: str, keep: int = 0):
+        self.path = path
+        self.dataset = dataset
+        self.dtype = RECORDING_DTYPES[dataset]
+        self.count = 0                              # number of records written
+        # keep the previous recordings as path.1 ... path.keep, as the log files are
+        for n in range(keep, 0, -1):
+            src = path if n == 1 else f"{path}.{n-1}"
+            if os.path.exists(src):
+                os.replace(src, f"{path}.{n}")
+        desc = json.dumps({'dataset': dataset, 'fields': [[name, self.dtype[name].str] for name in self.dtype.names]}).encode()
+        self._file = open(path, 'w+b')
+        self._file.write(MAGIC + struct.pack('<QI', 0, len(desc)) + desc)
+        self._capacity = 0
+        self._map(GROW_RECORDS)
+
+    def _map(self, capacity: int):
+        self._file.truncate(HEADER_SIZE + capacity * self.dtype.itemsize)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._records = np.ndarray(capacity, self.dtype, buffer=self._mmap, offset=HEADER_SIZE)
+        self._count = np.ndarray(1, '<u8', buffer=self._mmap, offset=len(MAGIC))
+        self._capacity = capacity
+
+    def _unmap(self):
+        # the arrays viewing the map must go before it can be closed
+        self._records = self._count = None
+        self._mmap.close()
+
+    def append(self, *values):
+        n = self.count
+        if n == self._capacity:
+            self._unmap()
+            self._map(self._capacity + GROW_RECORDS)
+        self._records[n] = values
+        self.count = n + 1
+        self._count[0] = n + 1
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._mmap.flush()
+        self._unmap()
+        self._file.truncate(HEADER_SIZE + self.count * self.dtype.itemsize)
+        self._file.close()
+
+
+# The number of records and the JSON description of a recording
+def _read_header(path: str):
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+    if header[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a telemetry recording")
+    count, desc_len = struct.unpack_from('<QI', header, len(MAGIC))
+    return count, json.loads(header[len(MAGIC) + 12:len(MAGIC) + 12 + desc_len])
+
+# The description of a recording: {"dataset": "DATA4", "fields": [[name, numpy format], ...]}
+def read_description(path: str) -> dict:
+    return _read_header(path)[1]
+
+# The records of a recording, as a read only array mapping the file
+def read_recording(path: str) -> np.ndarray:
+    count, desc = _read_header(path)
+    dtype = np.dtype([(name, fmt) for name, fmt in desc['fields']])
+    if not count:
+        return np.zeros(0, dtype)
+    return np.memmap(path, dtype, mode='r', offset=HEADER_SIZE, shape=(count,))
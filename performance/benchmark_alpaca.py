@@ -0,0 +1,391 @@
+# -----------------------------------------------------------------------------
+# benchmark_alpaca.py - Benchmarks for the Alpaca (ASCOM REST) read path
+#
+# Run from the performance directory:  python benchmark_alpaca.py
+#
+# Simulates a NINA style polling storm: several clients each reading the set of
+# telescope properties NINA polls, as fast as they can, while 518 position
+# updates are dispatched on the same asyncio loop.
+#
+# The HTTP benchmarks serve the driver's Falcon app with uvicorn in a separate
+# process, and load it from this process with keep-alive HTTP/1.1 clients.
+# -----------------------------------------------------------------------------
+import re
+import json
+import time
+import asyncio
+import logging
+import multiprocessing
+from threading import Lock
+from performance_shr import use_driver_modules, benchmark
+use_driver_modules()
+import uvicorn
+from falcon import Request, Response, Context, before, asgi
+from polaris import Polaris, PolarisFramer
+from benchmark_polaris_protocol import quiet_polaris, sample_518_frames
+
+# The telescope properties polled by NINA every refresh
+NINA_PROPERTIES = ('connected', 'altitude', 'azimuth', 'rightascension', 'declination', 'tracking',
+                   'slewing', 'atpark', 'athome', 'sideofpier', 'ispulseguiding', 'trackingrate', 'canslew')
+
+
+# The previous threading.Lock based property getters, kept here for comparison
+def locked_property(name):
+    attr = '_' + name
+    def getter(self):
+        self._lock.acquire()
+        res = getattr(self, attr)
+        self._lock.release()
+        return res
+    return property(getter)
+
+class LockedPolaris(Polaris):
+    def __init__(self, logger):
+        super().__init__(logger)
+        self._lock = Lock()
+
+for _name in NINA_PROPERTIES:
+    setattr(LockedPolaris, _name, locked_property(_name))
+
+
+def read_all(polaris):
+    for name in NINA_PROPERTIES:
+        getattr(polaris, name)
+
+def property_benchmarks():
+    print(f"\n== Reading the {len(NINA_PROPERTIES)} NINA polled properties ==")
+    polaris, logger = quiet_polaris()
+    locked = LockedPolaris(logger)
+    rate_old = benchmark('threading.Lock getters', lambda: read_all(locked))
+    rate_new = benchmark('single loop owner getters', lambda: read_all(polaris))
+    print(f"Speedup {rate_new/rate_old:.1f}x | {len(NINA_PROPERTIES)*rate_new/1e6:,.1f}M property reads/s")
+
+
+# n_clients polling the properties while 518 updates are dispatched at ahrs_hz, for duration seconds
+async def polling_storm(polaris, n_clients=8, ahrs_hz=200, duration=2.0):
+    messages = [m for m in PolarisFramer().feed(''.join(sample_518_frames()).encode()) if m[0] == '518']
+    reads = [0] * n_clients
+    done = False
+
+    async def feeder():
+        i = 0
+        while not done:
+            polaris.polaris_parse_cmd(*messages[i % len(messages)])
+            i += 1
+            await asyncio.sleep(1 / ahrs_hz)
+
+    async def client(n):
+        while not done:
+            for _ in range(100):
+                read_all(polaris)
+            reads[n] += 100
+            await asyncio.sleep(0)              # let the other clients and the feeder run
+
+    tasks = [asyncio.create_task(feeder())] + [asyncio.create_task(client(n)) for n in range(n_clients)]
+    await asyncio.sleep(duration)
+    done = True
+    await asyncio.gather(*tasks)
+    return sum(reads) / duration
+
+def storm_benchmarks():
+    print(f"\n== NINA polling storm: 8 clients, 200Hz 518 updates ==")
+    polaris, logger = quiet_polaris()
+    for label, p in (('threading.Lock getters', LockedPolaris(logger)), ('single loop owner getters', polaris)):
+        rate = asyncio.run(polling_storm(p))
+        print(f"{label:<50} {rate:14,.0f} polls/s ({len(NINA_PROPERTIES)} properties each)")
+
+
+# -------------------------------
+# HTTP server and load generator
+# -------------------------------
+def alpaca_app(routes=None):
+    # The driver's Falcon app with a connected (but idle) Polaris, with responders overridden by routes {name: class}
+    import shr
+    import telescope
+    import exceptions
+    from app import init_routes, API_VERSION
+    logger = logging.getLogger('benchmark')
+    logger.setLevel(logging.CRITICAL)
+    shr.logger = telescope.logger = exceptions.logger = logger
+    telescope.start_polaris(logger)
+    telescope.polaris._connected = True
+    falc_app = asgi.App()
+    init_routes(falc_app, 'telescope', telescope)
+    for name, responder in (routes or {}).items():
+        falc_app.add_route(f'/api/v{API_VERSION}/telescope/{{devnum:int(min=0)}}/{name}', responder())
+    return falc_app
+
+def serve(port, variant):
+    uvicorn.run(alpaca_app(VARIANTS[variant]), host='127.0.0.1', port=port, log_level='error')
+
+class AlpacaServer:
+    """Serve a variant of the Alpaca app in a separate process, as a context manager"""
+    port = 11111
+
+    def __init__(self, variant=None):
+        self.variant = variant
+
+    def __enter__(self):
+        AlpacaServer.port += 1
+        self.process = multiprocessing.Process(target=serve, args=(self.port, self.variant), daemon=True)
+        self.process.start()
+        asyncio.run(self._wait_ready())
+        return self
+
+    async def _wait_ready(self):
+        for _ in range(100):
+            try:
+                _, writer = await asyncio.open_connection('127.0.0.1', self.port)
+                writer.close()
+                return
+            except OSError:
+                await asyncio.sleep(0.1)
+        raise TimeoutError('Alpaca server did not start')
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.join()
+
+content_length = re.compile(rb'content-length: *(\d+)', re.I)
+
+async def http_get(reader, writer, path):
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+    head = await reader.readuntil(b'\r\n\r\n')
+    return await reader.readexactly(int(content_length.search(head).group(1)))
+
+# n_clients keep-alive connections each requesting paths in turn for duration seconds. Returns requests/s.
+async def http_load(port, paths, n_clients=8, duration=3.0):
+    until = time.perf_counter() + duration
+    counts = [0] * n_clients
+
+    async def client(n):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        i = 0
+        while time.perf_counter() < until:
+            path = paths[i % len(paths)]
+            i += 1
+            await http_get(reader, writer, f'{path}ClientID={n+1}&ClientTransactionID={i}')
+        counts[n] = i
+        writer.close()
+
+    await asyncio.gather(*(client(n) for n in range(n_clients)))
+    return sum(counts) / duration
+
+async def http_responses(port, paths):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    res = [await http_get(reader, writer, f'{path}ClientID=1&ClientTransactionID=7') for path in paths]
+    writer.close()
+    return res
+
+def same_response(a, b):
+    a, b = json.loads(a), json.loads(b)
+    a.pop('ServerTransactionID'), b.pop('ServerTransactionID')
+    return a == b
+
+# Call the ASGI app directly (no sockets or HTTP parsing) to measure the app's own cost per request
+async def asgi_get(app, path):
+    path, _, query = path.partition('?')
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+             'path': path, 'query_string': query.encode(), 'headers': [(b'host', b'localhost')],
+             'client': ('127.0.0.1', 50000), 'server': ('127.0.0.1', 11111)}
+    body = []
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+    async def send(message):
+        if message['type'] == 'http.response.body':
+            body.append(message.get('body', b''))
+    await app(scope, receive, send)
+    return b''.join(body)
+
+def asgi_benchmark(label, variant, paths, number=2000):
+    app = alpaca_app(VARIANTS[variant])
+    paths = [f'{path}ClientID=1&ClientTransactionID={i}' for i, path in enumerate(paths)]
+    async def run():
+        for i in range(number):
+            await asgi_get(app, paths[i % len(paths)])
+    loop = asyncio.new_event_loop()
+    rate = benchmark(label, lambda: loop.run_until_complete(run()), number=1, repeat=5) * number
+    loop.close()
+    print(f"{'':<50} {rate:14,.0f} requests/s")
+    return rate
+
+def telescope_path(name, args=''):
+    return f'/api/v1/telescope/0/{name}?{args}'
+
+
+# The static capability endpoints polled by clients, and the previous responders for them, kept for comparison
+STATIC_PATHS = [telescope_path(name) for name in ('canpark', 'canslew', 'canslewasync', 'cansync', 'cansettracking', 'canpulseguide',
+                'alignmentmode', 'aperturearea', 'trackingrates', 'equatorialsystem', 'description', 'name')] + [telescope_path('axisrates', 'Axis=0&')]
+
+# The previous PropertyResponse: ClientTransactionID parsed again and stdlib json.dumps to resp.text
+async def legacy_property_response(value, req):
+    import shr
+    res = {
+        "ServerTransactionID": shr.getNextTransId(),
+        "ClientTransactionID": int(await shr.get_request_field('ClientTransactionID', req, False, 0)),
+        "ErrorNumber": 0,
+        "ErrorMessage": ""
+    }
+    if not value is None:
+        res["Value"] = value
+        shr.log_response(req, str(value))
+    return json.dumps(res)
+
+def uncached_responder(getvalue):
+    from shr import PreProcessRequest
+    import telescope
+    @before(PreProcessRequest(0))
+    class responder:
+        async def on_get(self, req: Request, resp: Response, devnum: int):
+            if not telescope.polaris.connected:
+                return
+            resp.text = await legacy_property_response(getvalue(), req)
+    return responder
+
+def polaris_value(name):
+    import telescope
+    return lambda: getattr(telescope.polaris, name)
+
+def metadata_value(name):
+    import telescope
+    return lambda: getattr(telescope.TelescopeMetadata, name)
+
+# NINA_PROPERTIES served by a plain PropertyResponse(polaris.<name>)
+HTTP_POLLED = [name for name in NINA_PROPERTIES if name not in ('connected', 'ispulseguiding')]
+
+VARIANTS = {
+    None: None,
+    'uncached': {**{name: uncached_responder(polaris_value(name)) for name in ('canpark', 'canslew', 'canslewasync', 'cansync', 'cansettracking',
+                    'canpulseguide', 'alignmentmode', 'aperturearea', 'trackingrates', 'equatorialsystem', 'axisrates')},
+                 'description': uncached_responder(metadata_value('Description')), 'name': uncached_responder(metadata_value('Name'))},
+    'legacy': {name: uncached_responder(polaris_value(name)) for name in HTTP_POLLED},
+}
+
+def static_benchmarks():
+    print(f"\n== HTTP GET of {len(STATIC_PATHS)} static capability endpoints, 8 keep-alive clients ==")
+    results = {}
+    for label, variant in (('PropertyResponse per request', 'uncached'), ('StaticPropertyResponse', None)):
+        with AlpacaServer(variant) as server:
+            results[variant] = asyncio.run(http_responses(server.port, STATIC_PATHS))
+            rate = asyncio.run(http_load(server.port, STATIC_PATHS))
+        print(f"{label:<50} {rate:14,.0f} requests/s")
+    print("Falcon app only (no HTTP server):")
+    rate_old = asgi_benchmark('PropertyResponse per request', 'uncached', STATIC_PATHS)
+    rate_new = asgi_benchmark('StaticPropertyResponse', None, STATIC_PATHS)
+    print(f"Speedup {rate_new/rate_old:.2f}x")
+    # the same responses, apart from the ServerTransactionID
+    assert all(same_response(a, b) for a, b in zip(results['uncached'], results[None]))
+
+
+def polled_benchmarks():
+    paths = [telescope_path(name) for name in HTTP_POLLED]
+    print(f"\n== HTTP GET of {len(paths)} NINA polled properties, 8 keep-alive clients ==")
+    import shr
+    print(f"encoder: {shr.json_encode.__module__}.{shr.json_encode.__name__} ({'orjson' if hasattr(shr, 'orjson') else 'json'})")
+    results = {}
+    for label, variant in (('json.dumps, ClientTransactionID parsed twice', 'legacy'), ('json_encode, ClientTransactionID parsed once', None)):
+        with AlpacaServer(variant) as server:
+            results[variant] = asyncio.run(http_responses(server.port, paths))
+            rate = asyncio.run(http_load(server.port, paths))
+        print(f"{label:<50} {rate:14,.0f} requests/s")
+    print("Falcon app only (no HTTP server):")
+    rate_old = asgi_benchmark('json.dumps, ClientTransactionID parsed twice', 'legacy', paths)
+    rate_new = asgi_benchmark('json_encode, ClientTransactionID parsed once', None, paths)
+    print(f"Speedup {rate_new/rate_old:.2f}x")
+    assert all(json.loads(a).keys() == json.loads(b).keys() for a, b in zip(results['legacy'], results[None]))
+
+
+# The previous get_request_field: a linear scan of the params or form fields for each lookup
+async def legacy_get_request_field(name, req, caseless=False, default=None):
+    lcName = name.lower()
+    if req.method == 'GET':
+        for param in req.params.items():
+            if param[0].lower() == lcName:
+                return param[1]
+        return default
+    formdata = await req.get_media()
+    if caseless:
+        for fn in formdata.keys():
+            if fn.lower() == lcName:
+                return formdata[fn]
+    elif name in formdata and formdata[name] != '':
+        return formdata[name]
+    return default
+
+# The lookups made for one request: ClientID and ClientTransactionID checked by PreProcessRequest,
+# the responder's own fields, and ClientTransactionID for the response
+async def legacy_lookups(req, names):
+    from shr import PreProcessRequest
+    for name in ('ClientID', 'ClientTransactionID'):
+        if not PreProcessRequest._pos_or_zero(str(await legacy_get_request_field(name, req, True))):
+            raise ValueError(name)
+    for name in names:
+        await legacy_get_request_field(name, req)
+    int(await legacy_get_request_field('ClientTransactionID', req, False, 0))
+
+async def indexed_lookups(req, names):
+    import shr
+    await PRE_PROCESS._check_request(req, 0)
+    for name in names:
+        await shr.get_request_field(name, req)
+    await shr.client_transaction_id(req)
+
+def fields_benchmarks():
+    global PRE_PROCESS
+    from falcon import testing
+    from shr import PreProcessRequest
+    PRE_PROCESS = PreProcessRequest(0)
+    form = {'content-type': 'application/x-www-form-urlencoded'}
+    cases = (
+        ('PUT slewtocoordinatesasync', 'PUT', '', 'ClientID=1&ClientTransactionID=42&RightAscension=5.5881&Declination=-5.3911', ('RightAscension', 'Declination')),
+        ('GET altitude (NINA)', 'GET', 'ClientID=1&ClientTransactionID=42', b'', ()),
+        ('GET axisrates, mixed case params', 'GET', 'clientid=1&clienttransactionid=42&Axis=0', b'', ('Axis',)),
+    )
+    loop = asyncio.new_event_loop()
+    for label, method, query, body, names in cases:
+        print(f"\n== Request field lookups, {label} ==")
+        req = testing.create_asgi_req(method=method, path='/api/v1/telescope/0/x', query_string=query, body=body, headers=form)
+        async def run(lookups):
+            for _ in range(100):
+                req.context = Context()             # a fresh request, apart from the form data parsed (and cached) by Falcon
+                await lookups(req, names)
+        rates = [benchmark(name, lambda: loop.run_until_complete(run(lookups)), number=100) * 100
+                 for name, lookups in (('linear scan per lookup', legacy_lookups), ('case-folded index', indexed_lookups))]
+        print(f"Speedup {rates[1]/rates[0]:.2f}x | {1e6/rates[0]:.1f}us -> {1e6/rates[1]:.1f}us per request")
+    loop.close()
+
+
+# One client refreshing its view of the mount: the separate property endpoints, or one devicestate
+POLL_CYCLE = ('altitude', 'azimuth', 'rightascension', 'declination', 'siderealtime', 'utcdate',
+              'slewing', 'tracking', 'atpark', 'athome', 'sideofpier')
+
+async def poll_cycles(port, paths, duration=3.0):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    until = time.perf_counter() + duration
+    cycles = 0
+    while time.perf_counter() < until:
+        for path in paths:
+            await http_get(reader, writer, f'{path}ClientID=1&ClientTransactionID={cycles}')
+        cycles += 1
+    writer.close()
+    return duration / cycles
+
+def devicestate_benchmarks(wifi_rtt_ms=(2, 5, 20)):
+    print(f"\n== Full poll cycle: {len(POLL_CYCLE)} property GETs vs 1 devicestate GET, one client ==")
+    cycles = (('separate properties', [telescope_path(name) for name in POLL_CYCLE]), ('devicestate', [telescope_path('devicestate')]))
+    with AlpacaServer() as server:
+        names = {entry['Name'].lower() for entry in json.loads(asyncio.run(http_responses(server.port, cycles[1][1]))[0])['Value']}
+        assert set(POLL_CYCLE) <= names
+        cycle_s = [asyncio.run(poll_cycles(server.port, paths)) for _, paths in cycles]
+    print(f"{'':<24} {'localhost':>12}" + ''.join(f"{f'+{rtt}ms RTT':>14}" for rtt in wifi_rtt_ms))
+    for (label, paths), seconds in zip(cycles, cycle_s):
+        print(f"{label:<24} {seconds*1000:10.2f}ms" + ''.join(f"{(seconds + len(paths)*rtt/1000)*1000:12.1f}ms" for rtt in wifi_rtt_ms))
+
+
+if __name__ == '__main__':
+    property_benchmarks()
+    storm_benchmarks()
+    static_benchmarks()
+    polled_benchmarks()
+    fields_benchmarks()
+    devicestate_benchmarks()
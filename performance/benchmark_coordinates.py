@@ -0,0 +1,126 @@
+# -----------------------------------------------------------------------------
+# benchmark_coordinates.py - Accuracy and speed of the coordinate conversions
+#
+# Run from the performance directory:  python benchmark_coordinates.py
+#
+# Compares the cached CoordinateEngine used in the 518 position path with the
+# full ephem reductions it replaces, for random alt/az and ra/dec over the sky.
+# -----------------------------------------------------------------------------
+import math
+import time
+import random
+import ephem
+import numpy as np
+from performance_shr import use_driver_modules, benchmark
+use_driver_modules()
+from config import Config
+from coordinates import CoordinateEngine, unix2ephem
+
+
+def site_observer(pressure=Config.site_pressure):
+    observer = ephem.Observer()
+    observer.pressure = pressure
+    observer.epoch = ephem.J2000
+    observer.lat = math.radians(Config.site_latitude)
+    observer.long = math.radians(Config.site_longitude)
+    observer.elevation = Config.site_elevation
+    return observer
+
+def ephem_altaz2radec(observer, alt, az, t):
+    observer.date = unix2ephem(t)
+    ra, dec = observer.radec_of(az, alt)
+    return float(ra), float(dec)
+
+def ephem_radec2altaz(observer, ra, dec, t):
+    body = ephem.FixedBody()
+    body._ra, body._dec, body._epoch = ra, dec, ephem.J2000
+    observer.date = unix2ephem(t)
+    body.compute(observer)
+    return float(body.alt), float(body.az)
+
+def separation_arcsec(lon1, lat1, lon2, lat2):
+    return math.degrees(float(ephem.separation((lon1, lat1), (lon2, lat2)))) * 3600
+
+
+# ephem also applies the gravitational deflection of light by the Sun, which the engine does not model.
+# It is 1.75 arcsec at the Sun's limb but under 0.1 arcsec beyond 5 degrees, so samples closer to the Sun are skipped.
+def sun_separation_deg(ra, dec, t, sun=ephem.Sun()):
+    sun.compute(unix2ephem(t), epoch=ephem.J2000)
+    return math.degrees(float(ephem.separation((ra, dec), (sun.a_ra, sun.a_dec))))
+
+def accuracy(n=20000, min_alt=5, min_sun=5, seed=1):
+    rnd = random.Random(seed)
+    now = time.time()
+    for pressure in (Config.site_pressure, 0):
+        observer = site_observer(pressure)
+        engine = CoordinateEngine(site_observer(pressure))
+        worst_radec = worst_altaz = 0.0
+        worst_radec_at = worst_altaz_at = None
+        near_sun = 0
+        # a stream of 518 style updates, 1 year either side of now
+        t = now + rnd.uniform(-365, 365) * 86400
+        for i in range(n):
+            t += rnd.uniform(0, 0.2) if i % 1000 else rnd.uniform(-30, 30) * 86400
+            alt = math.radians(rnd.uniform(min_alt, 89.9))
+            az = math.radians(rnd.uniform(0, 360))
+            ra1, dec1 = ephem_altaz2radec(observer, alt, az, t)
+            ra2, dec2 = engine.altaz2radec(alt, az, t)
+            if sun_separation_deg(ra1, dec1, t) < min_sun:
+                near_sun += 1
+                continue
+            err = separation_arcsec(ra1, dec1, ra2, dec2)
+            if err > worst_radec:
+                worst_radec, worst_radec_at = err, math.degrees(alt)
+            alt1, az1 = ephem_radec2altaz(observer, ra1, dec1, t)
+            alt2, az2 = engine.radec2altaz(ra1, dec1, t)
+            err = separation_arcsec(az1, alt1, az2, alt2)
+            if err > worst_altaz:
+                worst_altaz, worst_altaz_at = err, math.degrees(alt1)
+        print(f"pressure {pressure:6.1f} | {n-near_sun} samples above {min_alt} deg alt, beyond {min_sun} deg from the Sun | {engine.calibrations} calibrations")
+        print(f"  altaz2radec max error {worst_radec:.3f} arcsec (at alt {worst_radec_at:.1f})")
+        print(f"  radec2altaz max error {worst_altaz:.3f} arcsec (at alt {worst_altaz_at:.1f})")
+
+
+def speed():
+    observer = site_observer()
+    engine = CoordinateEngine(site_observer())
+    alt, az = math.radians(35), math.radians(120)
+    ra, dec = ephem_altaz2radec(observer, alt, az, time.time())
+    print(f"\n== Conversions per second ==")
+    benchmark('ephem altaz2radec (radec_of)', lambda: ephem_altaz2radec(observer, alt, az, time.time()))
+    benchmark('CoordinateEngine.altaz2radec', lambda: engine.altaz2radec(alt, az, time.time()))
+    benchmark('ephem radec2altaz (FixedBody)', lambda: ephem_radec2altaz(observer, ra, dec, time.time()))
+    benchmark('CoordinateEngine.radec2altaz', lambda: engine.radec2altaz(ra, dec, time.time()))
+
+
+# The *_array conversions for a grid of positions over a night, against ephem one position at a time
+def batch(n_alt=40, n_az=90, n_times=25):
+    observer = site_observer()
+    engine = CoordinateEngine(site_observer())
+    now = time.time()
+    alt, az, t = np.meshgrid(np.radians(np.linspace(5, 89, n_alt)), np.radians(np.linspace(0, 356, n_az)), now + np.linspace(0, 12*3600, n_times), indexing='ij')
+    print(f"\n== Batch conversion of {alt.size} alt/az over 12 hours ==")
+    engine.altaz2radec_array(alt[0, 0], az[0, 0], t[0, 0])         # build the refraction table
+    start = time.perf_counter()
+    ra, dec = engine.altaz2radec_array(alt, az, t)
+    alt2, az2 = engine.radec2altaz_array(ra, dec, t)
+    batch_s = time.perf_counter() - start
+    start = time.perf_counter()
+    expected = [(ephem_altaz2radec(observer, alt[i], az[i], t[i]), ephem_radec2altaz(observer, ra[i], dec[i], t[i])) for i in np.ndindex(alt.shape)]
+    ephem_s = time.perf_counter() - start
+    worst_radec = worst_altaz = 0.0
+    for i, ((ra1, dec1), (alt1, az1)) in zip(np.ndindex(alt.shape), expected):
+        if sun_separation_deg(ra1, dec1, t[i]) < 5:
+            continue
+        worst_radec = max(worst_radec, separation_arcsec(ra1, dec1, ra[i], dec[i]))
+        worst_altaz = max(worst_altaz, separation_arcsec(az1, alt1, az2[i], alt2[i]))
+    print(f"altaz2radec_array max error {worst_radec:.3f} arcsec | radec2altaz_array max error {worst_altaz:.3f} arcsec")
+    print(f"{engine.calibrations} calibrations")
+    print(f"ephem {ephem_s*1000:9.1f}ms | *_array {batch_s*1000:7.1f}ms | speedup {ephem_s/batch_s:.0f}x")
+
+
+if __name__ == '__main__':
+    print(f"== Accuracy of CoordinateEngine against ephem ==")
+    accuracy()
+    speed()
+    batch()
@@ -0,0 +1,151 @@
+# -----------------------------------------------------------------------------
+# benchmark_estimator.py - Accuracy of the PositionEstimator against DATA4 position logs
+#
+# Run from the performance directory:
+#   python benchmark_estimator.py                 use a synthetic DATA4 trace
+#   python benchmark_estimator.py alpaca.csv ...  use DATA4 logs recorded by the driver
+#
+# To record a DATA4 log set log_performance_data = 4 in config.toml, and use the
+# Polaris through Nina or Stellarium (tracking, GOTOs and slews) for a while.
+#
+# The synthetic trace is a 20Hz AHRS stream (with jittered arrival times and
+# noise) that tracks a few targets at the sidereal rate with GOTO slews between
+# them, written as DATA4 lines and read back with the same loader.
+#
+# Each sample is predicted from the samples before it, as a reader asking just
+# before the next 518 update would get it, and compared to the value then
+# reported. The estimate is compared with holding the last value (what the
+# driver reported before), and its 1 sigma uncertainty checked for how often
+# the error is within 2 sigma.
+# -----------------------------------------------------------------------------
+import sys
+import math
+import random
+import numpy as np
+from performance_shr import use_driver_modules, benchmark
+use_driver_modules()
+from estimator import PositionEstimator
+from benchmark_polaris_protocol import quiet_polaris
+
+DATA4_COLUMNS = ['Time', 'Tracking', 'Slewing', 'Gotoing', 'TargetRA', 'TargetDEC', 'AscomRA', 'AscomDEC', 'AscomAz', 'AscomAlt', 'ErrorRA', 'ErrorDec']
+
+
+# (time s, alt, az, slewing) arrays from the DATA4 lines of a log
+def load_data4(lines):
+    rows = []
+    for line in lines:
+        i = line.find(',DATA4,')
+        if i < 0:
+            continue
+        f = line[i+7:].strip().split(',')
+        rows.append((float(f[0]), float(f[9]), float(f[8]), f[2] == 'True'))
+    t, alt, az, slewing = (np.array(c) for c in zip(*rows))
+    return t, alt, az, slewing
+
+# DATA4 lines for a 20Hz AHRS stream tracking targets, with GOTO slews between them
+def synthetic_data4(duration=600, hz=20, noise_arcsec=4.0, seed=1):
+    polaris, _ = quiet_polaris()
+    rnd = random.Random(seed)
+    t0 = 1.7e9
+    targets = [(rnd.uniform(0, 24), rnd.uniform(-60, 30)) for _ in range(6)]
+    dwell = duration / len(targets)
+    lines = []
+    t = 0.0
+    prev = None
+    for k, (ra, dec) in enumerate(targets):
+        # slew from the previous position: accelerate at 2 deg/s^2 to 3 deg/s, cruise, decelerate
+        end = t + dwell
+        start_alt, start_az = prev if prev else polaris.fast_radec2altaz(ra, dec, t0 + t)
+        slew_end = t
+        if prev:
+            alt1, az1 = polaris.fast_radec2altaz(ra, dec, t0 + t)
+            d_alt, d_az = alt1 - start_alt, (az1 - start_az + 180) % 360 - 180
+            dist = math.hypot(d_alt, d_az)
+            vmax, acc = 3.0, 2.0
+            t_acc = min(vmax / acc, math.sqrt(dist / acc))
+            t_cruise = max(0.0, (dist - acc * t_acc * t_acc) / vmax)
+            slew_s = 2 * t_acc + t_cruise
+            slew_end = t + slew_s
+        while t < end:
+            if t < slew_end:
+                s = t - (slew_end - slew_s)
+                if s < t_acc:
+                    d = 0.5 * acc * s * s
+                elif s < t_acc + t_cruise:
+                    d = 0.5 * acc * t_acc * t_acc + acc * t_acc * (s - t_acc)
+                else:
+                    r = slew_s - s
+                    d = dist - 0.5 * acc * r * r
+                f = d / dist
+                alt, az = start_alt + d_alt * f, (start_az + d_az * f) % 360
+                slewing = True
+            else:
+                alt, az = polaris.fast_radec2altaz(ra, dec, t0 + t)
+                slewing = False
+            n_alt = alt + rnd.gauss(0, noise_arcsec) / 3600
+            n_az = (az + rnd.gauss(0, noise_arcsec) / 3600 / max(0.2, math.cos(math.radians(alt)))) % 360
+            lines.append(f"2024 ,DATA4,{t:.3f},{not slewing},{slewing},{slewing},{ra:.7f},{dec:.7f},{ra:.7f},{dec:.7f},{n_az:.7f},{n_alt:.7f},0.000,0.000")
+            prev = (alt, az)
+            t += 1 / hz * rnd.uniform(0.8, 1.2)
+    return lines
+
+
+def sky_error_arcsec(alt, az, alt_ref, az_ref):
+    d_az = (az - az_ref + 180) % 360 - 180
+    return math.hypot(alt - alt_ref, d_az * math.cos(math.radians(alt_ref))) * 3600
+
+def evaluate(t, alt, az, slewing, **kwargs):
+    estimator = PositionEstimator(**kwargs)
+    hold, est, within_2sigma = [], [], []
+    for k in range(len(t)):
+        t_ns = int(t[k] * 1e9)
+        if k > 20:
+            e = estimator.estimate(t_ns)
+            hold.append(sky_error_arcsec(alt[k-1], az[k-1], alt[k], az[k]))
+            err = sky_error_arcsec(e.altitude, e.azimuth, alt[k], az[k])
+            est.append(err)
+            within_2sigma.append(err <= 2 * e.sigma)
+        estimator.add(t_ns, alt[k], az[k])
+    return np.array(hold), np.array(est), np.array(within_2sigma), slewing[21:]
+
+def stats(errors):
+    if not len(errors):
+        return f"{'-':>29}"
+    return f"rms {np.sqrt(np.mean(errors**2)):8.1f}\" p95 {np.percentile(errors, 95):8.1f}\""
+
+def accuracy_benchmarks(name, lines):
+    t, alt, az, slewing = load_data4(lines)
+    print(f"\n== {name}: {len(t)} DATA4 samples over {t[-1]-t[0]:.0f}s, {np.mean(np.diff(t))*1000:.0f}ms apart, {slewing.mean()*100:.0f}% slewing ==")
+    print(f"{'':<30} {'tracking':<31} {'slewing':<31} {'within 2 sigma'}")
+    first = True
+    for label, kwargs in (('velocity, 10 samples', dict(size=10, order=1)),
+                          ('velocity, 5 samples', dict(size=5, order=1)),
+                          ('acceleration, 10 samples', dict(size=10, order=2)),
+                          ('acceleration, 20 samples', dict(size=20, order=2))):
+        hold, est, within, slew = evaluate(t, alt, az, slewing, **kwargs)
+        if first:
+            print(f"{'hold last value':<30} {stats(hold[~slew])}  {stats(hold[slew])}")
+            first = False
+        print(f"{label:<30} {stats(est[~slew])}  {stats(est[slew])}  {within.mean()*100:5.1f}%")
+
+
+def cost_benchmarks():
+    print(f"\n== Cost per sample and per query ==")
+    polaris, _ = quiet_polaris()
+    estimator = polaris._estimator
+    for k in range(20):
+        estimator.add(k * 50_000_000, 45 + k * 0.001, 180 + k * 0.002)
+    t_ns = 20 * 50_000_000
+    benchmark('PositionEstimator.add (fit 10 samples)', lambda: estimator.add(t_ns, 45.02, 180.04), number=5000)
+    benchmark('PositionEstimator.estimate', lambda: estimator.estimate(t_ns + 25_000_000), number=20000)
+    benchmark('Polaris.estimate_state (with RA/Dec)', lambda: polaris.estimate_state(t_ns + 25_000_000), number=20000)
+
+
+if __name__ == '__main__':
+    if sys.argv[1:]:
+        for log_file in sys.argv[1:]:
+            with open(log_file, errors='replace') as f:
+                accuracy_benchmarks(log_file, f)
+    else:
+        accuracy_benchmarks('synthetic trace', synthetic_data4())
+    cost_benchmarks()
@@ -0,0 +1,396 @@
+# -----------------------------------------------------------------------------
+# benchmark_polaris_protocol.py - Benchmarks for the Polaris receive and send paths
+#
+# Run from the performance directory:  python benchmark_polaris_protocol.py
+#
+# Uses synthetic 518 position traffic in the layout sent by the Polaris, chopped
+# into 1024 byte reads in the same way as the TCP stream is read by the driver.
+# The send path is driven over a simulated slow link, see send_benchmarks() and
+# order_benchmarks(), and command replies over a FakePolaris that loses some of
+# them, see rpc_benchmarks().
+# -----------------------------------------------------------------------------
+import re
+import time
+import random
+import asyncio
+import logging
+from performance_shr import use_driver_modules, benchmark
+use_driver_modules()
+from config import Config
+from polaris import Polaris, PolarisFramer, PolarisSendQueue, parse_518_position
+
+
+# Recorded style 518 traffic (AHRS position update with quaternions), plus the odd keepalive/status reply
+def sample_518_frames(n=2000, seed=1):
+    rnd = random.Random(seed)
+    frames = []
+    for i in range(n):
+        compass = rnd.uniform(0, 360)
+        alt = rnd.uniform(-85, 5)
+        q = [rnd.uniform(-1, 1) for _ in range(8)]
+        frames.append(f"518@w:{q[0]:.6f};x:{q[1]:.6f};y:{q[2]:.6f};z:{q[3]:.6f};w1:{q[4]:.6f};x1:{q[5]:.6f};y1:{q[6]:.6f};z1:{q[7]:.6f};compass:{compass:.6f};alt:{alt:.6f};roll:0.000000;#")
+        if i % 50 == 0:
+            frames.append("284@mode:8;state:1;track:1;speed:0;#")
+        if i % 80 == 0:
+            frames.append("525@Tempa509ca361d0000265a;#")
+    return frames
+
+def sample_stream(frames, chunk=1024):
+    data = ''.join(frames).encode()
+    return [data[i:i+chunk] for i in range(0, len(data), chunk)]
+
+
+# The previous str based framing, kept here for comparison. With keep_partial=True
+# a partial frame is kept rather than discarded, to compare the copying on equal terms.
+class StrFramer:
+    msg_re = re.compile(r'^(\d\d\d)@([^#]*)#')
+
+    def __init__(self, keep_partial=False):
+        self.buffer = ''
+        self.bytes_copied = 0
+        self.keep_partial = keep_partial
+
+    def feed(self, data):
+        self.buffer += data.decode()
+        self.bytes_copied += len(self.buffer)
+        frames = []
+        while self.buffer:
+            m = self.msg_re.match(self.buffer)
+            if not m:
+                if not self.keep_partial:
+                    self.buffer = ''        # a partial frame throws away the whole buffer
+                break
+            self.buffer = self.buffer[len(m.group(0)):]
+            self.bytes_copied += len(self.buffer)
+            frames.append((m.group(1), m.group(2)))
+        return frames
+
+
+def framer_benchmarks():
+    frames = sample_518_frames()
+    chunks = sample_stream(frames)
+    print(f"\n== Framing {len(frames)} frames in {len(chunks)} reads of 1024 bytes ==")
+
+    def run(framer_class):
+        framer = framer_class()
+        n = 0
+        for chunk in chunks:
+            n += len(framer.feed(chunk))
+        return framer, n
+
+    keep_partial = lambda: StrFramer(keep_partial=True)
+    for label, framer_class in (('str framer', StrFramer), ('str framer (partial kept)', keep_partial), ('PolarisFramer', PolarisFramer)):
+        framer, n = run(framer_class)
+        print(f"{label:<26} frames {n:6} (lost {len(frames)-n:4} to partial reads) | bytes copied {framer.bytes_copied:12,}")
+    rate_old = benchmark('str framer (partial kept, all reads)', lambda: run(keep_partial), number=20)
+    rate_new = benchmark('PolarisFramer (all reads)', lambda: run(PolarisFramer), number=20)
+    print(f"Speedup {rate_new/rate_old:.1f}x | {len(frames)*rate_new/1e3:,.0f}k frames/s")
+
+
+def quiet_polaris():
+    Config.log_polaris = False
+    Config.log_polaris_protocol = False
+    Config.log_performance_data = 0
+    logger = logging.getLogger('benchmark')
+    logger.setLevel(logging.ERROR)
+    logging.getLogger('asyncio').setLevel(logging.CRITICAL)
+    return Polaris(logger), logger
+
+def dispatch_benchmarks():
+    polaris, _ = quiet_polaris()
+    messages = PolarisFramer().feed(''.join(sample_518_frames()).encode())
+    print(f"\n== Dispatching {len(messages)} messages through polaris_parse_cmd ==")
+    def dispatch():
+        for cmd, args in messages:
+            polaris.polaris_parse_cmd(cmd, args)
+    rate = benchmark('polaris_parse_cmd (all messages)', dispatch, number=10)
+    print(f"{len(messages)*rate/1e3:,.1f}k msgs/s")
+    for cmd, count, total_ms in polaris.command_stats():
+        print(f"cmd {cmd} | {count:7} msgs | {total_ms:9.1f}ms total | {total_ms/count*1000:7.1f}us per msg")
+
+def parse_518_benchmarks():
+    polaris, _ = quiet_polaris()
+    args = [a for cmd, a in PolarisFramer().feed(''.join(sample_518_frames()).encode()) if cmd == '518']
+    print(f"\n== Decoding {len(args)} sample 518 position messages ==")
+    def generic():
+        for a in args:
+            arg_dict = polaris.polaris_parse_args(a.decode())
+            float(arg_dict['compass'])
+            float(arg_dict['alt'])
+    def fast():
+        for a in args:
+            parse_518_position(a)
+    for a in args:
+        arg_dict = polaris.polaris_parse_args(a.decode())
+        assert parse_518_position(a) == (float(arg_dict['compass']), float(arg_dict['alt']))
+    rate_old = benchmark('decode + polaris_parse_args', generic, number=20)
+    rate_new = benchmark('parse_518_position', fast, number=20)
+    print(f"Speedup {rate_new/rate_old:.1f}x | {len(args)*rate_new/1e3:,.0f}k msgs/s")
+
+
+# A minimal Polaris device on localhost that answers MODE queries and streams 518 updates at ahrs_hz
+class FakePolaris:
+    def __init__(self, ahrs_hz=20):
+        self.ahrs_hz = ahrs_hz
+        self.received = []
+        self.drop_replies = {}                      # {cmd: n} to lose the next n replies to cmd
+        self.reply_delay = 0.0                      # seconds before replying to a command
+        self.goto_replies = 2                       # number of replies sent to a GOTO, slew started and slew stopped
+        self.goto_slew_time = 0.0                   # seconds from the slew started reply to the slew stopped reply
+
+    def reply(self, writer, cmd, msg, delay=0.0):
+        delay += self.reply_delay
+        if self.drop_replies.get(cmd):
+            self.drop_replies[cmd] -= 1
+        elif delay:
+            asyncio.get_running_loop().call_later(delay, writer.write, msg)
+        else:
+            writer.write(msg)
+
+    async def handler(self, reader, writer):
+        stream = asyncio.create_task(self.stream_518(writer))
+        try:
+            while True:
+                data = await reader.read(1024)
+                if not data:
+                    break
+                for msg in data.decode().split('#'):
+                    if msg:
+                        self.received.append(msg)
+                    if msg.startswith('1&284&'):
+                        self.reply(writer, '284', b'284@mode:8;state:1;track:1;speed:0;#')
+                    elif msg.startswith('1&531&'):
+                        self.reply(writer, '531', f"531@ret:{msg.split('state:')[1][0]};#".encode())
+                    elif msg.startswith('1&519&3&state:1'):
+                        for ret in range(1, self.goto_replies + 1):
+                            self.reply(writer, '519', f"519@ret:{ret};track:1;#".encode(), self.goto_slew_time if ret > 1 else 0.0)
+        finally:
+            stream.cancel()
+            writer.close()
+
+    async def stream_518(self, writer):
+        frames = sample_518_frames(1000)
+        i = 0
+        while True:
+            if frames[i].startswith('518'):
+                writer.write(frames[i].encode())
+            i = (i + 1) % len(frames)
+            await asyncio.sleep(1 / self.ahrs_hz)
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handler, '127.0.0.1', 0)
+        return self.server.sockets[0].getsockname()[1]
+
+
+# Connect a Polaris object to a FakePolaris and let it run for a while
+async def run_polaris(duration, ahrs_hz=20):
+    fake = FakePolaris(ahrs_hz)
+    Config.polaris_ip_address = '127.0.0.1'
+    Config.polaris_port = await fake.start()
+    polaris, logger = quiet_polaris()
+    client = asyncio.create_task(polaris.client(logger))
+    await asyncio.sleep(duration)
+    client.cancel()
+    fake.server.close()
+    return polaris, fake
+
+def latency_benchmarks():
+    print(f"\n== Receive to position update latency, 20Hz AHRS stream over localhost ==")
+    polaris, _ = asyncio.run(run_polaris(5))
+    print(f"518 latency: {polaris._latency_518.summary()}")
+    print(f"Framer: {polaris._framer.frames} frames | {polaris._framer.bytes_copied} bytes copied")
+
+
+# A link to the Polaris that delivers bytes_per_s. write() never blocks, drain() waits until everything
+# written so far has been delivered. Records when each message ('...#') arrives at the far end.
+class SlowLink:
+    def __init__(self, bytes_per_s):
+        self.bytes_per_s = bytes_per_s
+        self.busy_until = 0.0                       # time.perf_counter() when the bytes written so far are delivered
+        self.writes = 0
+        self.delivered = []                         # (delivery time, message)
+
+    def write(self, data):
+        now = time.perf_counter()
+        self.busy_until = max(self.busy_until, now) + len(data) / self.bytes_per_s
+        self.writes += 1
+        end = self.busy_until - len(data) / self.bytes_per_s
+        for msg in data.split(b'#')[:-1]:
+            end += (len(msg) + 1) / self.bytes_per_s
+            self.delivered.append((end, msg + b'#'))
+
+    async def drain(self):
+        delay = self.busy_until - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+# The previous send_msg, writing each message directly and waiting for drain, kept here for comparison
+class DirectSendPolaris(Polaris):
+    async def send_msg(self, msg, priority=PolarisSendQueue.NORMAL):
+        if self._writer:
+            self._writer.write(msg.encode())
+            await self._writer.drain()
+
+# A fast move repeating every 50ms while a stream of other commands (eg a goto or alignment)
+# is sent every 5ms, then the move stopped and the goto aborted part way through the stream
+async def send_session(polaris_class, bytes_per_s, commands=100):
+    polaris, _ = quiet_polaris()
+    polaris.__class__ = polaris_class
+    link = SlowLink(bytes_per_s)
+    polaris._writer = link
+    writer = asyncio.create_task(polaris._send_queue.writer(link))
+    repeat = "1&513&3&key:0;state:1;level:1500;#"
+    stop = "1&513&3&key:0;state:0;level:0;#"
+    abort = "1&520&3&state:0;yaw:0.0;pitch:0.0;lat:51.50000;track:0;speed:0;lng:-0.12000;#"
+
+    async def repeating():
+        while True:
+            asyncio.create_task(polaris.send_msg(repeat, PolarisSendQueue.REPEAT))
+            await asyncio.sleep(0.05)
+
+    async def stream():
+        sends = []
+        for _ in range(commands):
+            sends.append(asyncio.create_task(polaris.send_msg("1&284&3&-1;#")))
+            await asyncio.sleep(0.005)
+        await asyncio.gather(*sends)
+
+    repeater = asyncio.create_task(repeating())
+    streamer = asyncio.create_task(stream())
+    await asyncio.sleep(commands * 0.005 / 2)
+    t_stop = time.perf_counter()
+    repeater.cancel()
+    await asyncio.gather(polaris.send_msg(stop, PolarisSendQueue.URGENT), polaris.send_msg(abort, PolarisSendQueue.URGENT))
+    await streamer
+    await asyncio.sleep(max(0, link.busy_until - time.perf_counter()) + 0.05)
+    writer.cancel()
+    t_abort = next(t for t, m in link.delivered if m == abort.encode())
+    late_repeats = sum(1 for t, m in link.delivered if m == repeat.encode() and t > t_stop)
+    return polaris, link, (t_abort - t_stop) * 1000, late_repeats
+
+def send_benchmarks():
+    for bytes_per_s in (20000, 2000):
+        print(f"\n== Fast move + 100 commands at 200/s, stop + abort half way, over a {bytes_per_s:,} bytes/s link ==")
+        for label, polaris_class in (('direct write + drain', DirectSendPolaris), ('PolarisSendQueue', Polaris)):
+            polaris, link, abort_ms, late_repeats = asyncio.run(send_session(polaris_class, bytes_per_s))
+            print(f"{label:<22} abort delivered {abort_ms:7.1f}ms after it was sent | {len(link.delivered):3} msgs in {link.writes:3} writes | "
+                  f"{late_repeats} fast move repeats delivered after the stop")
+            if polaris_class is Polaris:
+                print(f"{'':<22} {polaris._send_queue.summary()}")
+
+# A slow move start then stop, and a GOTO then abort, each queued while the writer is waiting on drain().
+# Returns the messages in the order they reached the far end of the link.
+async def order_session(bytes_per_s=2000):
+    polaris, _ = quiet_polaris()
+    link = SlowLink(bytes_per_s)
+    polaris._writer = link
+    writer = asyncio.create_task(polaris._send_queue.writer(link))
+    goto = f"1&519&3&state:1;yaw:10.0;pitch:45.0;lat:51.50000;track:1;speed:0;lng:-0.12000;#"
+    await polaris.send_msg("1&284&3&-1;#")                          # keeps the writer in drain() while the rest is queued
+    await asyncio.sleep(0.001)
+    await polaris.move_axis(0, 0.5)
+    await polaris.move_axis(0, 0)
+    await asyncio.sleep(0.001)
+    await polaris.send_msg(goto)
+    await polaris.send_cmd_goto_abort()
+    await asyncio.sleep(max(0, link.busy_until - time.perf_counter()) + 0.05)
+    writer.cancel()
+    return [m.decode() for _, m in link.delivered]
+
+def order_benchmarks():
+    print(f"\n== Move start + stop and GOTO + abort queued while a drain() is pending ==")
+    delivered = asyncio.run(order_session())
+    for msg in delivered:
+        print(f"  {msg}")
+    start = next(i for i, m in enumerate(delivered) if 'state:1;level' in m)
+    stop = next(i for i, m in enumerate(delivered) if 'state:0;level' in m)
+    goto = next(i for i, m in enumerate(delivered) if m.startswith('1&519&3&state:1'))
+    abort = next(i for i, m in enumerate(delivered) if m.startswith('1&519&3&state:0'))
+    assert start < stop and goto < abort
+    print("stop sent after the start, abort sent after the GOTO")
+
+# Commands and their replies over localhost: concurrent callers, lost replies and a lost GOTO completion
+async def rpc_session():
+    fake = FakePolaris(20)
+    Config.polaris_ip_address = '127.0.0.1'
+    Config.polaris_port = await fake.start()
+    Config.tracking_settle_time = 0
+    Config.polaris_reply_timeout = 0.2
+    Config.polaris_goto_timeout = 1
+    polaris, logger = quiet_polaris()
+    client = asyncio.create_task(polaris.client(logger))
+    while not polaris.connected:
+        await asyncio.sleep(0.05)
+    rpc = polaris._rpc
+
+    print(f"\n-- 3 MODE queries + 2 TRACK changes at once, 100 times --")
+    for i in range(100):
+        replies = await asyncio.gather(polaris.send_cmd_query_current_mode(), polaris.send_cmd_change_tracking_state(i % 2 == 0),
+                                       polaris.send_cmd_query_current_mode(), polaris.send_cmd_change_tracking_state(i % 2 == 1),
+                                       polaris.send_cmd_query_current_mode())
+        assert all(r['mode'] == '8' for r in replies[::2])
+    print(f"all callers answered | {rpc.summary()}")
+
+    print(f"\n-- 20 TRACK changes with the first reply to each lost (timeout {Config.polaris_reply_timeout}s, {Config.polaris_reply_retries} retries) --")
+    t0 = time.perf_counter()
+    for i in range(20):
+        fake.drop_replies['531'] = 1
+        await polaris.send_cmd_change_tracking_state(i % 2 == 0)
+    print(f"all answered after a resend, {(time.perf_counter()-t0)/20*1000:.0f}ms each | {rpc.summary()}")
+
+    print(f"\n-- GOTO with its slew stopped reply lost (goto timeout {Config.polaris_goto_timeout}s) --")
+    fake.reply_delay = 0.05
+    fake.goto_replies = 1
+    polaris._tracking = False
+    goto = asyncio.create_task(polaris.send_cmd_goto_altaz(45, 10))
+    t0 = time.perf_counter()
+    try:
+        await goto
+        print("GOTO completed")
+    except Exception as e:
+        print(f"{type(e).__name__}: {e} after {time.perf_counter()-t0:.2f}s | slewing {polaris.state.slewing}")
+
+    print(f"\n-- GOTO with its slew started reply late (reply timeout {Config.polaris_reply_timeout}s), then another GOTO --")
+    await asyncio.sleep(rpc.STALE_REPLY_WINDOW)      # let the reply owed to the GOTO above (never sent) expire
+    fake.goto_replies = 2
+    fake.reply_delay = Config.polaris_reply_timeout + 0.1
+    sent = sum(1 for m in fake.received if m.startswith('1&519&3&state:1'))
+    try:
+        await polaris.send_cmd_goto_altaz(45, 10)
+        print("GOTO completed")
+    except Exception as e:
+        print(f"{type(e).__name__}: {e} | GOTO sent {sum(1 for m in fake.received if m.startswith('1&519&3&state:1')) - sent} time(s)")
+    fake.reply_delay = 0.05
+    fake.goto_slew_time = 0.5
+    t0 = time.perf_counter()
+    ret = await polaris.send_cmd_goto_altaz(45, 10)
+    fake.goto_slew_time = 0.0
+    fake.goto_replies = 1
+    print(f"next GOTO returned {ret} after {time.perf_counter()-t0:.2f}s (slew {0.5}s) | {rpc.summary()}")
+    assert ret['ret'] == '2'
+
+    print(f"\n-- GOTO aborted while waiting for the slew to stop --")
+    goto = asyncio.create_task(polaris.send_cmd_goto_altaz(45, 10))
+    await asyncio.sleep(0.1)
+    await polaris.send_cmd_goto_abort()
+    print(f"GOTO returned {await goto} | slewing {polaris.state.slewing} | {rpc.summary()}")
+
+    print(f"\n-- Send to reply latency by command --")
+    for reply, latency in rpc.stats():
+        print(f"{reply:<6} {latency.summary()}")
+    client.cancel()
+    fake.server.close()
+
+def rpc_benchmarks():
+    print(f"\n== Polaris command replies over localhost ==")
+    asyncio.run(rpc_session())
+
+
+if __name__ == '__main__':
+    framer_benchmarks()
+    parse_518_benchmarks()
+    dispatch_benchmarks()
+    latency_benchmarks()
+    send_benchmarks()
+    order_benchmarks()
+    rpc_benchmarks()
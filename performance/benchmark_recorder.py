@@ -0,0 +1,118 @@
+# -----------------------------------------------------------------------------
+# benchmark_recorder.py - Binary telemetry recordings against the CSV performance data logging
+#
+# Run from the performance directory:  python benchmark_recorder.py
+#
+# Writes the same DATA4 rows (the heavy, every 518 update, performance data)
+# both ways in a temporary directory: as CSV lines through a logger set up as
+# log.py sets up the alpaca.csv file handler, and with a TelemetryRecorder, and
+# compares the cost per row, the file size and the time to load the data for a
+# notebook (pandas if installed, otherwise the csv module / NumPy).
+# -----------------------------------------------------------------------------
+import os
+import csv
+import time
+import random
+import logging
+import logging.handlers
+import tempfile
+import numpy as np
+from performance_shr import use_driver_modules, load_telemetry
+use_driver_modules()
+from telemetry import TelemetryRecorder, read_recording
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+DATA4_HEADER = ",Dataset,Time,Tracking,Slewing,Gotoing,TargetRA,TargetDEC,AscomRA,AscomDEC,AscomAz,AscomAlt,ErrorRA,ErrorDec"
+
+
+def sample_rows(n, seed=1):
+    rnd = random.Random(seed)
+    return [(1.7e9 + i / 20, i / 20, True, False, False, 5.5881, -5.3911, 5.5881 + rnd.gauss(0, 1e-4), -5.3911 + rnd.gauss(0, 1e-3),
+             rnd.uniform(0, 360), rnd.uniform(10, 80), rnd.gauss(0, 5), rnd.gauss(0, 5)) for i in range(n)]
+
+def csv_logger(path):
+    logger = logging.getLogger('benchmark_recorder')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    formatter = logging.Formatter('%(asctime)s.%(msecs)03d %(levelname)s %(message)s', '%Y-%m-%dT%H:%M:%S')
+    formatter.converter = time.gmtime
+    handler = logging.handlers.RotatingFileHandler(path, mode='w', maxBytes=2**40, backupCount=1)
+    handler.setFormatter(formatter)
+    logger.handlers = [handler]
+    return logger, handler
+
+def write_csv(path, rows):
+    logger, handler = csv_logger(path)
+    logger.info(DATA4_HEADER)
+    t0 = time.perf_counter()
+    for wall, t, a_track, a_slew, a_goto, t_ra, t_dec, a_ra, a_dec, a_az, a_alt, e_ra, e_dec in rows:
+        logger.info(f",DATA4,{t:.3f},{a_track},{a_slew},{a_goto},{t_ra:.7f},{t_dec:.7f},{a_ra:.7f},{a_dec:.7f},{a_az:.7f},{a_alt:.7f},{e_ra:.3f},{e_dec:.3f}")
+    elapsed = time.perf_counter() - t0
+    handler.close()
+    return elapsed
+
+def write_binary(path, rows):
+    recorder = TelemetryRecorder(path, 'DATA4')
+    t0 = time.perf_counter()
+    for row in rows:
+        recorder.append(*row)
+    elapsed = time.perf_counter() - t0
+    recorder.close()
+    return elapsed
+
+def load_csv(path):
+    if pd is not None:
+        data = pd.read_csv(path)
+        data.columns = ['Log'] + data.columns[1:].tolist()
+        return data[data.Dataset == 'DATA4']
+    with open(path) as f:
+        rows = [r[2:] for r in csv.reader(f) if len(r) > 1 and r[1] == 'DATA4']
+    return np.array([[float(v) if v not in ('True', 'False') else v == 'True' for v in r] for r in rows])
+
+def load_binary(path):
+    if pd is not None:
+        return load_telemetry(path)
+    return np.asarray(read_recording(path)).copy()
+
+
+def recorder_benchmarks(n=200000):
+    rows = sample_rows(n)
+    print(f"\n== {n:,} DATA4 rows (~{n/20/3600:.1f} hours of 518 updates at 20Hz) ==")
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'alpaca.csv')
+        tlm_path = os.path.join(tmp, 'alpaca.DATA4.tlm')
+        csv_s = write_csv(csv_path, rows)
+        tlm_s = write_binary(tlm_path, rows)
+        print(f"{'write CSV lines (logger)':<32} {csv_s/n*1e6:7.2f} us/row | {os.path.getsize(csv_path)/1e6:6.1f}MB")
+        print(f"{'write TelemetryRecorder':<32} {tlm_s/n*1e6:7.2f} us/row | {os.path.getsize(tlm_path)/1e6:6.1f}MB")
+        print(f"Speedup {csv_s/tlm_s:.1f}x")
+
+        loader = 'pandas' if pd is not None else 'csv module / NumPy (pandas not installed)'
+        t0 = time.perf_counter()
+        csv_data = load_csv(csv_path)
+        csv_load = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        tlm_data = load_binary(tlm_path)
+        tlm_load = time.perf_counter() - t0
+        print(f"\nLoad for a notebook with {loader}:")
+        print(f"{'load alpaca.csv':<32} {csv_load*1000:8.1f}ms | {len(csv_data):,} rows")
+        print(f"{'load alpaca.DATA4.tlm':<32} {tlm_load*1000:8.1f}ms | {len(tlm_data):,} rows")
+        print(f"Speedup {csv_load/tlm_load:.0f}x")
+
+        records = read_recording(tlm_path)
+        assert len(records) == n and records['AscomAz'][-1] == rows[-1][9]
+
+        # a recording stopped without close() (eg the driver killed) still reads back its records
+        recorder = TelemetryRecorder(os.path.join(tmp, 'killed.tlm'), 'DATA4')
+        for row in rows[:1000]:
+            recorder.append(*row)
+        print(f"\nRecording not closed: {len(read_recording(recorder.path))} of 1000 rows read back")
+        recorder.close()
+
+
+if __name__ == '__main__':
+    recorder_benchmarks()
@@ -0,0 +1,418 @@
+# -----------------------------------------------------------------------------
+# benchmark_stellarium.py - Benchmarks for the Stellarium telescope service
+#
+# Run from the performance directory:  python benchmark_stellarium.py
+#
+# Connects a Polaris object to a FakePolaris streaming 518 updates for a chosen
+# trajectory (tracking a star, or slewing), serves the Stellarium telescope
+# protocol on localhost and connects a Stellarium Binary protocol or a SynScan
+# protocol (Stellarium PLUS) client to it.
+# -----------------------------------------------------------------------------
+import time
+import random
+import asyncio
+import logging
+from performance_shr import use_driver_modules
+use_driver_modules()
+from config import Config
+from coordinates import CoordinateEngine
+from shr import rad2deg, hr2rad, deg2rad, TokenBucket, DeviceMetadata
+import telescope
+from stellarium import Stellarium, stellarium_hub, HubClient, position_encodings, radec2bytes, bytes2radect, position_change_arcsec, radec_to_SynScan24bit
+from benchmark_polaris_protocol import FakePolaris, quiet_polaris
+from benchmark_coordinates import site_observer
+
+
+# A FakePolaris whose 518 updates follow position(t) -> (alt, az) in degrees
+class TrajectoryPolaris(FakePolaris):
+    def __init__(self, position, ahrs_hz=20):
+        super().__init__(ahrs_hz)
+        self.position = position
+
+    async def stream_518(self, writer):
+        while True:
+            alt, az = self.position(time.time())
+            writer.write(f"518@w:0.5;x:0.5;y:0.5;z:0.5;w1:0.5;x1:0.5;y1:0.5;z1:0.5;compass:{az % 360:.6f};alt:{-alt:.6f};roll:0.000000;#".encode())
+            await asyncio.sleep(1 / self.ahrs_hz)
+
+# Tracking a star: the alt/az of a fixed ra (hours) / dec (degrees), with AHRS noise of noise_arcsec
+def tracking(ra, dec, noise_arcsec=1.0, seed=1):
+    engine = CoordinateEngine(site_observer())
+    rnd = random.Random(seed)
+    def position(t):
+        alt, az = engine.radec2altaz(hr2rad(ra), deg2rad(dec), t)
+        return rad2deg(alt) + rnd.gauss(0, noise_arcsec / 3600), rad2deg(az) + rnd.gauss(0, noise_arcsec / 3600)
+    return position
+
+# Slewing in azimuth at rate degrees/s
+def slewing(alt=40.0, rate=3.0):
+    t0 = time.time()
+    return lambda t: (alt, (t - t0) * rate)
+
+
+# The previous fixed timer position updates, kept here for comparison
+class TimerStellarium(Stellarium):
+    async def start_position_updates(self):
+        await asyncio.sleep(5)
+        while True:
+            if self.stellarium_binary_protocol:
+                state = telescope.polaris.state
+                await self.stellarium_send_msg(radec2bytes(state.rightascension, state.declination, int(time.time())), ispolled=True)
+            await asyncio.sleep(0.5)
+
+# The previous event driven position updates with a subscription, checks and encoding per connection, kept here for comparison
+class PerConnectionStellarium(Stellarium):
+    async def start_position_updates(self):
+        await asyncio.sleep(5)
+        polaris = telescope.polaris
+        subscription = polaris.subscribe(Config.stellarium_update_max_rate)
+        sent_ra = sent_dec = None
+        sent_at = 0.0
+        try:
+            state = polaris.state
+            while True:
+                if self.stellarium_binary_protocol:
+                    now = time.monotonic()
+                    if state is None:
+                        state = polaris.state
+                    ra, dec = state.rightascension, state.declination
+                    if sent_ra is None or now - sent_at >= Config.stellarium_update_heartbeat or \
+                            position_change_arcsec(ra, dec, sent_ra, sent_dec) > Config.stellarium_update_threshold:
+                        await self.stellarium_send_msg(radec2bytes(ra, dec, int(time.time())), ispolled=True)
+                        sent_ra, sent_dec, sent_at = ra, dec, now
+                state = await subscription.get(Config.stellarium_update_heartbeat)
+        finally:
+            polaris.unsubscribe(subscription)
+
+async def stellarium_handler(stellarium_class, logger, reader, writer):
+    s = stellarium_class(logger, reader, writer)
+    updates = asyncio.create_task(s.start_position_updates())
+    try:
+        await s.client()
+    finally:
+        updates.cancel()
+        stellarium_hub.leave(s)
+
+
+# A Stellarium Binary protocol client, comparing the position it displays with the driver's current position
+# every 10ms, for duration seconds from the first update. Returns (updates/s, mean and p99 arc seconds behind).
+async def binary_client(port, duration):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    data = await reader.readexactly(26)                 # the updates start 5s after connecting
+    displayed = bytes2radect(data)[:2]
+    updates = 0
+    errors = []
+
+    async def read_frames():
+        nonlocal displayed, updates
+        while True:
+            data = await reader.readexactly(26)
+            displayed = bytes2radect(data)[:2]
+            updates += 1
+
+    reading = asyncio.create_task(read_frames())
+    until = time.monotonic() + duration
+    while time.monotonic() < until:
+        await asyncio.sleep(0.01)
+        state = telescope.polaris.state
+        errors.append(position_change_arcsec(state.rightascension, state.declination, *displayed))
+    reading.cancel()
+    writer.close()
+    errors.sort()
+    return updates / duration, sum(errors) / len(errors), errors[int(len(errors) * 0.99)]
+
+async def run_stellarium(stellarium_class, position, duration=10.0):
+    fake = TrajectoryPolaris(position)
+    Config.polaris_ip_address = '127.0.0.1'
+    Config.polaris_port = await fake.start()
+    polaris, logger = quiet_polaris()
+    telescope.polaris = polaris
+    polaris_client = asyncio.create_task(polaris.client(logger))
+    server = await asyncio.start_server(lambda r, w: stellarium_handler(stellarium_class, logger, r, w), '127.0.0.1', 0)
+    result = await binary_client(server.sockets[0].getsockname()[1], duration)
+    server.close()
+    polaris_client.cancel()
+    fake.server.close()
+    return result
+
+
+def position_update_benchmarks(duration=10.0):
+    print(f"\n== Stellarium Binary protocol position updates, 20Hz 518 updates ==")
+    print(f"threshold {Config.stellarium_update_threshold} arcsec | max rate {Config.stellarium_update_max_rate}/s | heartbeat {Config.stellarium_update_heartbeat}s")
+    scenarios = (('tracking (1 arcsec AHRS noise)', lambda: tracking(5.5, -5.4)),
+                 ('tracking (10 arcsec AHRS noise)', lambda: tracking(5.5, -5.4, noise_arcsec=10)),
+                 ('slewing 3 deg/s', slewing))
+    for label, position in scenarios:
+        for name, stellarium_class in (('500ms timer', TimerStellarium), ('event driven', Stellarium)):
+            rate, mean_err, p99_err = asyncio.run(run_stellarium(stellarium_class, position(), duration))
+            print(f"{label:<32} {name:<13} {rate:5.1f} updates/s | {rate*26:6.0f} bytes/s | "
+                  f"displayed position behind driver: mean {mean_err:9.1f} arcsec, p99 {p99_err:9.1f} arcsec")
+
+
+class FakeWriter:
+    def __init__(self):
+        self.bytes_written = 0
+
+    def write(self, data):
+        self.bytes_written += len(data)
+
+    async def drain(self):
+        pass
+
+# The previous if/elif dispatch and per call replies, kept here for comparison. Trimmed to
+# the polled commands benchmarked, but with the same order of tests as the original.
+class ElifStellarium(Stellarium):
+    async def process_protocol(self, data):
+        if Config.log_stellarium_protocol:
+            if not(Config.supress_stellarium_polling_msgs and (data[0]==0x4c or data[0]==0x65)):
+                self.logger.info(f"<<- Stellarium: recv_msg: {data}")
+        if data[0]==0x4b:
+            pass
+        elif data[0]==0x4c:
+            await self.poll_limiter.acquire()
+            state = telescope.polaris.state
+            msg = b'1#' if state.gotoing else b'0#'
+            await self.stellarium_send_msg(msg, ispolled=True)
+        elif data[0]==0x74:
+            tracking = telescope.polaris.state.tracking
+            msg = bytearray([2,ord('#')]) if tracking else bytearray([0,ord('#')])
+            await self.stellarium_send_msg(msg, ispolled=True)
+        elif data[0]==0x54:
+            pass
+        elif data[0]==0x4a:
+            msg = bytearray([1, ord('#')]) if telescope.polaris.connected else bytearray([0, ord('#')])
+            await self.stellarium_send_msg(msg, ispolled=True)
+        elif data[0]==0x4d:
+            pass
+        elif data[0]==0x50 and data[1]==0x02:
+            pass
+        elif data[0]==0x56:
+            version = DeviceMetadata.VersionSynScan
+            self.logger.info(f"<<- Stellarium: SynScan Get VERSION Command 'V' | {version}")
+            msg = bytearray(ord(c) for c in version)
+            await self.stellarium_send_msg(msg)
+        elif data[0]==0x65:
+            await self.poll_limiter.acquire()
+            state = telescope.polaris.state
+            msg = radec_to_SynScan24bit(state.rightascension, state.declination)
+            await self.stellarium_send_msg(msg, ispolled=True)
+        else:
+            self.logger.error(f"<<- Stellarium: Unknown Command: {data}")
+
+# Stellarium PLUS style polling, with the odd version query
+DISPATCH_COMMANDS = [b'e', b'L', b'e', b'L', b't', b'J', b'e', b'L', b'V']
+
+def dispatch_benchmarks(number=5000, repeat=5):
+    polaris, logger = quiet_polaris()
+    logger.setLevel(logging.CRITICAL)
+    telescope.polaris = polaris
+    print(f"\n== Dispatching SynScan polling commands through process_protocol, fake writer ==")
+    def rate(stellarium_class, commands):
+        s = stellarium_class(logger, None, FakeWriter())
+        s.poll_limiter = TokenBucket(0)
+        async def run():
+            for _ in range(number):
+                for command in commands:
+                    await s.process_protocol(command)
+        loop = asyncio.new_event_loop()
+        best = min(timed(loop, run) for _ in range(repeat))
+        loop.close()
+        return number * len(commands) / best
+    for label, commands in [('polling mix', DISPATCH_COMMANDS)] + [(f"'{c.decode()}' only", [c]) for c in (b'e', b'L', b't', b'J', b'V')]:
+        old, new = rate(ElifStellarium, commands), rate(Stellarium, commands)
+        print(f"{label:<12} if/elif {old:10,.0f} commands/s | HANDLERS table {new:10,.0f} commands/s | speedup {new/old:.2f}x")
+
+def timed(loop, coro_fn):
+    t0 = time.perf_counter()
+    loop.run_until_complete(coro_fn())
+    return time.perf_counter() - t0
+
+
+# The previous fixed sleeps in the SynScan request loop, kept here for comparison
+class SleepStellarium(Stellarium):
+    def __init__(self, logger, reader, writer):
+        super().__init__(logger, reader, writer)
+        self.poll_limiter = TokenBucket(0)
+
+    async def process_protocol(self, data):
+        if data[0] == 0x65:
+            await asyncio.sleep(0.1)
+        await super().process_protocol(data)
+
+    async def client(self):
+        while True:
+            data = await self.reader.read(256)
+            if not data:
+                break
+            await self.process_protocol(data)
+            await asyncio.sleep(0.25)
+
+# A Stellarium PLUS style client polling 'e' and 'L' back to back, sending a control command every
+# command_interval seconds. Returns (polls/s, command round trip latencies in ms).
+async def synscan_client(port, duration, command=b'M', command_interval=0.5):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(b'Ka')
+    await reader.readuntil(b'#')
+    polls = 0
+    latencies = []
+    until = time.monotonic() + duration
+    next_command = time.monotonic() + command_interval
+    while time.monotonic() < until:
+        if time.monotonic() >= next_command:
+            t0 = time.perf_counter()
+            writer.write(command)
+            await reader.readuntil(b'#')
+            latencies.append((time.perf_counter() - t0) * 1000)
+            next_command += command_interval
+        else:
+            for query in (b'e', b'L'):
+                writer.write(query)
+                await reader.readuntil(b'#')
+                polls += 1
+    writer.close()
+    return polls / duration, sorted(latencies)
+
+async def run_synscan(stellarium_class, duration=10.0):
+    fake = TrajectoryPolaris(tracking(5.5, -5.4))
+    Config.polaris_ip_address = '127.0.0.1'
+    Config.polaris_port = await fake.start()
+    polaris, logger = quiet_polaris()
+    telescope.polaris = polaris
+    polaris_client = asyncio.create_task(polaris.client(logger))
+    server = await asyncio.start_server(lambda r, w: stellarium_handler(stellarium_class, logger, r, w), '127.0.0.1', 0)
+    await asyncio.sleep(0.5)
+    result = await synscan_client(server.sockets[0].getsockname()[1], duration)
+    server.close()
+    polaris_client.cancel()
+    fake.server.close()
+    return result
+
+def synscan_benchmarks(duration=10.0):
+    print(f"\n== SynScan 'e'/'L' polling with a Cancel GOTO 'M' every 0.5s ==")
+    print(f"poll max rate {Config.stellarium_poll_max_rate}/s | poll burst {Config.stellarium_poll_burst}")
+    for name, stellarium_class in (('fixed sleeps', SleepStellarium), ('token bucket', Stellarium)):
+        rate, latencies = asyncio.run(run_synscan(stellarium_class, duration))
+        print(f"{name:<13} {rate:6.1f} polls/s | 'M' latency p50 {latencies[len(latencies)//2]:7.2f}ms "
+              f"max {latencies[-1]:7.2f}ms ({len(latencies)} commands)")
+
+
+# Several Stellarium PLUS clients polling 'e' and Stellarium Desktop clients following the position updates
+async def shared_encodings(n_synscan, n_binary, duration):
+    fake = TrajectoryPolaris(slewing())
+    Config.polaris_ip_address = '127.0.0.1'
+    Config.polaris_port = await fake.start()
+    polaris, logger = quiet_polaris()
+    telescope.polaris = polaris
+    polaris_client = asyncio.create_task(polaris.client(logger))
+    server = await asyncio.start_server(lambda r, w: stellarium_handler(Stellarium, logger, r, w), '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    polls = 0
+
+    async def synscan_client(until):
+        nonlocal polls
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b'Ka')
+        await reader.readuntil(b'#')
+        while time.monotonic() < until:
+            writer.write(b'e')
+            await reader.readuntil(b'#')
+            polls += 1
+        writer.close()
+
+    async def binary_client(until):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        while time.monotonic() < until:
+            await reader.readexactly(26)
+        writer.close()
+
+    until = time.monotonic() + 5 + duration             # the binary position updates start 5s after connecting
+    clients = [synscan_client(until) for _ in range(n_synscan)] + [binary_client(until) for _ in range(n_binary)]
+    encoded, served = position_encodings.encoded, position_encodings.served
+    await asyncio.gather(*clients)
+    encoded, served = position_encodings.encoded - encoded, position_encodings.served - served
+    server.close()
+    polaris_client.cancel()
+    fake.server.close()
+    print(f"{n_synscan} SynScan + {n_binary} Binary clients | {polls} 'e' polls | {served} positions sent, "
+          f"{encoded} encoded ({served/max(encoded, 1):.1f} sends per encoding) | 518 updates {polaris._framer.frames}")
+
+def encoding_benchmarks(duration=10.0):
+    print(f"\n== Position encodings shared by all connections, slewing with 20Hz 518 updates ==")
+    asyncio.run(shared_encodings(1, 1, duration))
+    asyncio.run(shared_encodings(8, 4, duration))
+
+
+# A writer whose drain never completes, like a client on a WiFi link that has gone quiet
+class StalledWriter(FakeWriter):
+    async def drain(self):
+        await asyncio.Event().wait()
+
+# n_clients Stellarium Desktop clients over localhost, plus n_stalled connections that never drain, while slewing
+async def fan_out(stellarium_class, n_clients, n_stalled, duration):
+    fake = TrajectoryPolaris(slewing())
+    Config.polaris_ip_address = '127.0.0.1'
+    Config.polaris_port = await fake.start()
+    polaris, logger = quiet_polaris()
+    telescope.polaris = polaris
+    polaris_client = asyncio.create_task(polaris.client(logger))
+    server = await asyncio.start_server(lambda r, w: stellarium_handler(stellarium_class, logger, r, w), '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    stalled = [stellarium_class(logger, None, StalledWriter()) for _ in range(n_stalled)]
+    stalled_tasks = [asyncio.create_task(s.start_position_updates()) for s in stalled]
+    updates = [0] * n_clients
+    errors = []
+    start = time.monotonic() + 6                        # the position updates start 5s after connecting
+    until = start + duration
+    displayed = [None] * n_clients
+
+    async def client(n):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        while time.monotonic() < until:
+            data = await reader.readexactly(26)
+            displayed[n] = bytes2radect(data)[:2]
+            if time.monotonic() >= start:
+                updates[n] += 1
+        writer.close()
+
+    async def sample():
+        await asyncio.sleep(start - time.monotonic())
+        while time.monotonic() < until:
+            state = telescope.polaris.state
+            errors.extend(position_change_arcsec(state.rightascension, state.declination, *d) for d in displayed if d)
+            await asyncio.sleep(random.uniform(0.02, 0.08))     # at random times, so as not to lock on to the update rate
+
+    async def cpu():
+        await asyncio.sleep(start - time.monotonic())
+        t0 = time.process_time()
+        await asyncio.sleep(until - time.monotonic())
+        return time.process_time() - t0
+
+    *_, cpu_s = await asyncio.gather(*(client(n) for n in range(n_clients)), sample(), cpu())
+    for task in stalled_tasks:
+        task.cancel()
+    hub = (stellarium_hub.published, [stellarium_hub.clients[s].dropped for s in stalled if s in stellarium_hub.clients])
+    for s in stalled:
+        stellarium_hub.leave(s)
+    server.close()
+    polaris_client.cancel()
+    fake.server.close()
+    errors.sort()
+    return min(updates) / duration, sum(updates) / n_clients / duration, sum(errors) / len(errors), errors[int(len(errors) * 0.99)], cpu_s / duration, hub
+
+def hub_benchmarks(n_clients=50, n_stalled=5, duration=10.0):
+    print(f"\n== {n_clients} Stellarium Desktop clients and {n_stalled} stalled connections, slewing with 20Hz 518 updates ==")
+    for label, stellarium_class in (('per connection', PerConnectionStellarium), ('stellarium_hub', Stellarium)):
+        slowest, mean, mean_err, p99_err, cpu, (published, dropped) = asyncio.run(fan_out(stellarium_class, n_clients, n_stalled, duration))
+        print(f"{label:<15} updates/s per client: mean {mean:5.1f} slowest {slowest:5.1f} | displayed position behind driver: "
+              f"mean {mean_err:6.1f} arcsec p99 {p99_err:6.1f} arcsec | CPU {cpu*100:4.1f}%")
+        if stellarium_class is Stellarium:
+            print(f"{'':<15} {published} frames published, frames dropped by each stalled connection {dropped} "
+                  f"(at most {HubClient.MAX_QUEUED_FRAMES} queued)")
+
+
+if __name__ == '__main__':
+    dispatch_benchmarks()
+    encoding_benchmarks()
+    hub_benchmarks()
+    synscan_benchmarks()
+    position_update_benchmarks()
@@ -0,0 +1,136 @@
+# -----------------------------------------------------------------------------
+# benchmark_stream.py - Benchmarks for the /stream server push of telescope state
+#
+# Run from the performance directory:  python benchmark_stream.py
+#
+# Connects a Polaris object to a FakePolaris streaming 518 updates, serves the
+# driver's Falcon app with uvicorn on the same asyncio loop (as the driver does),
+# and follows /stream/v1/telescope/0/state with several SSE subscribers: full
+# rate, rate limited, and one that reads too slowly to keep up.
+#
+# A slow reader over TCP is first absorbed by the socket buffers (so its events
+# arrive late), and only once they fill does the Subscription start dropping
+# snapshots. subscription_benchmark() shows the dropping without the sockets.
+# -----------------------------------------------------------------------------
+import json
+import time
+import asyncio
+import logging
+from performance_shr import use_driver_modules
+use_driver_modules()
+import uvicorn
+from falcon import asgi
+from config import Config
+from shr import Subscription
+from benchmark_polaris_protocol import FakePolaris, quiet_polaris
+
+PORT = 11200
+
+
+def stream_app(polaris):
+    import shr
+    import stream
+    import telescope
+    import exceptions
+    from app import init_routes, API_VERSION
+    logger = logging.getLogger('benchmark')
+    shr.logger = stream.logger = telescope.logger = exceptions.logger = logger
+    telescope.polaris = polaris
+    falc_app = asgi.App()
+    init_routes(falc_app, 'telescope', telescope)
+    falc_app.add_route(f'/stream/v{API_VERSION}/telescope/{{devnum:int(min=0)}}/state', stream.state())
+    return falc_app
+
+
+class SSEClient:
+    """Follows the state stream, recording the delay from each 518 update to the event arriving"""
+    def __init__(self, label, query='', read_delay=0.0):
+        self.label = label
+        self.query = query
+        self.read_delay = read_delay                    # seconds to sleep after each event, to simulate a slow consumer
+        self.events = 0
+        self.bytes = 0
+        self.latencies = []
+
+    async def run(self, until):
+        reader, writer = await asyncio.open_connection('127.0.0.1', PORT, limit=2**16)
+        writer.write(f'GET /stream/v1/telescope/0/state{self.query} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+        await reader.readuntil(b'\r\n\r\n')
+        while time.time() < until:
+            line = await reader.readline()
+            self.bytes += len(line)
+            if line.startswith(b'data: '):
+                delta = json.loads(line[6:])
+                self.events += 1
+                if 'altitude' in delta:                 # a position update, timestamped when the 518 was received
+                    self.latencies.append(time.time() - delta['timestamp'])
+                if self.read_delay:
+                    await asyncio.sleep(self.read_delay)
+        writer.close()
+
+    def summary(self, duration):
+        lat = sorted(self.latencies) or [0]
+        return (f"{self.label:<26} {self.events/duration:6.1f} events/s | {self.bytes/duration:8,.0f} bytes/s | "
+                f"latency p50 {lat[len(lat)//2]*1000:6.2f}ms p99 {lat[int(len(lat)*0.99)]*1000:6.2f}ms")
+
+
+async def follow(ahrs_hz, clients, duration=5.0):
+    fake = FakePolaris(ahrs_hz)
+    Config.polaris_ip_address = '127.0.0.1'
+    Config.polaris_port = await fake.start()
+    polaris, logger = quiet_polaris()
+    polaris_client = asyncio.create_task(polaris.client(logger))
+    server = uvicorn.Server(uvicorn.Config(stream_app(polaris), host='127.0.0.1', port=PORT, log_level='error'))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(1)                              # let the Polaris connection settle
+    until = time.time() + duration
+    tasks = [asyncio.create_task(c.run(until)) for c in clients]
+    await asyncio.sleep(duration / 2)
+    subscriptions = list(polaris._subscriptions)
+    await asyncio.gather(*tasks)
+    print(f"\n== {ahrs_hz}Hz 518 updates, {len(clients)} subscribers for {duration:.0f}s (stream_max_rate {Config.stream_max_rate}) ==")
+    for c in clients:
+        print(c.summary(duration))
+    for s in subscriptions:
+        print(f"subscription max rate {1/s.min_interval if s.min_interval else 0:5.1f}/s | {s.summary()}")
+    server.should_exit = True
+    await server_task
+    polaris_client.cancel()
+    fake.server.close()
+
+
+# A consumer that takes work_s per value, against a publisher at publish_hz: the consumer always gets
+# the latest value, so the age of what it handles stays under one publish interval plus its own work time
+async def slow_consumer(publish_hz=100, work_s=0.1, duration=3.0):
+    subscription = Subscription()
+    ages = []
+
+    async def consumer():
+        while True:
+            t = await subscription.get()
+            ages.append(time.perf_counter() - t)
+            await asyncio.sleep(work_s)
+
+    task = asyncio.create_task(consumer())
+    until = time.perf_counter() + duration
+    while time.perf_counter() < until:
+        subscription.publish(time.perf_counter())
+        await asyncio.sleep(1 / publish_hz)
+    task.cancel()
+    print(f"publish {publish_hz}Hz, consumer {work_s*1000:.0f}ms per value | {subscription.summary()} | "
+          f"max age of a value when taken {max(ages)*1000:.1f}ms")
+
+def subscription_benchmark():
+    print(f"\n== Subscription with a slow consumer ==")
+    asyncio.run(slow_consumer(100, 0.1))
+    asyncio.run(slow_consumer(20, 0.5))
+
+
+if __name__ == '__main__':
+    subscription_benchmark()
+    asyncio.run(follow(20, [SSEClient('full rate'), SSEClient('full rate'), SSEClient('maxrate=5', '?maxrate=5'),
+                            SSEClient('slow reader (4 events/s)', read_delay=0.25)]))
+    Config.stream_max_rate = 0
+    asyncio.run(follow(100, [SSEClient('unlimited'), SSEClient('maxrate=10', '?maxrate=10')]))
@@ -0,0 +1,94 @@
+# -----------------------------------------------------------------------------
+# benchmark_telemetry.py - Benchmarks for the TelemetryStore position history
+#
+# Run from the performance directory:  python benchmark_telemetry.py
+#
+# Compares appending 518 updates to the TelemetryStore ring buffer with keeping
+# them as tuples in a deque, for the cost per update and the memory held, times
+# the windowed queries on a full store, and compares the drift fitted over a
+# window of noisy 20Hz updates with the two point drift previously logged by
+# drift_error_test.
+# -----------------------------------------------------------------------------
+import random
+import tracemalloc
+from collections import deque
+import numpy as np
+from performance_shr import use_driver_modules, benchmark
+use_driver_modules()
+from config import Config
+from telemetry import TelemetryStore, RECORD_DTYPE
+
+HZ = 20
+STEP_NS = 1_000_000_000 // HZ
+
+
+def memory_benchmarks(n=Config.telemetry_samples):
+    print(f"\n== Memory held by {n:,} samples (~{n/HZ/3600:.1f} hours at {HZ}Hz) ==")
+    tracemalloc.start()
+    store = TelemetryStore(n)
+    for i in range(n):
+        store.append(i * STEP_NS, 45.0 + i * 1e-6, 180.0, 12.0, -30.0, True, False)
+    store_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    tracemalloc.start()
+    history = deque(maxlen=n)
+    for i in range(n):
+        history.append((i * STEP_NS, 45.0 + i * 1e-6, 180.0, 12.0, -30.0, True, False))
+    deque_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"TelemetryStore ({RECORD_DTYPE.itemsize} bytes/sample)        {store_bytes/1e6:8.1f}MB")
+    print(f"deque of tuples                           {deque_bytes/1e6:8.1f}MB")
+    return store
+
+def append_benchmarks():
+    print(f"\n== Cost of appending a 518 update ==")
+    store = TelemetryStore(10000)
+    history = deque(maxlen=10000)
+    i = [0]
+    def store_append():
+        i[0] += STEP_NS
+        store.append(i[0], 45.1, 180.2, 12.3, -30.4, True, False)
+    def deque_append():
+        i[0] += STEP_NS
+        history.append((i[0], 45.1, 180.2, 12.3, -30.4, True, False))
+    benchmark('TelemetryStore.append', store_append, number=100000)
+    benchmark('deque.append(tuple)', deque_append, number=100000)
+
+def query_benchmarks(store):
+    print(f"\n== Windowed queries on a full store of {store.count:,} samples ==")
+    w = store.last(120)
+    benchmark(f'last(120) ({len(w)} samples)', lambda: store.last(120), number=2000)
+    benchmark('drift(last 120s)', lambda: store.drift(w), number=500)
+    benchmark('speed(last 120s)', lambda: store.speed(w), number=500)
+    benchmark('settle_time(last 120s)', lambda: store.settle_time(w), number=500)
+
+
+# Drift over 120s of 20Hz updates with noise_arcsec of AHRS noise, fitted and from the two end points
+def drift_benchmarks(trials=200, duration=120, noise_arcsec=4.0, drift=(3.0, -2.0), seed=1):
+    print(f"\n== Drift of ({drift[0]}, {drift[1]}) arcsec/min over {duration}s with {noise_arcsec}\" noise, {trials} trials ==")
+    rnd = random.Random(seed)
+    store = TelemetryStore(duration * HZ + 1)
+    fitted, two_point = [], []
+    for _ in range(trials):
+        store.clear()
+        ra0, dec0 = rnd.uniform(0, 24), rnd.uniform(-60, 60)
+        for i in range(duration * HZ + 1):
+            t = i / HZ
+            ra = ra0 - drift[0] * t / 60 / 3600 / 15 + rnd.gauss(0, noise_arcsec) / 3600 / 15
+            dec = dec0 - drift[1] * t / 60 / 3600 + rnd.gauss(0, noise_arcsec) / 3600
+            store.append(i * STEP_NS, 45.0, 180.0, ra, dec, True, False)
+        w = store.window(0)
+        fitted.append(store.drift(w))
+        a0, a1 = w[0], w[-1]
+        two_point.append(((float(a0['ra']) - float(a1['ra'])) * 3600 * 15 / duration * 60,
+                          (float(a0['dec']) - float(a1['dec'])) * 3600 / duration * 60))
+    for label, results in (('two end points', two_point), ('fitted over the window', fitted)):
+        err = np.array(results) - np.array(drift)
+        print(f"{label:<24} RA error rms {np.sqrt(np.mean(err[:,0]**2)):.3f}\"/min | Dec error rms {np.sqrt(np.mean(err[:,1]**2)):.3f}\"/min")
+
+
+if __name__ == '__main__':
+    store = memory_benchmarks()
+    append_benchmarks()
+    query_benchmarks(store)
+    drift_benchmarks()
@@ -0,0 +1,74 @@
+# -----------------------------------------------------------------------------
+# benchmark_timekeeping.py - Benchmarks for the monotonic timekeeping of the Polaris paths
+#
+# Run from the performance directory:  python benchmark_timekeeping.py
+#
+# Compares the cost of the wall clock datetime timestamps previously used by the
+# 518 handler, watchdog and performance logging with monotonic_ns() timestamps
+# and MonotonicClock.wall(), shows what a wall clock step (eg an NTP correction)
+# does to each, and measures how far the sample time used for the RA/Dec
+# conversion is from the time it is processed, over localhost.
+# -----------------------------------------------------------------------------
+import time
+import asyncio
+import datetime
+from performance_shr import use_driver_modules, benchmark
+use_driver_modules()
+import shr
+from shr import MonotonicClock
+from benchmark_polaris_protocol import run_polaris
+
+SIDEREAL_ARCSEC_PER_S = 15.041
+
+
+def cost_benchmarks():
+    print(f"\n== Cost of a timestamp, and of an interval between two ==")
+    clock = MonotonicClock()
+    t0_dt = datetime.datetime.now()
+    t0_ns = time.monotonic_ns()
+    dt_now = lambda: datetime.datetime.now().timestamp()
+    clock_wall = lambda: clock.wall(time.monotonic_ns())
+    dt_interval = lambda: (datetime.datetime.now() - t0_dt).total_seconds()
+    ns_interval = lambda: (time.monotonic_ns() - t0_ns) / 1e9
+    rate_old = benchmark('datetime.now().timestamp()', dt_now, number=200000)
+    rate_new = benchmark('clock.wall(monotonic_ns())', clock_wall, number=200000)
+    print(f"Speedup {rate_new/rate_old:.1f}x | {rate_new/1e6:.1f}M timestamps/s")
+    rate_old = benchmark('datetime interval total_seconds()', dt_interval, number=200000)
+    rate_new = benchmark('monotonic_ns() interval', ns_interval, number=200000)
+    print(f"Speedup {rate_new/rate_old:.1f}x")
+
+
+def step_benchmark(step_s=2.0):
+    print(f"\n== Wall clock stepped forward {step_s}s (eg an NTP correction) between two readings 0.1s apart ==")
+    clock = MonotonicClock(recalibrate_s=0.05)
+    real_time_ns = shr.time_ns
+    t0_dt = datetime.datetime.now().timestamp()
+    t0_ns = time.monotonic_ns()
+    time.sleep(0.1)
+    step_ns = int(step_s * 1e9)
+    shr.time_ns = lambda: real_time_ns() + step_ns  # the clock MonotonicClock calibrates against
+    try:
+        d_wall = datetime.datetime.now().timestamp() + step_s - t0_dt
+        d_mono = (time.monotonic_ns() - t0_ns) / 1e9
+        wall = clock.wall(time.monotonic_ns())
+        print(f"interval by wall clock       {d_wall:.3f}s   (a watchdog would see a {d_wall:.1f}s old 518)")
+        print(f"interval by monotonic_ns()   {d_mono:.3f}s")
+        print(f"clock.wall() follows the new wall clock after recalibrating: off by {abs(wall - (real_time_ns() + step_ns)/1e9)*1000:.3f}ms | {clock.summary()}")
+    finally:
+        shr.time_ns = real_time_ns
+
+
+def sample_time_benchmark():
+    print(f"\n== 518 sample time (received) vs processing time, 20Hz AHRS stream over localhost ==")
+    polaris, _ = asyncio.run(run_polaris(5))
+    latency = polaris._latency_518
+    print(f"receive to position update {latency.summary()}")
+    print(f"RA drift over that time at the sidereal rate: mean {latency.mean_ms()/1000*SIDEREAL_ARCSEC_PER_S:.5f}\" "
+          f"max {latency.max_ns/1e9*SIDEREAL_ARCSEC_PER_S:.5f}\" (conversions now use the receive time)")
+    print(f"clock {polaris._clock.summary()}")
+
+
+if __name__ == '__main__':
+    cost_benchmarks()
+    step_benchmark()
+    sample_time_benchmark()
@@ -1,4 +1,7 @@
 import numpy as np
+import os
+import sys
+import time
 
 # Define the conversion function for csv floats
 def convert_to_float(value):
@@ -50,3 +53,37 @@ def plot_formating(title, xtitle, ytitle):
     }
     bgcolor = 'rgba(200, 200, 250, 0.5)'
     return title,labels,xtitle,ytitle,bgcolor
+
+
+# Make the driver modules importable from a benchmark script (config.py loads config.toml from sys.path[0])
+def use_driver_modules():
+    driver_dir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'driver'))
+    if sys.path[0] != driver_dir:
+        sys.path.insert(0, driver_dir)
+    return driver_dir
+
+# Helper function to time a function call, printing and returning the number of calls per second
+def benchmark(label, fn, number=10000, repeat=5):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None or elapsed < best else best
+    rate = number / best
+    print(f"{label:<50} {rate:14,.0f} calls/s {best/number*1e6:10.3f} us/call")
+    return rate
+
+# Load a binary performance data recording (eg ../driver/alpaca.DATA4.tlm) into a pandas DataFrame with
+# the columns of the CSV performance data, Log holding the UTC time of each row, so the notebooks can use
+# it in place of pd.read_csv('../driver/alpaca.csv', ...)
+def load_telemetry(path):
+    import pandas as pd
+    use_driver_modules()
+    from telemetry import read_recording, read_description
+    records = read_recording(path)
+    data = pd.DataFrame(np.asarray(records))
+    data.insert(0, 'Log', pd.to_datetime(data.pop('Wall'), unit='s'))
+    data.insert(1, 'Dataset', read_description(path)['dataset'])
+    return data
@@ -0,0 +1,152 @@
+# -----------------------------------------------------------------------------
+# replay_stellarium.py - Replay captured Stellarium sessions through the driver
+#
+# Run from the performance directory:
+#   python replay_stellarium.py                 replay the built in sample sessions
+#   python replay_stellarium.py alpaca.log ...  replay sessions captured in driver logs
+#
+# To capture a session set log_stellarium_protocol = true and
+# supress_stellarium_polling_msgs = false in config.toml, and connect Stellarium.
+# Every '<<- Stellarium: recv_msg:' line of a log is taken as one read of the
+# session (older logs have one line per read, newer ones one per command).
+#
+# Each session is replayed through Stellarium.client with the bytes chopped up
+# in several ways (as captured, one read, byte by byte, random reads) and the
+# commands handled and the replies sent must be the same every time.
+# -----------------------------------------------------------------------------
+import re
+import sys
+import time
+import random
+import struct
+import asyncio
+import logging
+from collections import Counter
+from performance_shr import use_driver_modules
+use_driver_modules()
+import telescope
+from shr import TokenBucket
+from stellarium import Stellarium, radec_to_SynScan24bit
+from benchmark_polaris_protocol import quiet_polaris
+
+
+# Sessions as the list of reads received from the client
+def synscan_goto(cmd, ra, dec):
+    return cmd + bytes(radec_to_SynScan24bit(ra, dec))[:-1]             # the same encoding as the replies, without the '#'
+
+def binary_goto(ra, dec):
+    return struct.pack('<HHqIi', 20, 0, int(time.time() * 1e6), int(ra * 0x100000000 / 24), int(dec * 0x40000000 / 90))
+
+SAMPLE_SESSIONS = {
+    'Stellarium PLUS': [b'Ka', b'V', b'J', b'h', b'w', b'e', b'L', b't', b'e', b'L',
+                        synscan_goto(b'r', 5.5881, -5.3911), b'L', b'e', b'L', b'e', b'M', b'L',
+                        b'P\x03\x10\x24\x00\x00\x00\x00', b'P\x02\x10\x24\x03\x00\x00\x00', b'P\x02\x10\x24\x00\x00\x00\x00',
+                        synscan_goto(b's', 5.5881, -5.3911), b'e', b'L'],
+    'Stellarium Desktop': [binary_goto(5.5881, -5.3911), binary_goto(18.6156, 38.7837)],
+}
+
+recv_msg = re.compile(r'Stellarium: recv_msg: ((?:[0-9a-f]{2} ?)+):')
+
+def captured_session(log_file):
+    with open(log_file, errors='replace') as f:
+        return [bytes.fromhex(m.group(1)) for m in map(recv_msg.search, f) if m]
+
+
+# Ways of chopping a session into reads
+def chunkings(reads, seed=1):
+    data = b''.join(reads)
+    rnd = random.Random(seed)
+    random_reads = []
+    i = 0
+    while i < len(data):
+        n = rnd.randint(1, 40)
+        random_reads.append(data[i:i+n])
+        i += n
+    return {'as captured': reads,
+            'one read': [data],
+            'byte by byte': [data[i:i+1] for i in range(len(data))],
+            'random reads': random_reads}
+
+
+class ReplayReader:
+    def __init__(self, reads):
+        self.reads = list(reads)
+
+    async def read(self, n):
+        if not self.reads:
+            return b''
+        data = self.reads.pop(0)
+        if len(data) > n:
+            data, self.reads[:0] = data[:n], [data[n:]]
+        return data
+
+class ReplayWriter:
+    def __init__(self):
+        self.written = []
+
+    def write(self, data):
+        self.written.append(bytes(data))
+
+    async def drain(self):
+        pass
+
+# Records each command handled with the reply sent for it
+class ReplayStellarium(Stellarium):
+    def __init__(self, logger, reader, writer):
+        super().__init__(logger, reader, writer)
+        self.poll_limiter = TokenBucket(0)          # replay at full speed
+        self.transcript = []
+
+    async def process_protocol(self, data):
+        self.writer.written.clear()
+        await super().process_protocol(data)
+        reply = b''.join(self.writer.written)
+        if data[:1] == b'h':
+            reply = b'<time>'                       # the time reply depends on when it is replayed
+        self.transcript.append((bytes(data), reply))
+
+# The previous handling of each read as exactly one command, kept here for comparison
+class LegacyReplayStellarium(ReplayStellarium):
+    async def client(self):
+        while True:
+            data = await self.reader.read(256)
+            if not data:
+                break
+            try:
+                await self.process_protocol(data)
+            except Exception:
+                break                               # a split command raised, and lost the connection
+
+async def replay(stellarium_class, reads):
+    s = stellarium_class(telescope.polaris.logger, ReplayReader(reads), ReplayWriter())
+    await s.client()
+    return s
+
+def replay_session(name, reads):
+    data = b''.join(reads)
+    print(f"\n== {name}: {len(reads)} reads, {len(data)} bytes ==")
+    reference = None
+    ok = True
+    for label, chunks in chunkings(reads).items():
+        s = asyncio.run(replay(ReplayStellarium, chunks))
+        if reference is None:
+            reference = s.transcript
+            unanswered = [c for c, r in reference if not r and c[0] != 0x14]
+            print(f"{len(reference)} commands | {s.framer.unknown} unknown byte runs | "
+                  f"{len(unanswered)} SynScan commands without a reply {[bytes(c) for c in unanswered][:5]}")
+        same = s.transcript == reference
+        ok = ok and same
+        legacy = asyncio.run(replay(LegacyReplayStellarium, chunks))
+        print(f"{label:<14} {len(chunks):5} reads | {'same' if same else 'DIFFERENT'} commands and replies | "
+              f"previous one command per read: {sum((Counter(legacy.transcript) & Counter(reference)).values())} handled correctly")
+    return ok
+
+
+if __name__ == '__main__':
+    polaris, logger = quiet_polaris()
+    logger.setLevel(logging.CRITICAL)
+    telescope.polaris = polaris
+    sessions = {f: captured_session(f) for f in sys.argv[1:]} or SAMPLE_SESSIONS
+    results = [replay_session(name, reads) for name, reads in sessions.items()]
+    print(f"\n{'All sessions replayed the same' if all(results) else 'Some sessions replayed DIFFERENTLY'}")
+    sys.exit(0 if all(results) else 1)